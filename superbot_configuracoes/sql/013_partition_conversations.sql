@@ -0,0 +1,111 @@
+-- ============================================================
+-- 013: Particionamento de conversation_states / conversation_events
+-- HASH (project_id) com 32 particoes: toda query do dashboard filtra
+-- por project_id, entao o planner le apenas 1 particao por request.
+--
+-- EXECUTAR MANUALMENTE em janela de manutencao (tabelas do n8n):
+--   - pausar os workflows do n8n que escrevem nessas tabelas;
+--   - o backend recria trigger/indices no proximo startup (init_db);
+--   - as materialized views de analytics sao apagadas junto com a troca:
+--     reaplicar 018_analytics_materialized_views.sql logo depois do COMMIT.
+--
+-- REVERSIVEL (enquanto *_legacy existir):
+--   BEGIN;
+--   DROP MATERIALIZED VIEW IF EXISTS mv_analytics_daily, mv_analytics_channels,
+--     mv_analytics_status, mv_analytics_hourly;
+--   ALTER TABLE conversation_states RENAME TO conversation_states_p;
+--   ALTER TABLE conversation_states_legacy RENAME TO conversation_states;
+--   ALTER TABLE conversation_events RENAME TO conversation_events_p;
+--   ALTER TABLE conversation_events_legacy RENAME TO conversation_events;
+--   COMMIT;
+--   -- (copiar de volta as linhas novas de *_p antes de dropar)
+-- ============================================================
+
+BEGIN;
+
+LOCK TABLE conversation_states, conversation_events IN EXCLUSIVE MODE;
+
+-- Materialized views de analytics dependem das tabelas antigas
+-- (recriadas pelo 018 depois da troca).
+DROP MATERIALIZED VIEW IF EXISTS mv_analytics_daily;
+DROP MATERIALIZED VIEW IF EXISTS mv_analytics_channels;
+DROP MATERIALIZED VIEW IF EXISTS mv_analytics_status;
+DROP MATERIALIZED VIEW IF EXISTS mv_analytics_hourly;
+
+-- ------------------------------------------------------------
+-- conversation_states: PK (project_id, channel_type, conversation_id)
+-- ja contem a chave de particao.
+-- NAO sub-particionar por last_event_at: a coluna muda a cada mensagem
+-- e cada UPDATE viraria um DELETE+INSERT entre particoes.
+-- ------------------------------------------------------------
+CREATE TABLE conversation_states_p (
+    LIKE conversation_states INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE,
+    PRIMARY KEY (project_id, channel_type, conversation_id),
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+) PARTITION BY HASH (project_id);
+
+-- ------------------------------------------------------------
+-- conversation_events: a PK precisa incluir project_id.
+-- ------------------------------------------------------------
+CREATE TABLE conversation_events_p (
+    LIKE conversation_events INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE,
+    PRIMARY KEY (project_id, id),
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+) PARTITION BY HASH (project_id);
+
+DO $$
+BEGIN
+  FOR k IN 0..31 LOOP
+    EXECUTE format(
+      'CREATE TABLE conversation_states_p%s PARTITION OF conversation_states_p
+         FOR VALUES WITH (MODULUS 32, REMAINDER %s)', k, k);
+    EXECUTE format(
+      'CREATE TABLE conversation_events_p%s PARTITION OF conversation_events_p
+         FOR VALUES WITH (MODULUS 32, REMAINDER %s)', k, k);
+  END LOOP;
+END $$;
+
+-- Sub-particionamento mensal (opcional, apenas para tenants grandes).
+-- Troque a particao hash do tenant por uma particionada por created_at
+-- (coluna imutavel). Exige incluir created_at na PK da tabela pai:
+--   ALTER TABLE conversation_events_p DROP CONSTRAINT conversation_events_p_pkey;
+--   ALTER TABLE conversation_events_p ADD PRIMARY KEY (project_id, id, created_at);
+--   CREATE TABLE conversation_events_pK PARTITION OF conversation_events_p
+--     FOR VALUES WITH (MODULUS 32, REMAINDER K) PARTITION BY RANGE (created_at);
+--   CREATE TABLE conversation_events_pK_2026_01 PARTITION OF conversation_events_pK
+--     FOR VALUES FROM ('2026-01-01') TO ('2026-02-01');
+--   CREATE TABLE conversation_events_pK_default PARTITION OF conversation_events_pK DEFAULT;
+
+INSERT INTO conversation_states_p SELECT * FROM conversation_states;
+INSERT INTO conversation_events_p SELECT * FROM conversation_events;
+
+-- Indices usados pelo dashboard (criados na tabela pai, propagam para as particoes)
+CREATE INDEX idx_conversation_states_p_last_event
+    ON conversation_states_p (project_id, last_event_at DESC);
+CREATE INDEX idx_conversation_events_p_conversation
+    ON conversation_events_p (project_id, channel_type, conversation_id, created_at);
+CREATE INDEX idx_conversation_events_p_created
+    ON conversation_events_p (project_id, created_at);
+
+-- Troca de nomes (as tabelas antigas ficam como *_legacy para rollback)
+ALTER TABLE conversation_states RENAME TO conversation_states_legacy;
+ALTER TABLE conversation_events RENAME TO conversation_events_legacy;
+ALTER TABLE conversation_states_p RENAME TO conversation_states;
+ALTER TABLE conversation_events_p RENAME TO conversation_events;
+
+-- O trigger de event_created_at ficou na tabela antiga; init_db recria na nova,
+-- mas o indice de timeline tem o mesmo nome na legacy e precisa ser renomeado.
+DROP TRIGGER IF EXISTS trg_superbot_set_event_created_at ON conversation_events_legacy;
+ALTER INDEX IF EXISTS idx_conversation_events_timeline
+    RENAME TO idx_conversation_events_legacy_timeline;
+
+COMMIT;
+
+ANALYZE conversation_states;
+ANALYZE conversation_events;
+
+-- Em seguida: 018_analytics_materialized_views.sql (recria as views).
+
+-- Depois de validar com dados reais:
+--   DROP TABLE conversation_states_legacy;
+--   DROP TABLE conversation_events_legacy;
@@ -0,0 +1,47 @@
+-- ============================================================
+-- 014: Indices parciais para os KPIs de analytics
+-- O overview filtra conversation_states por project_id + status
+-- (ativas / fechadas no periodo) e conversation_events por
+-- project_id + created_at. Indices parciais leem so as linhas
+-- relevantes em vez da tabela inteira do projeto.
+--
+-- EXECUTAR MANUALMENTE (fora de transacao: CREATE INDEX CONCURRENTLY
+-- nao roda dentro de BEGIN/COMMIT e nao bloqueia os writes do n8n).
+-- Se a 013 (particionamento) ja foi aplicada, remova CONCURRENTLY:
+-- indices em tabela particionada sao criados particao a particao.
+--
+-- REVERSIVEL:
+--   DROP INDEX CONCURRENTLY IF EXISTS ix_cs_active;
+--   DROP INDEX CONCURRENTLY IF EXISTS ix_cs_closed_at;
+--   DROP INDEX CONCURRENTLY IF EXISTS ix_cs_last_event;
+--   DROP INDEX CONCURRENTLY IF EXISTS ix_cs_status;
+--   DROP INDEX CONCURRENTLY IF EXISTS ix_cs_channel;
+--   DROP INDEX CONCURRENTLY IF EXISTS ix_ce_created;
+-- ============================================================
+
+-- Conversas ativas (mesmo predicado de active_conversations no overview)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cs_active
+    ON conversation_states (project_id)
+    WHERE status NOT IN ('closed', 'handoff', 'do_not_contact');
+
+-- Fechadas no periodo (status = 'closed' AND closed_at >= :since)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cs_closed_at
+    ON conversation_states (project_id, closed_at)
+    WHERE status = 'closed';
+
+-- Conversas do periodo / listagem ordenada por ultima atividade
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cs_last_event
+    ON conversation_states (project_id, last_event_at DESC);
+
+-- GROUP BY status / channel_type por projeto (index-only scan)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cs_status
+    ON conversation_states (project_id, status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cs_channel
+    ON conversation_states (project_id, channel_type);
+
+-- Mensagens do periodo
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ce_created
+    ON conversation_events (project_id, created_at DESC);
+
+ANALYZE conversation_states;
+ANALYZE conversation_events;
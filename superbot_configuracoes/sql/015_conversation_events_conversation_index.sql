@@ -0,0 +1,26 @@
+-- ============================================================
+-- 015: Indice por conversa em conversation_events
+-- A listagem de conversas busca, para a pagina inteira, a contagem
+-- de mensagens e o ultimo evento filtrando por
+-- (project_id, conversation_id) e agrupando/ordenando por
+-- channel_type + created_at (o fallback ignora channel_type).
+-- Com conversation_id antes de channel_type o mesmo indice atende
+-- os dois casos e a consulta por conversa (igualdade nas 3 colunas)
+-- sai ordenada por created_at sem sort.
+--
+-- Sem INCLUDE de text/raw_payload: valores grandes estouram o limite
+-- de tamanho da tupla de indice e fariam os INSERTs do n8n falharem.
+--
+-- EXECUTAR MANUALMENTE (fora de transacao: CREATE INDEX CONCURRENTLY
+-- nao roda dentro de BEGIN/COMMIT e nao bloqueia os writes do n8n).
+-- Se a 013 (particionamento) ja foi aplicada, remova CONCURRENTLY:
+-- indices em tabela particionada sao criados particao a particao.
+--
+-- REVERSIVEL:
+--   DROP INDEX CONCURRENTLY IF EXISTS idx_cevt_conversation_created;
+-- ============================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cevt_conversation_created
+    ON conversation_events (project_id, conversation_id, channel_type, created_at DESC);
+
+ANALYZE conversation_events;
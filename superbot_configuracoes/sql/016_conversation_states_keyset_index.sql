@@ -0,0 +1,27 @@
+-- ============================================================
+-- 016: Indice para paginacao keyset da listagem de conversas
+-- O portal (/api/live/{token}/conversations) pagina por cursor:
+--   WHERE project_id = $1
+--     AND (last_event_at, channel_type, conversation_id) < ($2, $3, $4)
+--   ORDER BY last_event_at DESC, channel_type DESC, conversation_id DESC
+-- Com as tres colunas da ordenacao no indice cada pagina e uma
+-- varredura curta a partir do cursor, sem sort e sem descartar as
+-- linhas das paginas anteriores (como o OFFSET faz).
+-- Substitui o ix_cs_last_event da 014 (mesmo prefixo).
+--
+-- EXECUTAR MANUALMENTE (fora de transacao: CREATE INDEX CONCURRENTLY
+-- nao roda dentro de BEGIN/COMMIT e nao bloqueia os writes do n8n).
+-- Se a 013 (particionamento) ja foi aplicada, remova CONCURRENTLY:
+-- indices em tabela particionada sao criados particao a particao.
+--
+-- REVERSIVEL:
+--   DROP INDEX CONCURRENTLY IF EXISTS ix_cs_last_event_keyset;
+--   (e recriar o ix_cs_last_event da 014, se removido)
+-- ============================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cs_last_event_keyset
+    ON conversation_states (project_id, last_event_at DESC, channel_type DESC, conversation_id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_cs_last_event;
+
+ANALYZE conversation_states;
@@ -0,0 +1,84 @@
+-- ============================================================
+-- 017: Contador de eventos por conversa em conversation_states
+-- O portal (/api/live/{token}/conversations) mostra, por conversa,
+-- o total de eventos do canal. Em vez de um count(*) em
+-- conversation_events por linha da pagina, le conversation_states.event_count,
+-- mantido por trigger (INSERT/DELETE em conversation_events).
+-- Enquanto event_count for NULL a API conta ao vivo (mesmo resultado),
+-- entao o backfill (passo 3) pode rodar depois e aos poucos.
+--
+-- CUSTO: cada INSERT do n8n em conversation_events faz um UPDATE a mais
+-- na linha da conversa (a mesma que o n8n ja atualiza com last_event_at).
+--
+-- APLICAR ANTES do deploy da API que le event_count (a coluna precisa
+-- existir). Passos 1 e 2 sao rapidos (ADD COLUMN sem default nao
+-- reescreve a tabela). O passo 3 roda em lotes, fora de uma transacao
+-- unica, para nao travar todas as conversas enquanto o n8n grava:
+-- repita o UPDATE ate afetar 0 linhas.
+--
+-- REVERSIVEL:
+--   DROP TRIGGER IF EXISTS trg_superbot_count_state_events ON conversation_events;
+--   DROP FUNCTION IF EXISTS superbot_count_state_events();
+--   ALTER TABLE conversation_states DROP COLUMN IF EXISTS event_count;
+--   (so depois de voltar a API para uma versao que nao le a coluna)
+-- ============================================================
+
+-- 1. Coluna
+ALTER TABLE conversation_states
+    ADD COLUMN IF NOT EXISTS event_count integer;
+
+-- 2. Trigger
+CREATE OR REPLACE FUNCTION superbot_count_state_events()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    UPDATE conversation_states
+    SET event_count = event_count - 1
+    WHERE project_id = OLD.project_id
+      AND channel_type = OLD.channel_type
+      AND conversation_id = OLD.conversation_id
+      AND event_count IS NOT NULL;
+    RETURN OLD;
+  END IF;
+
+  -- Conversa ainda nao contada (criada depois do backfill): conta uma vez.
+  UPDATE conversation_states s
+  SET event_count = CASE
+    WHEN s.event_count IS NULL THEN (
+      SELECT count(*) FROM conversation_events e
+      WHERE e.project_id = NEW.project_id
+        AND e.channel_type = NEW.channel_type
+        AND e.conversation_id = NEW.conversation_id
+    )
+    ELSE s.event_count + 1
+  END
+  WHERE s.project_id = NEW.project_id
+    AND s.channel_type = NEW.channel_type
+    AND s.conversation_id = NEW.conversation_id;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_superbot_count_state_events ON conversation_events;
+
+CREATE TRIGGER trg_superbot_count_state_events
+AFTER INSERT OR DELETE ON conversation_events
+FOR EACH ROW
+EXECUTE FUNCTION superbot_count_state_events();
+
+-- 3. Backfill em lotes (repetir ate 0 linhas; cada execucao e uma transacao curta)
+UPDATE conversation_states s
+SET event_count = (
+  SELECT count(*) FROM conversation_events e
+  WHERE e.project_id = s.project_id
+    AND e.channel_type = s.channel_type
+    AND e.conversation_id = s.conversation_id
+)
+WHERE (s.project_id, s.channel_type, s.conversation_id) IN (
+  SELECT project_id, channel_type, conversation_id
+  FROM conversation_states
+  WHERE event_count IS NULL
+  LIMIT 5000
+);
@@ -0,0 +1,80 @@
+-- ============================================================
+-- 018: Materialized views de analytics (mv_analytics_*)
+-- Os endpoints de analytics e o stats de conversas leem rollups
+-- pre-agregados em vez de varrer conversation_states/conversation_events
+-- a cada request. O backend (app.core.analytics_views) so faz
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY periodicamente; criar as views
+-- fica aqui, fora do startup (init_db), porque o CREATE le as tabelas
+-- inteiras.
+-- Cada view tem `refreshed_at` para os endpoints reportarem staleness.
+--
+-- EXECUTAR MANUALMENTE, APLICAR ANTES do deploy da API que le as views.
+-- Idempotente (IF NOT EXISTS). O CREATE popula a view na hora: rode fora
+-- do horario de pico em bases grandes. Reaplicar depois do 013 (a troca
+-- de tabelas apaga as views).
+--
+-- REVERSIVEL:
+--   DROP MATERIALIZED VIEW IF EXISTS mv_analytics_daily, mv_analytics_channels,
+--     mv_analytics_status, mv_analytics_hourly;
+--   (so depois de voltar a API para uma versao que nao le as views)
+-- ============================================================
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.mv_analytics_daily AS
+WITH conv AS (
+  SELECT project_id, date_trunc('day', last_event_at) AS day, count(*) AS conversations
+  FROM public.conversation_states
+  GROUP BY 1, 2
+),
+msgs AS (
+  SELECT project_id, date_trunc('day', created_at) AS day, count(*) AS messages
+  FROM public.conversation_events
+  GROUP BY 1, 2
+)
+SELECT
+  COALESCE(c.project_id, m.project_id) AS project_id,
+  COALESCE(c.day, m.day) AS day,
+  COALESCE(c.conversations, 0) AS conversations,
+  COALESCE(m.messages, 0) AS messages,
+  now() AS refreshed_at
+FROM conv c
+FULL OUTER JOIN msgs m ON m.project_id = c.project_id AND m.day = c.day;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.mv_analytics_channels AS
+SELECT
+  project_id,
+  date_trunc('day', last_event_at) AS day,
+  channel_type,
+  count(*) AS cnt,
+  now() AS refreshed_at
+FROM public.conversation_states
+GROUP BY 1, 2, 3;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.mv_analytics_status AS
+SELECT
+  project_id,
+  date_trunc('day', last_event_at) AS day,
+  COALESCE(status, 'unknown') AS status,
+  count(*) AS cnt,
+  now() AS refreshed_at
+FROM public.conversation_states
+GROUP BY 1, 2, 3;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.mv_analytics_hourly AS
+SELECT
+  project_id,
+  date_trunc('day', created_at) AS day,
+  EXTRACT(HOUR FROM created_at)::int AS hour,
+  count(*) AS cnt,
+  now() AS refreshed_at
+FROM public.conversation_events
+GROUP BY 1, 2, 3;
+
+-- Indices unicos: exigidos por REFRESH MATERIALIZED VIEW CONCURRENTLY.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_analytics_daily_key
+    ON public.mv_analytics_daily (project_id, day);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_analytics_channels_key
+    ON public.mv_analytics_channels (project_id, day, channel_type);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_analytics_status_key
+    ON public.mv_analytics_status (project_id, day, status);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_analytics_hourly_key
+    ON public.mv_analytics_hourly (project_id, day, hour);
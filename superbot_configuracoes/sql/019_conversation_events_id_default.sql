@@ -0,0 +1,19 @@
+-- ============================================================
+-- 019: Default de conversation_events.id no Postgres
+-- O dashboard grava eventos (envio, pausa do bot, transferencia) sem
+-- mandar o id e le o valor gerado via RETURNING, como o n8n.
+-- Antes isso rodava a cada startup (init_db), e o ALTER TABLE pega
+-- ACCESS EXCLUSIVE em conversation_events; agora e um passo unico.
+--
+-- EXECUTAR MANUALMENTE, APLICAR ANTES do deploy da API que omite o id.
+-- Rapido (so altera o catalogo, nao reescreve a tabela) e idempotente.
+-- Em tabela particionada (013) o default da tabela pai vale para as
+-- particoes.
+--
+-- REVERSIVEL:
+--   ALTER TABLE conversation_events ALTER COLUMN id DROP DEFAULT;
+--   (so se o n8n tambem nao depender do default)
+-- ============================================================
+
+ALTER TABLE public.conversation_events
+    ALTER COLUMN id SET DEFAULT gen_random_uuid();
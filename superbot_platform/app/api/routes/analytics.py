@@ -4,26 +4,345 @@ Analytics API routes for SuperBot Dashboard.
 Reads from the shared multitenant tables:
 - public.conversation_states
 - public.conversation_events
+
+Timeline/channels/status/hourly read the periodic rollups maintained by
+`app.core.analytics_views` (mv_analytics_*) and report `staleness_seconds`.
 """
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Mapping, Sequence
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Uuid, bindparam, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
 
 from app.api.routes.auth import get_current_user
-from app.core.tenancy import resolve_project_id_for_user
-from app.db.database import get_db
+from app.core.analytics_views import ANALYTICS_VIEWS
+from app.core.http_cache import etag_matches, not_modified_response
+from app.core.tenancy import (
+    RESOLVE_PROJECT_BINDPARAMS,
+    RESOLVE_PROJECT_CTE,
+    project_id_from_resolved,
+    resolve_project_id_for_user,
+    resolve_project_params,
+)
+from app.db.database import async_session, get_db
 from app.db.models import DashboardUser
 
+# Endpoints declare their return type and keep the default response class, so
+# FastAPI serializes them straight to JSON bytes in pydantic-core (no
+# jsonable_encoder/json.dumps pass). Return only JSON-native values.
 router = APIRouter(prefix="/api", tags=["analytics"])
 
 
+# Statements are built once at import; project_id is bound as a native UUID.
+_ADMIN_OVERVIEW_SQL = text(
+    """
+    WITH client_projects AS (
+      SELECT
+        c.id::text AS client_id,
+        c.name AS client_name,
+        c.slug,
+        c.status,
+        c.timezone,
+        c.settings,
+        CASE
+          WHEN COALESCE(c.settings->>'project_id', '') ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+          THEN (c.settings->>'project_id')::uuid
+          ELSE NULL
+        END AS project_id
+      FROM clients c
+    ),
+    state_stats AS (
+      SELECT
+        cs.project_id,
+        COUNT(*) AS total_conversations,
+        COUNT(*) FILTER (WHERE cs.status NOT IN ('closed', 'resolved', 'do_not_contact')) AS active_conversations,
+        COUNT(*) FILTER (WHERE cs.status = 'open') AS open_conversations,
+        COUNT(*) FILTER (WHERE cs.status = 'handoff') AS handoff_conversations,
+        COUNT(*) FILTER (WHERE cs.last_event_at >= :since) AS period_conversations,
+        COUNT(*) FILTER (WHERE cs.last_event_at >= :today_start) AS today_conversations,
+        COUNT(*) FILTER (WHERE cs.status IN ('closed', 'resolved') AND COALESCE(cs.closed_at, cs.updated_at) >= :since) AS closed_in_period,
+        AVG(EXTRACT(EPOCH FROM (cs.last_out_at - cs.last_in_at)))
+          FILTER (
+            WHERE cs.last_in_at IS NOT NULL
+              AND cs.last_out_at IS NOT NULL
+              AND cs.last_out_at >= cs.last_in_at
+              AND cs.last_event_at >= :since
+          ) AS avg_response_seconds,
+        MAX(cs.last_event_at) AS last_event_at
+      FROM conversation_states cs
+      GROUP BY cs.project_id
+    ),
+    event_stats AS (
+      SELECT
+        ce.project_id,
+        COUNT(*) AS total_messages,
+        COUNT(*) FILTER (WHERE ce.created_at >= :since) AS period_messages,
+        COUNT(*) FILTER (WHERE ce.created_at >= :today_start) AS today_messages,
+        COUNT(*) FILTER (WHERE ce.created_at >= :today_start AND ce.direction = 'in') AS inbound_today,
+        COUNT(*) FILTER (WHERE ce.created_at >= :today_start AND ce.direction = 'out') AS outbound_today,
+        COUNT(*) FILTER (WHERE ce.created_at >= :today_start AND ce.message_type = 'audio') AS audio_today,
+        COUNT(*) FILTER (
+          WHERE ce.created_at >= :today_start
+            AND (
+              ce.media IS NOT NULL
+              OR ce.message_type IN ('audio', 'image', 'video', 'document', 'sticker')
+            )
+        ) AS media_today
+      FROM conversation_events ce
+      GROUP BY ce.project_id
+    ),
+    channel_stats AS (
+      SELECT
+        ch.project_id,
+        COUNT(*) AS connected_channels,
+        COUNT(DISTINCT ch.channel_type) AS channel_type_count,
+        ARRAY_REMOVE(ARRAY_AGG(DISTINCT ch.channel_type), NULL) AS channel_types,
+        BOOL_OR(COALESCE(ch.access_token, '') <> '') AS has_channel_token
+      FROM channels ch
+      GROUP BY ch.project_id
+    ),
+    agent_stats AS (
+      SELECT
+        a.project_id,
+        COUNT(*) FILTER (WHERE a.is_active = true) AS active_agents
+      FROM agents a
+      GROUP BY a.project_id
+    ),
+    secret_stats AS (
+      SELECT
+        ps.project_id,
+        (COALESCE(ps.meta_master_token, '') <> '') AS has_meta_master_token,
+        (
+          COALESCE(ps.nextcloud_base_url, '') <> ''
+          AND COALESCE(ps.nextcloud_username, '') <> ''
+          AND COALESCE(ps.nextcloud_password, '') <> ''
+        ) AS has_storage
+      FROM project_secrets ps
+    )
+    SELECT
+      cp.client_id,
+      cp.client_name,
+      cp.slug,
+      cp.status,
+      cp.timezone,
+      cp.project_id::text AS project_id,
+      p.project_slug,
+      COALESCE(ss.total_conversations, 0) AS total_conversations,
+      COALESCE(ss.active_conversations, 0) AS active_conversations,
+      COALESCE(ss.open_conversations, 0) AS open_conversations,
+      COALESCE(ss.handoff_conversations, 0) AS handoff_conversations,
+      COALESCE(ss.period_conversations, 0) AS period_conversations,
+      COALESCE(ss.today_conversations, 0) AS today_conversations,
+      COALESCE(ss.closed_in_period, 0) AS closed_in_period,
+      ss.avg_response_seconds,
+      ss.last_event_at,
+      COALESCE(es.total_messages, 0) AS total_messages,
+      COALESCE(es.period_messages, 0) AS period_messages,
+      COALESCE(es.today_messages, 0) AS today_messages,
+      COALESCE(es.inbound_today, 0) AS inbound_today,
+      COALESCE(es.outbound_today, 0) AS outbound_today,
+      COALESCE(es.audio_today, 0) AS audio_today,
+      COALESCE(es.media_today, 0) AS media_today,
+      COALESCE(chs.connected_channels, 0) AS connected_channels,
+      COALESCE(chs.channel_type_count, 0) AS channel_type_count,
+      COALESCE(chs.channel_types, ARRAY[]::text[]) AS channel_types,
+      COALESCE(chs.has_channel_token, false) AS has_channel_token,
+      COALESCE(ags.active_agents, 0) AS active_agents,
+      COALESCE(sec.has_meta_master_token, false) AS has_meta_master_token,
+      COALESCE(sec.has_storage, false) AS has_storage
+    FROM client_projects cp
+    LEFT JOIN projects p ON p.id = cp.project_id
+    LEFT JOIN state_stats ss ON ss.project_id = cp.project_id
+    LEFT JOIN event_stats es ON es.project_id = cp.project_id
+    LEFT JOIN channel_stats chs ON chs.project_id = cp.project_id
+    LEFT JOIN agent_stats ags ON ags.project_id = cp.project_id
+    LEFT JOIN secret_stats sec ON sec.project_id = cp.project_id
+    ORDER BY cp.client_name
+    """
+)
+
+_OVERVIEW_STATES_SELECT = """
+    SELECT
+      {resolved_columns}
+      count(*) AS total,
+      count(*) FILTER (WHERE last_event_at >= :since) AS period,
+      count(*) FILTER (WHERE status NOT IN ('closed', 'handoff', 'do_not_contact')) AS active,
+      count(*) FILTER (WHERE status = 'closed' AND closed_at >= :since) AS closed_in_period,
+      AVG(EXTRACT(EPOCH FROM (last_out_at - last_in_at))) FILTER (
+        WHERE last_in_at IS NOT NULL
+          AND last_out_at IS NOT NULL
+          AND last_out_at >= last_in_at
+          AND last_event_at >= :since
+      ) AS avg_response_seconds
+    FROM conversation_states
+    WHERE project_id = {project}
+"""
+
+_OVERVIEW_EVENTS_SELECT = """
+    SELECT
+      {resolved_columns}
+      count(*) AS total,
+      count(*) FILTER (WHERE created_at >= :since) AS period
+    FROM conversation_events
+    WHERE project_id = {project}
+"""
+
+# The *_RESOLVING variants resolve the project in the same round trip (RESOLVE_PROJECT_CTE).
+_RESOLVED_COLUMNS = "(SELECT raw_pid FROM resolved) AS raw_pid, (SELECT pid FROM resolved) AS pid,"
+
+
+def _overview_statements(select_sql: str) -> tuple[TextClause, TextClause]:
+    by_pid = text(select_sql.format(resolved_columns="", project=":pid")).bindparams(
+        bindparam("pid", type_=Uuid(as_uuid=True))
+    )
+    resolving = text(
+        f"WITH {RESOLVE_PROJECT_CTE}"
+        + select_sql.format(resolved_columns=_RESOLVED_COLUMNS, project="(SELECT pid FROM resolved)")
+    ).bindparams(*RESOLVE_PROJECT_BINDPARAMS)
+    return by_pid, resolving
+
+
+_OVERVIEW_STATES_SQL, _OVERVIEW_STATES_RESOLVING_SQL = _overview_statements(_OVERVIEW_STATES_SELECT)
+_OVERVIEW_EVENTS_SQL, _OVERVIEW_EVENTS_RESOLVING_SQL = _overview_statements(_OVERVIEW_EVENTS_SELECT)
+
+_TIMELINE_SQL = text(
+    """
+    WITH bounds AS (
+      SELECT date_trunc('day', CAST(:since AS timestamptz)) AS start_day
+    ),
+    daily AS (
+      SELECT m.day, m.conversations, m.messages, m.refreshed_at
+      FROM mv_analytics_daily m, bounds b
+      WHERE m.project_id = :pid
+        AND m.day >= b.start_day
+    )
+    SELECT
+      to_char(d.day, 'YYYY-MM-DD') AS date,
+      COALESCE(daily.conversations, 0) AS conversations,
+      COALESCE(daily.messages, 0) AS messages,
+      daily.refreshed_at
+    FROM bounds b
+    CROSS JOIN LATERAL generate_series(b.start_day, date_trunc('day', now()), interval '1 day') AS d(day)
+    LEFT JOIN daily ON daily.day = d.day
+    ORDER BY d.day
+    """
+).bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+_VIEW_REFRESHED_AT_SQL = {
+    view_name: f"(SELECT refreshed_at FROM {view_name} LIMIT 1) AS {view_name}" for view_name in ANALYTICS_VIEWS
+}
+_RESOLVE_WITH_VERSION_SQL: dict[tuple[str, ...], TextClause] = {}
+
+_CHANNELS_SQL = text(
+    "SELECT channel_type AS bucket, sum(cnt) AS cnt, max(refreshed_at) AS refreshed_at "
+    "FROM mv_analytics_channels "
+    "WHERE project_id = :pid "
+    "  AND day >= date_trunc('day', CAST(:since AS timestamptz)) "
+    "GROUP BY channel_type "
+    "ORDER BY cnt DESC"
+).bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+_STATUS_SQL = text(
+    "SELECT status AS bucket, sum(cnt) AS cnt, max(refreshed_at) AS refreshed_at "
+    "FROM mv_analytics_status "
+    "WHERE project_id = :pid "
+    "  AND day >= date_trunc('day', CAST(:since AS timestamptz)) "
+    "GROUP BY status "
+    "ORDER BY cnt DESC"
+).bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+_HOURLY_SQL = text(
+    "SELECT hour AS bucket, sum(cnt) AS cnt, max(refreshed_at) AS refreshed_at "
+    "FROM mv_analytics_hourly "
+    "WHERE project_id = :pid "
+    "  AND day >= date_trunc('day', CAST(:since AS timestamptz)) "
+    "GROUP BY hour "
+    "ORDER BY hour"
+).bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+# Channels + status + hourly in one statement/round trip (dim tells the rows apart).
+_BREAKDOWN_SQL = text(
+    "SELECT 'channel' AS dim, channel_type AS bucket, sum(cnt) AS cnt, max(refreshed_at) AS refreshed_at "
+    "FROM mv_analytics_channels "
+    "WHERE project_id = :pid "
+    "  AND day >= date_trunc('day', CAST(:since AS timestamptz)) "
+    "GROUP BY channel_type "
+    "UNION ALL "
+    "SELECT 'status', status, sum(cnt), max(refreshed_at) "
+    "FROM mv_analytics_status "
+    "WHERE project_id = :pid "
+    "  AND day >= date_trunc('day', CAST(:since AS timestamptz)) "
+    "GROUP BY status "
+    "UNION ALL "
+    "SELECT 'hour', hour::text, sum(cnt), max(refreshed_at) "
+    "FROM mv_analytics_hourly "
+    "WHERE project_id = :pid "
+    "  AND day >= date_trunc('day', CAST(:hourly_since AS timestamptz)) "
+    "GROUP BY hour"
+).bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+
+# Dashboards poll these endpoints; responses are per-user, so only the browser may cache.
+ANALYTICS_CACHE_CONTROL = "private, max-age=30, stale-while-revalidate=60"
+
+
+def _resolve_with_version_sql(view_names: tuple[str, ...]) -> TextClause:
+    stmt = _RESOLVE_WITH_VERSION_SQL.get(view_names)
+    if stmt is None:
+        columns = ", ".join(_VIEW_REFRESHED_AT_SQL[view_name] for view_name in view_names)
+        stmt = text(
+            f"WITH {RESOLVE_PROJECT_CTE} SELECT raw_pid, pid, {columns} FROM resolved"
+        ).bindparams(*RESOLVE_PROJECT_BINDPARAMS)
+        _RESOLVE_WITH_VERSION_SQL[view_names] = stmt
+    return stmt
+
+
+async def _resolve_with_etag(
+    db: AsyncSession,
+    tenant_or_project_id: UUID,
+    current_user: DashboardUser,
+    *view_names: str,
+) -> tuple[str, str]:
+    """
+    Resolve the project and read the rollups' refreshed_at in one round trip.
+
+    The weak ETag changes when the rollups are refreshed or the UTC day turns over.
+    """
+    result = await db.execute(
+        _resolve_with_version_sql(view_names),
+        resolve_project_params(tenant_or_project_id, current_user),
+    )
+    row = result.mappings().first()
+    project_id = project_id_from_resolved(row)
+    if project_id is None:
+        project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
+
+    stamps = []
+    for view_name in view_names:
+        refreshed_at = row.get(view_name) if row else None
+        stamps.append(str(int(refreshed_at.timestamp())) if refreshed_at else "0")
+    today = datetime.now(timezone.utc).strftime("%Y%m%d")
+    return project_id, f'W/"{project_id}-{today}-{"-".join(stamps)}"'
+
+
+def _not_modified(request: Request, response: Response, etag: str | None = None) -> Response | None:
+    """Set caching headers; return a 304 when the client already has `etag`."""
+    response.headers["Cache-Control"] = ANALYTICS_CACHE_CONTROL
+    if not etag:
+        return None
+    response.headers["ETag"] = etag
+    if etag_matches(request, etag):
+        return not_modified_response(etag, ANALYTICS_CACHE_CONTROL)
+    return None
+
+
 def _format_duration(seconds: float | None) -> str:
     if seconds is None or seconds <= 0:
         return "—"
@@ -35,6 +354,22 @@ def _format_duration(seconds: float | None) -> str:
     return f"{mins}m"
 
 
+async def _first_row_in_session(stmt: TextClause, params: dict[str, Any]) -> dict[str, Any]:
+    """Run a query on a dedicated session (an AsyncSession serializes statements)."""
+    async with async_session() as session:
+        result = await session.execute(stmt, params)
+        row = result.mappings().first()
+        return dict(row) if row else {}
+
+
+def _staleness_seconds(rows: Any) -> float | None:
+    """Age of the materialized view snapshot behind `rows` (None when no rows matched)."""
+    refreshed = [r["refreshed_at"] for r in rows if r.get("refreshed_at")]
+    if not refreshed:
+        return None
+    return round((datetime.now(timezone.utc) - max(refreshed)).total_seconds(), 1)
+
+
 def _require_admin(current_user: DashboardUser) -> None:
     if current_user.role != "admin":
         raise HTTPException(
@@ -90,143 +425,21 @@ def _resolve_company_health(row: dict[str, Any], alerts: list[str]) -> str:
 
 @router.get("/admin/overview")
 async def get_admin_overview(
+    request: Request,
+    response: Response,
     days: int = Query(default=30, ge=1, le=365),
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
 ) -> dict[str, Any]:
     _require_admin(current_user)
+    _not_modified(request, response)
 
     now = datetime.now(timezone.utc)
     since = now - timedelta(days=days)
     today_start = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
 
     result = await db.execute(
-        text(
-            """
-            WITH client_projects AS (
-              SELECT
-                c.id::text AS client_id,
-                c.name AS client_name,
-                c.slug,
-                c.status,
-                c.timezone,
-                c.settings,
-                CASE
-                  WHEN COALESCE(c.settings->>'project_id', '') ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
-                  THEN (c.settings->>'project_id')::uuid
-                  ELSE NULL
-                END AS project_id
-              FROM clients c
-            ),
-            state_stats AS (
-              SELECT
-                cs.project_id,
-                COUNT(*) AS total_conversations,
-                COUNT(*) FILTER (WHERE cs.status NOT IN ('closed', 'resolved', 'do_not_contact')) AS active_conversations,
-                COUNT(*) FILTER (WHERE cs.status = 'open') AS open_conversations,
-                COUNT(*) FILTER (WHERE cs.status = 'handoff') AS handoff_conversations,
-                COUNT(*) FILTER (WHERE cs.last_event_at >= :since) AS period_conversations,
-                COUNT(*) FILTER (WHERE cs.last_event_at >= :today_start) AS today_conversations,
-                COUNT(*) FILTER (WHERE cs.status IN ('closed', 'resolved') AND COALESCE(cs.closed_at, cs.updated_at) >= :since) AS closed_in_period,
-                AVG(EXTRACT(EPOCH FROM (cs.last_out_at - cs.last_in_at)))
-                  FILTER (
-                    WHERE cs.last_in_at IS NOT NULL
-                      AND cs.last_out_at IS NOT NULL
-                      AND cs.last_out_at >= cs.last_in_at
-                      AND cs.last_event_at >= :since
-                  ) AS avg_response_seconds,
-                MAX(cs.last_event_at) AS last_event_at
-              FROM conversation_states cs
-              GROUP BY cs.project_id
-            ),
-            event_stats AS (
-              SELECT
-                ce.project_id,
-                COUNT(*) AS total_messages,
-                COUNT(*) FILTER (WHERE ce.created_at >= :since) AS period_messages,
-                COUNT(*) FILTER (WHERE ce.created_at >= :today_start) AS today_messages,
-                COUNT(*) FILTER (WHERE ce.created_at >= :today_start AND ce.direction = 'in') AS inbound_today,
-                COUNT(*) FILTER (WHERE ce.created_at >= :today_start AND ce.direction = 'out') AS outbound_today,
-                COUNT(*) FILTER (WHERE ce.created_at >= :today_start AND ce.message_type = 'audio') AS audio_today,
-                COUNT(*) FILTER (
-                  WHERE ce.created_at >= :today_start
-                    AND (
-                      ce.media IS NOT NULL
-                      OR ce.message_type IN ('audio', 'image', 'video', 'document', 'sticker')
-                    )
-                ) AS media_today
-              FROM conversation_events ce
-              GROUP BY ce.project_id
-            ),
-            channel_stats AS (
-              SELECT
-                ch.project_id,
-                COUNT(*) AS connected_channels,
-                COUNT(DISTINCT ch.channel_type) AS channel_type_count,
-                ARRAY_REMOVE(ARRAY_AGG(DISTINCT ch.channel_type), NULL) AS channel_types,
-                BOOL_OR(COALESCE(ch.access_token, '') <> '') AS has_channel_token
-              FROM channels ch
-              GROUP BY ch.project_id
-            ),
-            agent_stats AS (
-              SELECT
-                a.project_id,
-                COUNT(*) FILTER (WHERE a.is_active = true) AS active_agents
-              FROM agents a
-              GROUP BY a.project_id
-            ),
-            secret_stats AS (
-              SELECT
-                ps.project_id,
-                (COALESCE(ps.meta_master_token, '') <> '') AS has_meta_master_token,
-                (
-                  COALESCE(ps.nextcloud_base_url, '') <> ''
-                  AND COALESCE(ps.nextcloud_username, '') <> ''
-                  AND COALESCE(ps.nextcloud_password, '') <> ''
-                ) AS has_storage
-              FROM project_secrets ps
-            )
-            SELECT
-              cp.client_id,
-              cp.client_name,
-              cp.slug,
-              cp.status,
-              cp.timezone,
-              cp.project_id::text AS project_id,
-              p.project_slug,
-              COALESCE(ss.total_conversations, 0) AS total_conversations,
-              COALESCE(ss.active_conversations, 0) AS active_conversations,
-              COALESCE(ss.open_conversations, 0) AS open_conversations,
-              COALESCE(ss.handoff_conversations, 0) AS handoff_conversations,
-              COALESCE(ss.period_conversations, 0) AS period_conversations,
-              COALESCE(ss.today_conversations, 0) AS today_conversations,
-              COALESCE(ss.closed_in_period, 0) AS closed_in_period,
-              ss.avg_response_seconds,
-              ss.last_event_at,
-              COALESCE(es.total_messages, 0) AS total_messages,
-              COALESCE(es.period_messages, 0) AS period_messages,
-              COALESCE(es.today_messages, 0) AS today_messages,
-              COALESCE(es.inbound_today, 0) AS inbound_today,
-              COALESCE(es.outbound_today, 0) AS outbound_today,
-              COALESCE(es.audio_today, 0) AS audio_today,
-              COALESCE(es.media_today, 0) AS media_today,
-              COALESCE(chs.connected_channels, 0) AS connected_channels,
-              COALESCE(chs.channel_type_count, 0) AS channel_type_count,
-              COALESCE(chs.channel_types, ARRAY[]::text[]) AS channel_types,
-              COALESCE(chs.has_channel_token, false) AS has_channel_token,
-              COALESCE(ags.active_agents, 0) AS active_agents,
-              COALESCE(sec.has_meta_master_token, false) AS has_meta_master_token,
-              COALESCE(sec.has_storage, false) AS has_storage
-            FROM client_projects cp
-            LEFT JOIN projects p ON p.id = cp.project_id
-            LEFT JOIN state_stats ss ON ss.project_id = cp.project_id
-            LEFT JOIN event_stats es ON es.project_id = cp.project_id
-            LEFT JOIN channel_stats chs ON chs.project_id = cp.project_id
-            LEFT JOIN agent_stats ags ON ags.project_id = cp.project_id
-            LEFT JOIN secret_stats sec ON sec.project_id = cp.project_id
-            ORDER BY cp.client_name
-            """
-        ),
+        _ADMIN_OVERVIEW_SQL,
         {"since": since, "today_start": today_start},
     )
 
@@ -328,7 +541,9 @@ async def get_admin_overview(
 
 @router.get("/analytics/overview/{tenant_or_project_id}")
 async def get_analytics_overview(
-    tenant_or_project_id: str,
+    tenant_or_project_id: UUID,
+    request: Request,
+    response: Response,
     days: int = Query(default=30, ge=1, le=365),
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
@@ -340,75 +555,33 @@ async def get_analytics_overview(
     - dashboard clients.id (tenant), OR
     - multitenant projects.id
     """
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
-    project_uuid = UUID(project_id)
-
+    _not_modified(request, response)
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
-    total_conv = await db.execute(
-        text("SELECT count(*) FROM conversation_states WHERE project_id = (:pid)::uuid"),
-        {"pid": str(project_uuid)},
-    )
-    total_conversations = int(total_conv.scalar_one() or 0)
-
-    period_conv = await db.execute(
-        text(
-            "SELECT count(*) FROM conversation_states "
-            "WHERE project_id = (:pid)::uuid AND last_event_at >= :since"
-        ),
-        {"pid": str(project_uuid), "since": since},
-    )
-    period_conversations = int(period_conv.scalar_one() or 0)
-
-    active_conv = await db.execute(
-        text(
-            "SELECT count(*) FROM conversation_states "
-            "WHERE project_id = (:pid)::uuid AND status NOT IN ('closed','handoff','do_not_contact')"
-        ),
-        {"pid": str(project_uuid)},
+    # One scan per table; both run concurrently on separate sessions and
+    # resolve the project in the same round trip.
+    params = {**resolve_project_params(tenant_or_project_id, current_user), "since": since}
+    state_row, event_row = await asyncio.gather(
+        _first_row_in_session(_OVERVIEW_STATES_RESOLVING_SQL, params),
+        _first_row_in_session(_OVERVIEW_EVENTS_RESOLVING_SQL, params),
     )
-    active_conversations = int(active_conv.scalar_one() or 0)
-
-    closed_period = await db.execute(
-        text(
-            "SELECT count(*) FROM conversation_states "
-            "WHERE project_id = (:pid)::uuid AND status = 'closed' AND closed_at >= :since"
-        ),
-        {"pid": str(project_uuid), "since": since},
-    )
-    closed_in_period = int(closed_period.scalar_one() or 0)
+    if project_id_from_resolved(state_row) is None:
+        project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
+        params = {"pid": UUID(project_id), "since": since}
+        state_row, event_row = await asyncio.gather(
+            _first_row_in_session(_OVERVIEW_STATES_SQL, params),
+            _first_row_in_session(_OVERVIEW_EVENTS_SQL, params),
+        )
+    total_conversations = int(state_row.get("total") or 0)
+    period_conversations = int(state_row.get("period") or 0)
+    active_conversations = int(state_row.get("active") or 0)
+    closed_in_period = int(state_row.get("closed_in_period") or 0)
+    avg_response_seconds = state_row.get("avg_response_seconds")
+    total_messages = int(event_row.get("total") or 0)
+    period_messages = int(event_row.get("period") or 0)
 
     resolution_rate = round((closed_in_period / period_conversations) * 100, 1) if period_conversations else 0.0
 
-    total_msgs = await db.execute(
-        text("SELECT count(*) FROM conversation_events WHERE project_id = (:pid)::uuid"),
-        {"pid": str(project_uuid)},
-    )
-    total_messages = int(total_msgs.scalar_one() or 0)
-
-    period_msgs = await db.execute(
-        text(
-            "SELECT count(*) FROM conversation_events "
-            "WHERE project_id = (:pid)::uuid AND created_at >= :since"
-        ),
-        {"pid": str(project_uuid), "since": since},
-    )
-    period_messages = int(period_msgs.scalar_one() or 0)
-
-    avg_resp = await db.execute(
-        text(
-            "SELECT AVG(EXTRACT(EPOCH FROM (last_out_at - last_in_at))) "
-            "FROM conversation_states "
-            "WHERE project_id = (:pid)::uuid "
-            "  AND last_in_at IS NOT NULL "
-            "  AND last_out_at IS NOT NULL "
-            "  AND last_out_at >= last_in_at "
-            "  AND last_event_at >= :since"
-        ),
-        {"pid": str(project_uuid), "since": since},
-    )
-    avg_response_seconds = avg_resp.scalar_one_or_none()
-
     return {
         "total_conversations": total_conversations,
         "period_conversations": period_conversations,
@@ -423,7 +596,9 @@ async def get_analytics_overview(
 
 @router.get("/analytics/timeline/{tenant_or_project_id}")
 async def get_analytics_timeline(
-    tenant_or_project_id: str,
+    tenant_or_project_id: UUID,
+    request: Request,
+    response: Response,
     days: int = Query(default=30, ge=1, le=365),
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
@@ -431,59 +606,63 @@ async def get_analytics_timeline(
     """
     Timeline de conversas e mensagens por dia (real data).
     """
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
+    project_id, etag = await _resolve_with_etag(db, tenant_or_project_id, current_user, "mv_analytics_daily")
     project_uuid = UUID(project_id)
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
 
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
     rows = await db.execute(
-        text(
-            """
-            WITH days AS (
-              SELECT generate_series(
-                date_trunc('day', CAST(:since AS timestamptz)),
-                date_trunc('day', now()),
-                interval '1 day'
-              ) AS day
-            ),
-            conv AS (
-              SELECT date_trunc('day', last_event_at) AS day, count(*) AS conversations
-              FROM conversation_states
-              WHERE project_id = (:pid)::uuid
-                AND last_event_at >= :since
-              GROUP BY 1
-            ),
-            msgs AS (
-              SELECT date_trunc('day', created_at) AS day, count(*) AS messages
-              FROM conversation_events
-              WHERE project_id = (:pid)::uuid
-                AND created_at >= :since
-              GROUP BY 1
-            )
-            SELECT
-              to_char(d.day, 'YYYY-MM-DD') AS date,
-              COALESCE(c.conversations, 0) AS conversations,
-              COALESCE(m.messages, 0) AS messages
-            FROM days d
-            LEFT JOIN conv c ON c.day = d.day
-            LEFT JOIN msgs m ON m.day = d.day
-            ORDER BY d.day
-            """
-        ),
-        {"pid": str(project_uuid), "since": since},
+        _TIMELINE_SQL,
+        {"pid": project_uuid, "since": since},
     )
 
+    rows = rows.mappings().all()
     timeline = [
         {"date": r["date"], "conversations": int(r["conversations"]), "messages": int(r["messages"])}
-        for r in rows.mappings().all()
+        for r in rows
     ]
 
-    return {"timeline": timeline}
+    return {"timeline": timeline, "staleness_seconds": _staleness_seconds(rows)}
+
+
+def _channel_items(rows: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    rows = sorted(rows, key=lambda r: int(r["cnt"]), reverse=True)
+    total = sum(int(r["cnt"]) for r in rows) or 0
+    return [
+        {
+            "name": str(r["bucket"]),
+            "count": int(r["cnt"]),
+            "percentage": round((int(r["cnt"]) / total) * 100, 1) if total else 0.0,
+        }
+        for r in rows
+    ]
+
+
+def _status_items(rows: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    rows = sorted(rows, key=lambda r: int(r["cnt"]), reverse=True)
+    return [{"name": str(r["bucket"]), "count": int(r["cnt"])} for r in rows]
+
+
+def _hourly_items(rows: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    counts = {int(r["bucket"]): int(r["cnt"]) for r in rows}
+    return [{"hour": h, "count": int(counts.get(h, 0))} for h in range(24)]
+
+
+async def _query_rollup(
+    db: AsyncSession, stmt: TextClause, project_uuid: UUID, since: datetime
+) -> list[Mapping[str, Any]]:
+    result = await db.execute(stmt, {"pid": project_uuid, "since": since})
+    return result.mappings().all()
 
 
 @router.get("/analytics/channels/{tenant_or_project_id}")
 async def get_analytics_channels(
-    tenant_or_project_id: str,
+    tenant_or_project_id: UUID,
+    request: Request,
+    response: Response,
     days: int = Query(default=30, ge=1, le=365),
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
@@ -491,40 +670,23 @@ async def get_analytics_channels(
     """
     Distribuição de conversas por canal (real data).
     """
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
+    project_id, etag = await _resolve_with_etag(db, tenant_or_project_id, current_user, "mv_analytics_channels")
     project_uuid = UUID(project_id)
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
 
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
-    result = await db.execute(
-        text(
-            "SELECT channel_type, count(*) AS cnt "
-            "FROM conversation_states "
-            "WHERE project_id = (:pid)::uuid "
-            "  AND last_event_at >= :since "
-            "GROUP BY channel_type "
-            "ORDER BY cnt DESC"
-        ),
-        {"pid": str(project_uuid), "since": since},
-    )
-
-    rows = result.mappings().all()
-    total = sum(int(r["cnt"]) for r in rows) or 0
-    channels = [
-        {
-            "name": str(r["channel_type"]),
-            "count": int(r["cnt"]),
-            "percentage": round((int(r["cnt"]) / total) * 100, 1) if total else 0.0,
-        }
-        for r in rows
-    ]
-
-    return {"channels": channels}
+    rows = await _query_rollup(db, _CHANNELS_SQL, project_uuid, since)
+    return {"channels": _channel_items(rows), "staleness_seconds": _staleness_seconds(rows)}
 
 
 @router.get("/analytics/status/{tenant_or_project_id}")
 async def get_analytics_status(
-    tenant_or_project_id: str,
+    tenant_or_project_id: UUID,
+    request: Request,
+    response: Response,
     days: int = Query(default=30, ge=1, le=365),
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
@@ -532,30 +694,23 @@ async def get_analytics_status(
     """
     Distribuição de conversas por status (real data).
     """
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
+    project_id, etag = await _resolve_with_etag(db, tenant_or_project_id, current_user, "mv_analytics_status")
     project_uuid = UUID(project_id)
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
 
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
-    result = await db.execute(
-        text(
-            "SELECT status, count(*) AS cnt "
-            "FROM conversation_states "
-            "WHERE project_id = (:pid)::uuid "
-            "  AND last_event_at >= :since "
-            "GROUP BY status "
-            "ORDER BY cnt DESC"
-        ),
-        {"pid": str(project_uuid), "since": since},
-    )
-
-    statuses = [{"name": str(r["status"]), "count": int(r["cnt"])} for r in result.mappings().all()]
-    return {"statuses": statuses}
+    rows = await _query_rollup(db, _STATUS_SQL, project_uuid, since)
+    return {"statuses": _status_items(rows), "staleness_seconds": _staleness_seconds(rows)}
 
 
 @router.get("/analytics/hourly/{tenant_or_project_id}")
 async def get_analytics_hourly(
-    tenant_or_project_id: str,
+    tenant_or_project_id: UUID,
+    request: Request,
+    response: Response,
     days: int = Query(default=7, ge=1, le=90),
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
@@ -563,23 +718,61 @@ async def get_analytics_hourly(
     """
     Distribuição por hora do dia baseada em mensagens (conversation_events).
     """
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
+    project_id, etag = await _resolve_with_etag(db, tenant_or_project_id, current_user, "mv_analytics_hourly")
     project_uuid = UUID(project_id)
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
 
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
+    rows = await _query_rollup(db, _HOURLY_SQL, project_uuid, since)
+    return {"hourly": _hourly_items(rows), "period_days": days, "staleness_seconds": _staleness_seconds(rows)}
+
+
+@router.get("/analytics/breakdown/{tenant_or_project_id}")
+@router.get("/analytics/all/{tenant_or_project_id}")
+async def get_analytics_breakdown(
+    tenant_or_project_id: UUID,
+    request: Request,
+    response: Response,
+    days: int = Query(default=30, ge=1, le=365),
+    hourly_days: int = Query(default=7, ge=1, le=90),
+    db: AsyncSession = Depends(get_db),
+    current_user: DashboardUser = Depends(get_current_user),
+) -> dict[str, Any]:
+    """
+    Canais + status + distribuição por hora em uma única chamada
+    (uma consulta UNION ALL sobre os três rollups).
+    """
+    project_id, etag = await _resolve_with_etag(
+        db, tenant_or_project_id, current_user, "mv_analytics_channels", "mv_analytics_status", "mv_analytics_hourly"
+    )
+    project_uuid = UUID(project_id)
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(days=days)
+    hourly_since = now - timedelta(days=hourly_days)
+
     result = await db.execute(
-        text(
-            "SELECT EXTRACT(HOUR FROM created_at) AS hour, count(*) AS cnt "
-            "FROM conversation_events "
-            "WHERE project_id = (:pid)::uuid "
-            "  AND created_at >= :since "
-            "GROUP BY 1 "
-            "ORDER BY 1"
-        ),
-        {"pid": str(project_uuid), "since": since},
+        _BREAKDOWN_SQL,
+        {"pid": project_uuid, "since": since, "hourly_since": hourly_since},
     )
-    rows = {int(r["hour"]): int(r["cnt"]) for r in result.mappings().all()}
+    rows_by_dim: dict[str, list[Mapping[str, Any]]] = {"channel": [], "status": [], "hour": []}
+    for row in result.mappings().all():
+        rows_by_dim[row["dim"]].append(row)
+    stalenesses = [
+        v for v in (_staleness_seconds(dim_rows) for dim_rows in rows_by_dim.values()) if v is not None
+    ]
 
-    hourly = [{"hour": h, "count": int(rows.get(h, 0))} for h in range(24)]
-    return {"hourly": hourly, "period_days": days}
+    return {
+        "channels": _channel_items(rows_by_dim["channel"]),
+        "statuses": _status_items(rows_by_dim["status"]),
+        "hourly": _hourly_items(rows_by_dim["hour"]),
+        "period_days": days,
+        "hourly_period_days": hourly_days,
+        "staleness_seconds": max(stalenesses) if stalenesses else None,
+    }
@@ -4,22 +4,31 @@ Authentication routes for SuperBot Dashboard
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import delete, select, func
+from sqlalchemy.orm import joinedload
 from pydantic import BaseModel
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import asyncio
+import bcrypt
 import hashlib
+import hmac
 import jwt
 import os
+import time
 import uuid
 
+from app.core.cache import TTLCache
 from app.db.database import get_db
-from app.db.models import DashboardUser, Session as DBSession, Client
+from app.db.models import Client, DashboardUser, Session as DBSession
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 security = HTTPBearer()
 
 # JWT Config
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
+_SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
 ALGORITHM = "HS256"
 
 
@@ -34,7 +43,144 @@ def _int_env(name: str, default: int) -> int:
 
 
 ACCESS_TOKEN_EXPIRE_HOURS = _int_env("ACCESS_TOKEN_EXPIRE_HOURS", 24)
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_HOURS * 3600
 SESSION_EXPIRE_DAYS = _int_env("SESSION_EXPIRE_DAYS", 30)
+BCRYPT_ROUNDS = _int_env("BCRYPT_ROUNDS", 12)
+USER_CACHE_TTL_SECONDS = _int_env("USER_CACHE_TTL_SECONDS", 30)
+
+
+@dataclass(frozen=True)
+class _UserSnapshot:
+    """Cached, session-independent copy of the fields routes read from current_user."""
+    id: uuid.UUID
+    email: str
+    name: str
+    role: str
+    client_id: uuid.UUID | None
+    client_name: str | None
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: DashboardUser) -> "_UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            client_id=user.client_id,
+            client_name=user.client.name if user.client else None,
+            is_active=bool(user.is_active),
+        )
+
+    def to_user(self) -> DashboardUser:
+        # Fresh transient instance per request, so handlers can't leak mutations into the cache.
+        user = DashboardUser(
+            id=self.id,
+            email=self.email,
+            name=self.name,
+            role=self.role,
+            client_id=self.client_id,
+            is_active=self.is_active,
+        )
+        if self.client_id:
+            user.client = Client(id=self.client_id, name=self.client_name)
+        return user
+
+
+_user_cache: TTLCache[_UserSnapshot] = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL_SECONDS)
+# session id -> (user id, expires_at); lets read requests skip the sessions lookup.
+_session_cache: TTLCache[tuple[uuid.UUID, datetime]] = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL_SECONDS)
+
+# token -> verified payload; a hit only re-checks `exp` instead of re-verifying the signature.
+_token_cache: TTLCache[dict] = TTLCache(
+    maxsize=_int_env("JWT_DECODE_CACHE_SIZE", 50_000),
+    ttl=ACCESS_TOKEN_EXPIRE_SECONDS,
+)
+
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _cached_session_is_valid(session_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+    cached = _session_cache.get(session_id)
+    if not cached:
+        return False
+    cached_user_id, expires_at = cached
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return cached_user_id == user_id and expires_at > datetime.now(timezone.utc)
+
+
+def _user_from_claims(payload: dict, snapshot: _UserSnapshot) -> DashboardUser | None:
+    """
+    Build a transient user from token claims (None for tokens issued without them).
+
+    Only the access fields (id, role, client_id) come from the claims; changing
+    them revokes the sessions. Display fields (name, email, client name) can
+    change without a new login, so they come from the cached user row.
+    """
+    if "client_id" not in payload or not payload.get("role"):
+        return None
+    try:
+        client_id = uuid.UUID(str(payload["client_id"])) if payload.get("client_id") else None
+    except ValueError:
+        return None
+    user = DashboardUser(
+        id=snapshot.id,
+        email=snapshot.email,
+        name=snapshot.name,
+        role=payload["role"],
+        client_id=client_id,
+        is_active=True,
+    )
+    if client_id:
+        client_name = snapshot.client_name if snapshot.client_id == client_id else payload.get("client_name")
+        user.client = Client(id=client_id, name=client_name)
+    return user
+
+
+async def _load_user_snapshot(user_id: uuid.UUID, db: AsyncSession) -> _UserSnapshot:
+    """Cached user row; 401 when the user is gone or inactive."""
+    snapshot = _user_cache.get(user_id)
+    if snapshot is None:
+        result = await db.execute(
+            select(DashboardUser)
+            .options(joinedload(DashboardUser.client))
+            .where(DashboardUser.id == user_id)
+        )
+        user = result.scalar_one_or_none()
+        if user:
+            snapshot = _UserSnapshot.from_user(user)
+            _user_cache.set(user_id, snapshot)
+
+    if not snapshot or not snapshot.is_active:
+        raise HTTPException(status_code=401, detail="Usuário não encontrado ou inativo")
+    return snapshot
+
+
+async def revoke_user_sessions(user_id: uuid.UUID | str, db: AsyncSession) -> None:
+    """
+    Delete every session of a user, forcing a new login.
+
+    Use when role/client/is_active change: tokens carry those as claims,
+    so the old tokens must stop being accepted.
+    """
+    uid = uuid.UUID(str(user_id))
+    result = await db.execute(
+        delete(DBSession).where(DBSession.user_id == uid).returning(DBSession.id)
+    )
+    for session_id in result.scalars().all():
+        _session_cache.pop(session_id, None)
+    invalidate_cached_user(uid)
+
+
+def invalidate_cached_user(user_id: uuid.UUID | str | None) -> None:
+    """Drop a user from the auth cache (call after changing role/client/is_active)."""
+    if not user_id:
+        return
+    try:
+        _user_cache.pop(uuid.UUID(str(user_id)), None)
+    except ValueError:
+        pass
 
 
 # Schemas
@@ -53,14 +199,48 @@ class UserResponse(BaseModel):
 
 
 # Helper functions
+def _password_bytes(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes (and bcrypt>=5 rejects longer input).
+    return password.encode("utf-8")[:72]
+
+
 def hash_password(password: str) -> str:
-    """Hash password with SHA256 for dev."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password with bcrypt (salted, cost BCRYPT_ROUNDS). CPU-bound: use hash_password_async from handlers."""
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("ascii")
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True for legacy unsalted SHA-256 hashes created before bcrypt."""
+    return not (hashed or "").startswith("$2")
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    """Verify password against hash (SHA256)."""
-    return hashlib.sha256(password.encode()).hexdigest() == hashed
+    """Verify password against a bcrypt hash (or a legacy SHA-256 hex digest)."""
+    if not hashed:
+        return False
+    if password_needs_rehash(hashed):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, hashed)
+    try:
+        return bcrypt.checkpw(_password_bytes(password), hashed.encode("ascii"))
+    except ValueError:
+        return False
+
+
+# Password hashing gets its own pool: a login burst neither queues behind nor starves
+# the blocking SDK calls (Gemini, ElevenLabs, media writes) on asyncio's default executor.
+_password_pool = ThreadPoolExecutor(
+    max_workers=_int_env("PASSWORD_HASH_WORKERS", min(8, (os.cpu_count() or 1) * 2)),
+    thread_name_prefix="password-hash",
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_password_pool, hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_password_pool, verify_password, password, hashed)
 
 
 def create_access_token(
@@ -68,26 +248,41 @@ def create_access_token(
     email: str,
     role: str,
     session_id: str | None = None,
+    name: str | None = None,
+    client_id: str | None = None,
+    client_name: str | None = None,
 ) -> tuple[str, datetime]:
-    """Create JWT access token"""
-    expires_at = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    """Create JWT access token (identity claims let read requests skip the user lookup)."""
+    iat = int(time.time())
+    exp = iat + ACCESS_TOKEN_EXPIRE_SECONDS
     payload = {
         "sub": user_id,
         "email": email,
         "role": role,
-        "exp": expires_at
+        "name": name or "",
+        "client_id": client_id,
+        "client_name": client_name,
+        "iat": iat,
+        "exp": exp,
     }
     if session_id:
         payload["sid"] = session_id
-    token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
-    return token, expires_at
+    token = jwt.encode(payload, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
+    return token, datetime.fromtimestamp(exp, tz=timezone.utc)
 
 
 def decode_token(token: str) -> dict:
-    """Decode and verify JWT token"""
+    """Decode and verify JWT token (memoized per token until it expires)."""
+    cached = _token_cache.get(token)
+    if cached is not None:
+        if cached.get("exp", 0) <= time.time():
+            _token_cache.pop(token, None)
+            raise HTTPException(status_code=401, detail="Token expirado")
+        return dict(cached)
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
+        _token_cache.set(token, payload)
+        return dict(payload)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expirado")
     except jwt.InvalidTokenError:
@@ -99,7 +294,7 @@ def decode_token_allow_expired(token: str) -> dict:
     try:
         payload = jwt.decode(
             token,
-            SECRET_KEY,
+            _SECRET_KEY_BYTES,
             algorithms=[ALGORITHM],
             options={"verify_exp": False},
         )
@@ -109,11 +304,29 @@ def decode_token_allow_expired(token: str) -> dict:
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> DashboardUser:
-    """Get current authenticated user"""
+    """
+    Get current authenticated user.
+
+    Read-only requests are served from the token claims plus a short-lived
+    session cache; writes always re-check the session and user rows. The
+    result is memoized on request.state, so resolving it again within the
+    same request (outside FastAPI's dependency cache) costs nothing.
+    """
     token = credentials.credentials
+    cached = getattr(request.state, "current_user", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
+    user = await _resolve_current_user(request, token, db)
+    request.state.current_user = (token, user)
+    return user
+
+
+async def _resolve_current_user(request: Request, token: str, db: AsyncSession) -> DashboardUser:
     payload = decode_token(token)
 
     try:
@@ -121,6 +334,8 @@ async def get_current_user(
     except Exception:
         raise HTTPException(status_code=401, detail="Token inválido")
 
+    read_only = request.method in READ_ONLY_METHODS
+
     # Ensure token maps to an active session (supports server-side revoke + refresh).
     session = None
     sid = payload.get("sid")
@@ -130,14 +345,23 @@ async def get_current_user(
         except Exception:
             raise HTTPException(status_code=401, detail="Token inválido")
 
-        session_result = await db.execute(
-            select(DBSession).where(
-                DBSession.id == session_id,
-                DBSession.user_id == user_id,
-                DBSession.expires_at > func.now(),
+        if read_only and _cached_session_is_valid(session_id, user_id):
+            snapshot = await _load_user_snapshot(user_id, db)
+            return _user_from_claims(payload, snapshot) or snapshot.to_user()
+        else:
+            session_result = await db.execute(
+                select(DBSession).where(
+                    DBSession.id == session_id,
+                    DBSession.user_id == user_id,
+                    DBSession.expires_at > func.now(),
+                )
             )
-        )
-        session = session_result.scalar_one_or_none()
+            session = session_result.scalar_one_or_none()
+            if session:
+                _session_cache.set(session_id, (user_id, session.expires_at))
+                if read_only:
+                    snapshot = await _load_user_snapshot(user_id, db)
+                    return _user_from_claims(payload, snapshot) or snapshot.to_user()
     else:
         # Legacy tokens created before `sid` was introduced.
         session_result = await db.execute(
@@ -153,13 +377,8 @@ async def get_current_user(
     if not session:
         raise HTTPException(status_code=401, detail="Sessão expirada")
 
-    result = await db.execute(select(DashboardUser).where(DashboardUser.id == user_id))
-    user = result.scalar_one_or_none()
-    
-    if not user or not user.is_active:
-        raise HTTPException(status_code=401, detail="Usuário não encontrado ou inativo")
-    
-    return user
+    snapshot = await _load_user_snapshot(user_id, db)
+    return snapshot.to_user()
 
 
 # Routes
@@ -172,11 +391,13 @@ async def login(
     """Login endpoint"""
     # Find user by email (username é tratado como email)
     result = await db.execute(
-        select(DashboardUser).where(DashboardUser.email == request.username)
+        select(DashboardUser)
+        .options(joinedload(DashboardUser.client))
+        .where(DashboardUser.email == request.username)
     )
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user or not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário ou senha incorretos"
@@ -195,6 +416,9 @@ async def login(
         user.email,
         user.role,
         session_id=str(session_id),
+        name=user.name,
+        client_id=str(user.client_id) if user.client_id else None,
+        client_name=user.client.name if user.client else None,
     )
     
     # Save session
@@ -203,24 +427,21 @@ async def login(
         user_id=user.id,
         token=token,
         # Session expiry is longer than access-token expiry to allow refresh.
-        expires_at=datetime.utcnow() + timedelta(days=SESSION_EXPIRE_DAYS),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=SESSION_EXPIRE_DAYS),
         ip_address=req.client.host if req.client else None,
         user_agent=req.headers.get("user-agent")
     )
     db.add(session)
     
+    # Transparently upgrade legacy SHA-256 hashes on successful login.
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(request.password)
+
     # Update last login
-    user.last_login = datetime.utcnow()
+    user.last_login = datetime.now(timezone.utc)
     await db.commit()
     
-    # Get client info if exists
-    client_name = None
-    if user.client_id:
-        result = await db.execute(
-            select(Client).where(Client.id == user.client_id)
-        )
-        client = result.scalar_one_or_none()
-        client_name = client.name if client else None
+    client_name = user.client.name if user.client else None
     
     return {
         "access_token": token,
@@ -282,7 +503,11 @@ async def refresh(
     if not session:
         raise HTTPException(status_code=401, detail="Sessão expirada")
 
-    result = await db.execute(select(DashboardUser).where(DashboardUser.id == user_id))
+    result = await db.execute(
+        select(DashboardUser)
+        .options(joinedload(DashboardUser.client))
+        .where(DashboardUser.id == user_id)
+    )
     user = result.scalar_one_or_none()
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="Usuário não encontrado ou inativo")
@@ -292,10 +517,13 @@ async def refresh(
         user.email,
         user.role,
         session_id=str(session.id),
+        name=user.name,
+        client_id=str(user.client_id) if user.client_id else None,
+        client_name=user.client.name if user.client else None,
     )
 
     # Sliding session expiration + best-effort metadata update.
-    session.expires_at = datetime.utcnow() + timedelta(days=SESSION_EXPIRE_DAYS)
+    session.expires_at = datetime.now(timezone.utc) + timedelta(days=SESSION_EXPIRE_DAYS)
     try:
         session.ip_address = req.client.host if req.client else session.ip_address
         session.user_agent = req.headers.get("user-agent") or session.user_agent
@@ -318,47 +546,40 @@ async def logout(
 ):
     """Logout endpoint"""
     token = credentials.credentials
+    _token_cache.pop(token, None)
 
-    session = None
+    # Single DELETE ... RETURNING by primary key (sid claim) or by the unique token.
+    condition = DBSession.token == token
     try:
         payload = decode_token_allow_expired(token)
         sid = payload.get("sid")
         if sid:
             try:
-                session_id = uuid.UUID(str(sid))
+                condition = DBSession.id == uuid.UUID(str(sid))
             except Exception:
-                session_id = None
-            if session_id:
-                result = await db.execute(select(DBSession).where(DBSession.id == session_id))
-                session = result.scalar_one_or_none()
-        else:
-            result = await db.execute(select(DBSession).where(DBSession.token == token))
-            session = result.scalar_one_or_none()
+                pass
     except HTTPException:
         # Best-effort: token might be invalid but we can still try by token string.
-        result = await db.execute(select(DBSession).where(DBSession.token == token))
-        session = result.scalar_one_or_none()
+        pass
 
-    if session:
-        await db.delete(session)
+    result = await db.execute(
+        delete(DBSession).where(condition).returning(DBSession.id, DBSession.user_id)
+    )
+    deleted = result.first()
+    if deleted:
+        _session_cache.pop(deleted.id, None)
+        invalidate_cached_user(deleted.user_id)
         await db.commit()
-    
+
     return {"success": True}
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_me(
     current_user: DashboardUser = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
 ):
     """Get current user info"""
-    client_name = None
-    if current_user.client_id:
-        result = await db.execute(
-            select(Client).where(Client.id == current_user.client_id)
-        )
-        client = result.scalar_one_or_none()
-        client_name = client.name if client else None
+    client_name = current_user.client.name if current_user.client else None
     
     return {
         "id": str(current_user.id),
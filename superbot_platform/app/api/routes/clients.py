@@ -1,10 +1,12 @@
 """
 Client management routes for Admin Dashboard
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from pydantic import BaseModel, ConfigDict
+from pydantic_core import to_json
 from typing import Optional
 from datetime import datetime
 from uuid import UUID
@@ -12,6 +14,8 @@ from uuid import UUID
 from app.db.database import get_db
 from app.db.models import Client, DashboardUser
 from app.api.routes.auth import get_current_user
+from app.core.elevenlabs_cache import invalidate_client_cache
+from app.core.tenancy import invalidate_project_resolutions
 
 router = APIRouter(prefix="/api/clients", tags=["clients"])
 
@@ -94,24 +98,57 @@ async def require_admin(current_user: DashboardUser = Depends(get_current_user))
     return current_user
 
 
+# Listing reads plain rows with exactly the ClientResponse fields (no ORM instances).
+_CLIENT_LIST_COLUMNS = tuple(getattr(Client, field) for field in ClientResponse.model_fields)
+
+
+def _encode_clients_cursor(name: str, client_id: UUID) -> str:
+    """Opaque keyset cursor: the (name, id) sort key of the last row of a page."""
+    return base64.urlsafe_b64encode(f"{client_id}|{name}".encode()).decode()
+
+
+def _decode_clients_cursor(cursor: str) -> tuple[str, UUID]:
+    try:
+        client_id, name = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return name, UUID(client_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
 # Routes
-@router.get("/", response_model=list[ClientResponse])
+# response_model=None: rows are serialized by hand (no per-row validation); the
+# schema stays documented through `responses`.
+@router.get("/", response_model=None, responses={200: {"model": list[ClientResponse]}})
 async def list_clients(
+    limit: Optional[int] = Query(default=None, ge=1, description="Tamanho da página (padrão: todos)"),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor da página anterior"),
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
-):
-    """List all clients (admin) or current client (client role)"""
+) -> Response:
+    """List all clients (admin) or current client (client role).
+
+    Without `limit` the admin listing returns every client, as before. With it
+    the listing is keyset-paginated by (name, id): when the page is full the
+    `X-Next-Cursor` header carries the cursor for the next one.
+    """
     if current_user.role == "admin":
-        result = await db.execute(select(Client).order_by(Client.name))
-        clients = result.scalars().all()
+        query = select(*_CLIENT_LIST_COLUMNS).order_by(Client.name, Client.id).limit(limit)
+        if cursor:
+            query = query.where(tuple_(Client.name, Client.id) > tuple_(*_decode_clients_cursor(cursor)))
+        result = await db.execute(query)
+        clients = [dict(row) for row in result.mappings()]
     else:
         # Client users can only see their own client
         if not current_user.client_id:
             raise HTTPException(status_code=404, detail="Cliente não encontrado")
-        result = await db.execute(select(Client).where(Client.id == current_user.client_id))
-        clients = result.scalars().all()
+        result = await db.execute(select(*_CLIENT_LIST_COLUMNS).where(Client.id == current_user.client_id))
+        clients = [dict(row) for row in result.mappings()]
 
-    return clients
+    headers = {}
+    if current_user.role == "admin" and limit is not None and len(clients) == limit:
+        last = clients[-1]
+        headers["X-Next-Cursor"] = _encode_clients_cursor(last["name"], last["id"])
+    return Response(content=to_json(clients), media_type="application/json", headers=headers)
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
@@ -192,6 +229,9 @@ async def update_client(
 
     await db.flush()
     await db.refresh(client)
+    if "settings" in update_data or "slug" in update_data:
+        invalidate_project_resolutions()
+    invalidate_client_cache(client_id)
 
     return client
 
@@ -211,5 +251,7 @@ async def delete_client(
 
     await db.delete(client)
     await db.flush()
+    invalidate_project_resolutions()
+    invalidate_client_cache(client_id)
 
     return {"success": True, "message": f"Cliente {client.name} removido"}
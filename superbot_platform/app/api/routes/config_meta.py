@@ -15,18 +15,24 @@ Tables used (public schema):
 
 from __future__ import annotations
 
-import json
-from typing import Any, Optional
+import asyncio
+import re
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_core import to_json
+from sqlalchemy import TextClause, Uuid, bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.routes.auth import get_current_user
-from app.core.tenancy import resolve_project_id_for_user
-from app.db.database import get_db
+from app.core.http_cache import etag_matches, not_modified_response
+from app.core.raw_json import RawJSON, dumps_with_raw, raw_json_or_none
+from app.core.tenancy import resolve_project_id_for_user_cached
+from app.db.database import async_session, get_db
 from app.db.models import DashboardUser
 
 
@@ -34,6 +40,8 @@ router = APIRouter(prefix="/api/config", tags=["config"])
 
 
 class MetaSecretsUpdate(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True, frozen=True)
+
     notification_phone: Optional[str] = None
     notification_email: Optional[str] = None
     followup_enabled: Optional[bool] = None
@@ -42,7 +50,12 @@ class MetaSecretsUpdate(BaseModel):
     feedback_config: Optional[dict[str, Any]] = None
 
 
+CHANNEL_TYPES: frozenset[str] = frozenset({"whatsapp", "instagram", "messenger", "phone"})
+
+
 class ChannelUpsert(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True, frozen=True)
+
     channel_type: str = Field(..., description="whatsapp|instagram|messenger|phone")
     channel_identifier: str = Field(..., description="phone_number_id/page_id/ig_id/etc")
     access_token: Optional[str] = Field(
@@ -56,63 +69,7 @@ class AutoRegisterChannelsRequest(BaseModel):
     dry_run: bool = False
 
 
-async def _get_tenant_row(tenant_or_project_id: str, project_id: str, db: AsyncSession) -> Optional[dict[str, Any]]:
-    # 1) If the path param matches a client id, use it
-    row = await db.execute(
-        text(
-            """
-            SELECT
-              id::text AS id,
-              name,
-              slug,
-              status,
-              meta_page_id,
-              meta_phone_id,
-              meta_ig_id,
-              meta_waba_id,
-              timezone,
-              settings
-            FROM clients
-            WHERE id = (:cid)::uuid
-            """
-        ),
-        {"cid": tenant_or_project_id},
-    )
-    tenant = row.mappings().first()
-    if tenant:
-        return dict(tenant)
-
-    # 2) Try settings.project_id mapping
-    row = await db.execute(
-        text(
-            """
-            SELECT
-              id::text AS id,
-              name,
-              slug,
-              status,
-              meta_page_id,
-              meta_phone_id,
-              meta_ig_id,
-              meta_waba_id,
-              timezone,
-              settings
-            FROM clients
-            WHERE (settings->>'project_id') = :pid
-            LIMIT 1
-            """
-        ),
-        {"pid": project_id},
-    )
-    tenant = row.mappings().first()
-    if tenant:
-        return dict(tenant)
-
-    # 3) Try slug == project_slug
-    row = await db.execute(
-        text(
-            """
-            SELECT
+_TENANT_COLUMNS = """
               c.id::text AS id,
               c.name,
               c.slug,
@@ -122,102 +79,306 @@ async def _get_tenant_row(tenant_or_project_id: str, project_id: str, db: AsyncS
               c.meta_ig_id,
               c.meta_waba_id,
               c.timezone,
-              c.settings
-            FROM clients c
-            JOIN projects p ON p.project_slug = c.slug
-            WHERE p.id = (:pid)::uuid
-            LIMIT 1
-            """
-        ),
-        {"pid": project_id},
+              c.settings::text AS settings"""
+
+
+# Statements are module-level constants so SQLAlchemy's compiled cache and
+# asyncpg's prepared statement cache see the same object on every request.
+def _tenant_candidates_sql(columns: str) -> str:
+    """The tenant client of a project, as a one-row SELECT of `columns` (aliased c)."""
+    return f"""
+    SELECT * FROM (
+      (SELECT 1 AS priority, {columns}
+       FROM clients c
+       WHERE c.id = (:cid)::uuid)
+      UNION ALL
+      (SELECT 2 AS priority, {columns}
+       FROM clients c
+       WHERE c.settings::jsonb @> CAST(:pid_settings AS jsonb)
+       LIMIT 1)
+      UNION ALL
+      (SELECT 3 AS priority, {columns}
+       FROM clients c
+       JOIN projects p ON p.project_slug = c.slug
+       WHERE p.id = :pid
+       LIMIT 1)
+    ) candidates
+    ORDER BY priority
+    LIMIT 1"""
+
+
+_TENANT_SQL = text(_tenant_candidates_sql(_TENANT_COLUMNS)).bindparams(
+    bindparam("pid", type_=Uuid(as_uuid=True))
+)
+
+
+def _tenant_params(tenant_or_project_id: str, project_id: str, project_uuid: UUID) -> dict[str, Any]:
+    return {
+        "cid": tenant_or_project_id,
+        "pid": project_uuid,
+        "pid_settings": to_json({"project_id": project_id}).decode(),
+    }
+
+# Project row plus its channels (newest first) as one JSON array, in one round trip.
+_PROJECT_SQL = text("""
+    SELECT
+      p.id::text AS id,
+      p.project_slug,
+      p.webhook_path,
+      p.agent_workflow_id,
+      COALESCE(
+        json_agg(
+          json_build_object(
+            'id', ch.id::text,
+            'channel_type', ch.channel_type,
+            'channel_identifier', ch.channel_identifier,
+            'created_at', ch.created_at,
+            'has_access_token', COALESCE(ch.access_token, '') <> ''
+          )
+          ORDER BY ch.created_at DESC
+        ) FILTER (WHERE ch.id IS NOT NULL),
+        '[]'
+      )::text AS channels
+    FROM projects p
+    LEFT JOIN channels ch ON ch.project_id = p.id
+    WHERE p.id = :pid
+    GROUP BY p.id
+""").bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+_SECRETS_SQL = text("""
+    SELECT
+      notification_phone,
+      notification_email,
+      followup_enabled,
+      followup_config::text AS followup_config,
+      feedback_enabled,
+      feedback_config::text AS feedback_config,
+      updated_at
+    FROM project_secrets
+    WHERE project_id = :pid
+""").bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+
+# Canonical 8-4-4-4-12 form only; UUID() alone also takes braces/URNs and raises ValueError (500).
+_UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+
+def _parse_uuid(value: str, detail: str) -> UUID:
+    if not _UUID_RE.fullmatch(value):
+        raise HTTPException(status_code=400, detail=detail)
+    return UUID(value)
+
+
+async def _resolve_project(
+    tenant_or_project_id: str, current_user: DashboardUser, db: AsyncSession
+) -> tuple[str, UUID]:
+    """Resolve the path id to (project_id, project UUID); malformed ids fail before any query."""
+    _parse_uuid(tenant_or_project_id, "ID inválido")
+    project_id = await resolve_project_id_for_user_cached(tenant_or_project_id, current_user, db)
+    return project_id, _parse_uuid(project_id, "project_id inválido")
+
+
+async def _in_session(fetch, *args: Any) -> Any:
+    """Run a fetch on its own session (an AsyncSession serializes statements)."""
+    async with async_session() as session:
+        return await fetch(session, *args)
+
+
+async def _first_mapping(
+    db: AsyncSession, stmt: TextClause, params: dict[str, Any]
+) -> Optional[dict[str, Any]]:
+    row = (await db.execute(stmt, params)).mappings().first()
+    return dict(row) if row else None
+
+
+async def _get_tenant_row(
+    db: AsyncSession, tenant_or_project_id: str, project_id: str, project_uuid: UUID
+) -> Optional[dict[str, Any]]:
+    # One round trip; candidates in priority order:
+    # 1) the path param is a client id, 2) settings.project_id mapping (containment,
+    # served by idx_clients_settings_pathops), 3) slug == project_slug
+    tenant = await _first_mapping(
+        db, _TENANT_SQL, _tenant_params(tenant_or_project_id, project_id, project_uuid)
     )
-    tenant = row.mappings().first()
-    return dict(tenant) if tenant else None
+    if tenant:
+        tenant.pop("priority", None)
+    return tenant
+
+
+async def _fetch_project(db: AsyncSession, project_uuid: UUID) -> Optional[dict[str, Any]]:
+    return await _first_mapping(db, _PROJECT_SQL, {"pid": project_uuid})
+
+
+async def _fetch_secrets(db: AsyncSession, project_uuid: UUID) -> Optional[dict[str, Any]]:
+    return await _first_mapping(db, _SECRETS_SQL, {"pid": project_uuid})
+
+
+# Fingerprint of everything GET /meta returns; the tenant row is covered by the
+# updated_at of the same client _TENANT_SQL resolves (other tenants' edits don't count).
+_META_VERSION_SQL = text("""
+    SELECT md5(concat_ws(
+      '|',
+      p.project_slug,
+      p.webhook_path,
+      p.agent_workflow_id,
+      (SELECT ps.updated_at::text FROM project_secrets ps WHERE ps.project_id = p.id),
+      (
+        SELECT string_agg(
+          concat_ws(':', ch.id, ch.channel_type, ch.channel_identifier, COALESCE(ch.access_token, '') <> ''),
+          ',' ORDER BY ch.id
+        )
+        FROM channels ch
+        WHERE ch.project_id = p.id
+      ),
+      (SELECT tenant.updated_at::text FROM (""" + _tenant_candidates_sql("c.updated_at") + """
+      ) tenant)
+    )) AS version
+    FROM projects p
+    WHERE p.id = :pid
+""").bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+META_CACHE_CONTROL = "private, no-cache"
+
+# Served when the project has no project_secrets row yet (configs are pre-serialized).
+_DEFAULT_SECRETS: Mapping[str, Any] = MappingProxyType({
+    "notification_phone": "",
+    "notification_email": "",
+    "followup_enabled": False,
+    "followup_config": RawJSON("{}"),
+    "feedback_enabled": True,
+    "feedback_config": RawJSON("{}"),
+    "updated_at": None,
+})
 
 
 @router.get("/meta/{tenant_or_project_id}")
 async def get_meta_config(
     tenant_or_project_id: str,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
-) -> dict[str, Any]:
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
-    project_uuid = UUID(project_id)
-
-    proj_res = await db.execute(
-        text(
-            """
-            SELECT
-              id::text AS id,
-              project_slug,
-              webhook_path,
-              agent_workflow_id
-            FROM projects
-            WHERE id = (:pid)::uuid
-            """
-        ),
-        {"pid": str(project_uuid)},
+) -> Response:
+    project_id, project_uuid = await _resolve_project(tenant_or_project_id, current_user, db)
+
+    # Polls of an unchanged config get a 304 before any of the reads below.
+    version = (await db.execute(
+        _META_VERSION_SQL, _tenant_params(tenant_or_project_id, project_id, project_uuid)
+    )).scalar_one_or_none()
+    headers: dict[str, str] = {}
+    if version:
+        etag = f'W/"{version}"'
+        headers = {"ETag": etag, "Cache-Control": META_CACHE_CONTROL}
+        if etag_matches(request, etag):
+            return not_modified_response(etag, META_CACHE_CONTROL)
+
+    # Independent reads overlap their round trips, each on its own pooled session.
+    project, secrets, tenant = await asyncio.gather(
+        _in_session(_fetch_project, project_uuid),
+        _in_session(_fetch_secrets, project_uuid),
+        _in_session(_get_tenant_row, tenant_or_project_id, project_id, project_uuid),
     )
-    project = proj_res.mappings().first()
     if not project:
         raise HTTPException(status_code=404, detail="Projeto não encontrado")
 
-    channels_res = await db.execute(
-        text(
-            """
-            SELECT
-              id::text AS id,
-              channel_type,
-              channel_identifier,
-              created_at,
-              CASE WHEN access_token IS NULL OR access_token = '' THEN false ELSE true END AS has_access_token
-            FROM channels
-            WHERE project_id = (:pid)::uuid
-            ORDER BY created_at DESC
-            """
-        ),
-        {"pid": str(project_uuid)},
-    )
-    channels = [dict(r) for r in channels_res.mappings().all()]
-
-    secrets_res = await db.execute(
-        text(
-            """
-            SELECT
-              notification_phone,
-              notification_email,
-              followup_enabled,
-              followup_config,
-              feedback_enabled,
-              feedback_config,
-              updated_at
-            FROM project_secrets
-            WHERE project_id = (:pid)::uuid
-            """
-        ),
-        {"pid": str(project_uuid)},
-    )
-    secrets = secrets_res.mappings().first()
-    secrets_obj: dict[str, Any] = dict(secrets) if secrets else {
-        "notification_phone": "",
-        "notification_email": "",
-        "followup_enabled": False,
-        "followup_config": {},
-        "feedback_enabled": True,
-        "feedback_config": {},
-        "updated_at": None,
-    }
-
-    tenant = await _get_tenant_row(tenant_or_project_id, project_id, db)
+    # jsonb columns arrive as text and are embedded verbatim (no decode/re-encode).
+    channels = RawJSON(project.pop("channels"))
+    if secrets:
+        secrets_obj: dict[str, Any] = {
+            **secrets,
+            "followup_config": raw_json_or_none(secrets["followup_config"]),
+            "feedback_config": raw_json_or_none(secrets["feedback_config"]),
+        }
+    else:
+        secrets_obj = dict(_DEFAULT_SECRETS)
+    if tenant:
+        tenant["settings"] = raw_json_or_none(tenant["settings"])
 
-    return {
+    payload = {
         "tenant_or_project_id": tenant_or_project_id,
         "resolved_project_id": str(project_uuid),
         "tenant": tenant,
-        "project": dict(project),
+        "project": project,
         "channels": channels,
         "secrets": secrets_obj,
     }
+    return Response(content=dumps_with_raw(payload), media_type="application/json", headers=headers)
+
+
+_SECRETS_UPSERT_SQL = text("""
+    INSERT INTO project_secrets (
+      project_id,
+      notification_phone,
+      notification_email,
+      followup_enabled,
+      followup_config,
+      feedback_enabled,
+      feedback_config,
+      created_at,
+      updated_at
+    )
+    VALUES (
+      :pid,
+      :notification_phone,
+      :notification_email,
+      COALESCE(:followup_enabled, false),
+      COALESCE(:followup_config, '{}'::jsonb),
+      COALESCE(:feedback_enabled, true),
+      COALESCE(:feedback_config, '{}'::jsonb),
+      now(),
+      now()
+    )
+    ON CONFLICT (project_id) DO UPDATE SET
+      notification_phone = COALESCE(EXCLUDED.notification_phone, project_secrets.notification_phone),
+      notification_email = COALESCE(EXCLUDED.notification_email, project_secrets.notification_email),
+      followup_enabled = COALESCE(EXCLUDED.followup_enabled, project_secrets.followup_enabled),
+      followup_config = COALESCE(EXCLUDED.followup_config, project_secrets.followup_config),
+      feedback_enabled = COALESCE(EXCLUDED.feedback_enabled, project_secrets.feedback_enabled),
+      feedback_config = COALESCE(EXCLUDED.feedback_config, project_secrets.feedback_config),
+      updated_at = now()
+    -- Leave the row (and updated_at, hence the GET /meta ETag) alone when nothing changes.
+    -- The configs compare as jsonb: json columns have no equality operator.
+    WHERE (
+      project_secrets.notification_phone,
+      project_secrets.notification_email,
+      project_secrets.followup_enabled,
+      project_secrets.followup_config::jsonb,
+      project_secrets.feedback_enabled,
+      project_secrets.feedback_config::jsonb
+    ) IS DISTINCT FROM (
+      COALESCE(EXCLUDED.notification_phone, project_secrets.notification_phone),
+      COALESCE(EXCLUDED.notification_email, project_secrets.notification_email),
+      COALESCE(EXCLUDED.followup_enabled, project_secrets.followup_enabled),
+      COALESCE(EXCLUDED.followup_config, project_secrets.followup_config)::jsonb,
+      COALESCE(EXCLUDED.feedback_enabled, project_secrets.feedback_enabled),
+      COALESCE(EXCLUDED.feedback_config, project_secrets.feedback_config)::jsonb
+    )
+    RETURNING
+      notification_phone,
+      notification_email,
+      followup_enabled,
+      followup_config,
+      feedback_enabled,
+      feedback_config,
+      updated_at
+""").bindparams(
+    bindparam("pid", type_=Uuid(as_uuid=True)),
+    # dicts go over asyncpg's binary jsonb codec; None stays SQL NULL for the COALESCEs
+    bindparam("followup_config", type_=JSONB(none_as_null=True)),
+    bindparam("feedback_config", type_=JSONB(none_as_null=True)),
+)
+
+_SECRETS_CURRENT_SQL = text("""
+    SELECT
+      notification_phone,
+      notification_email,
+      followup_enabled,
+      followup_config,
+      feedback_enabled,
+      feedback_config,
+      updated_at
+    FROM project_secrets
+    WHERE project_id = :pid
+""").bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
 
 
 @router.patch("/meta/{tenant_or_project_id}")
@@ -227,76 +388,62 @@ async def update_meta_secrets(
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
 ) -> dict[str, Any]:
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
-    project_uuid = UUID(project_id)
+    _, project_uuid = await _resolve_project(tenant_or_project_id, current_user, db)
 
-    payload = data.model_dump(exclude_unset=True)
-
-    # Normalize JSON fields to strings for safe casting
-    followup_config = payload.get("followup_config")
-    feedback_config = payload.get("feedback_config")
+    # Unset fields keep their None default, which the upsert COALESCEs away.
+    if not data.model_fields_set:
+        current = await _first_mapping(db, _SECRETS_CURRENT_SQL, {"pid": project_uuid})
+        return {"success": True, "project_id": str(project_uuid), "secrets": current or {}}
 
     params = {
-        "pid": str(project_uuid),
-        "notification_phone": payload.get("notification_phone"),
-        "notification_email": payload.get("notification_email"),
-        "followup_enabled": payload.get("followup_enabled"),
-        "followup_config": json.dumps(followup_config) if followup_config is not None else None,
-        "feedback_enabled": payload.get("feedback_enabled"),
-        "feedback_config": json.dumps(feedback_config) if feedback_config is not None else None,
+        "pid": project_uuid,
+        "notification_phone": data.notification_phone,
+        "notification_email": data.notification_email,
+        "followup_enabled": data.followup_enabled,
+        "followup_config": data.followup_config,
+        "feedback_enabled": data.feedback_enabled,
+        "feedback_config": data.feedback_config,
     }
 
-    res = await db.execute(
-        text(
-            """
-            INSERT INTO project_secrets (
-              project_id,
-              notification_phone,
-              notification_email,
-              followup_enabled,
-              followup_config,
-              feedback_enabled,
-              feedback_config,
-              created_at,
-              updated_at
-            )
-            VALUES (
-              (:pid)::uuid,
-              :notification_phone,
-              :notification_email,
-              COALESCE(:followup_enabled, false),
-              COALESCE((:followup_config)::jsonb, '{}'::jsonb),
-              COALESCE(:feedback_enabled, true),
-              COALESCE((:feedback_config)::jsonb, '{}'::jsonb),
-              now(),
-              now()
-            )
-            ON CONFLICT (project_id) DO UPDATE SET
-              notification_phone = COALESCE(EXCLUDED.notification_phone, project_secrets.notification_phone),
-              notification_email = COALESCE(EXCLUDED.notification_email, project_secrets.notification_email),
-              followup_enabled = COALESCE(EXCLUDED.followup_enabled, project_secrets.followup_enabled),
-              followup_config = COALESCE(EXCLUDED.followup_config, project_secrets.followup_config),
-              feedback_enabled = COALESCE(EXCLUDED.feedback_enabled, project_secrets.feedback_enabled),
-              feedback_config = COALESCE(EXCLUDED.feedback_config, project_secrets.feedback_config),
-              updated_at = now()
-            RETURNING
-              notification_phone,
-              notification_email,
-              followup_enabled,
-              followup_config,
-              feedback_enabled,
-              feedback_config,
-              updated_at
-            """
-        ),
-        params,
-    )
-    await db.flush()
-
+    res = await db.execute(_SECRETS_UPSERT_SQL, params)
     updated = res.mappings().first()
+    if updated is None:
+        # Conflict with identical values: the upsert skipped the row.
+        updated = await _first_mapping(db, _SECRETS_CURRENT_SQL, {"pid": project_uuid})
     return {"success": True, "project_id": str(project_uuid), "secrets": dict(updated) if updated else {}}
 
 
+_CHANNEL_UPSERT_SQL = text("""
+    INSERT INTO channels (
+      id,
+      project_id,
+      channel_identifier,
+      channel_type,
+      access_token,
+      created_at
+    )
+    VALUES (
+      gen_random_uuid(),
+      :pid,
+      :channel_identifier,
+      :channel_type,
+      :access_token,
+      now()
+    )
+    ON CONFLICT (channel_identifier) DO UPDATE SET
+      project_id = EXCLUDED.project_id,
+      channel_type = EXCLUDED.channel_type,
+      access_token = COALESCE(EXCLUDED.access_token, channels.access_token)
+    RETURNING
+      id::text AS id,
+      project_id::text AS project_id,
+      channel_identifier,
+      channel_type,
+      created_at,
+      CASE WHEN access_token IS NULL OR access_token = '' THEN false ELSE true END AS has_access_token
+""").bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+
 @router.post("/channels/{tenant_or_project_id}")
 async def upsert_channel(
     tenant_or_project_id: str,
@@ -304,61 +451,73 @@ async def upsert_channel(
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
 ) -> dict[str, Any]:
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
-    project_uuid = UUID(project_id)
-
-    channel_type = data.channel_type.strip().lower()
-    channel_identifier = data.channel_identifier.strip()
-    access_token = data.access_token.strip() if data.access_token is not None else None
+    # Whitespace is already stripped by the model config.
+    channel_type = data.channel_type.lower()
+    channel_identifier = data.channel_identifier
+    access_token = data.access_token
 
+    # Reject bad input before resolving the project (no DB round trip)
     if not channel_type or not channel_identifier:
         raise HTTPException(status_code=400, detail="channel_type e channel_identifier são obrigatórios")
+    if channel_type not in CHANNEL_TYPES:
+        raise HTTPException(status_code=400, detail="channel_type inválido")
+
+    _, project_uuid = await _resolve_project(tenant_or_project_id, current_user, db)
 
     res = await db.execute(
-        text(
-            """
-            INSERT INTO channels (
-              id,
-              project_id,
-              channel_identifier,
-              channel_type,
-              access_token,
-              created_at
-            )
-            VALUES (
-              gen_random_uuid(),
-              (:pid)::uuid,
-              :channel_identifier,
-              :channel_type,
-              :access_token,
-              now()
-            )
-            ON CONFLICT (channel_identifier) DO UPDATE SET
-              project_id = EXCLUDED.project_id,
-              channel_type = EXCLUDED.channel_type,
-              access_token = COALESCE(EXCLUDED.access_token, channels.access_token)
-            RETURNING
-              id::text AS id,
-              project_id::text AS project_id,
-              channel_identifier,
-              channel_type,
-              created_at,
-              CASE WHEN access_token IS NULL OR access_token = '' THEN false ELSE true END AS has_access_token
-            """
-        ),
+        _CHANNEL_UPSERT_SQL,
         {
-            "pid": str(project_uuid),
+            "pid": project_uuid,
             "channel_identifier": channel_identifier,
             "channel_type": channel_type,
             "access_token": access_token,
         },
     )
-    await db.flush()
-
     row = res.mappings().first()
     return {"success": True, "project_id": str(project_uuid), "channel": dict(row) if row else None}
 
 
+_DETECTED_CHANNELS_SQL = text("""
+    SELECT
+      channel_type,
+      channel_identifier,
+      MAX(created_at) AS last_event_at
+    FROM conversation_events
+    WHERE project_id = :pid
+      AND channel_identifier IS NOT NULL
+      AND channel_identifier <> ''
+      AND created_at >= now() - ((:days)::text || ' days')::interval
+    GROUP BY channel_type, channel_identifier
+    ORDER BY MAX(created_at) DESC
+""").bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+_EXISTING_CHANNELS_SQL = text("""
+    SELECT channel_identifier, channel_type
+    FROM channels
+    WHERE project_id = :pid
+""").bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+_CHANNEL_REGISTER_SQL = text("""
+    INSERT INTO channels (
+      id,
+      project_id,
+      channel_identifier,
+      channel_type,
+      created_at
+    )
+    VALUES (
+      gen_random_uuid(),
+      :pid,
+      :channel_identifier,
+      :channel_type,
+      now()
+    )
+    ON CONFLICT (channel_identifier) DO UPDATE SET
+      project_id = EXCLUDED.project_id,
+      channel_type = EXCLUDED.channel_type
+""").bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+
 @router.post("/channels/{tenant_or_project_id}/auto-register")
 async def auto_register_channels(
     tenant_or_project_id: str,
@@ -370,41 +529,17 @@ async def auto_register_channels(
     Discover active sources from conversation_events and register them in channels.
     Useful to automate onboarding when new channel identifiers start sending messages.
     """
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
-    project_uuid = UUID(project_id)
+    _, project_uuid = await _resolve_project(tenant_or_project_id, current_user, db)
 
+    # Rows are consumed straight from the (buffered) results: no .all() list + dict copies.
     detected_res = await db.execute(
-        text(
-            """
-            SELECT
-              channel_type,
-              channel_identifier,
-              MAX(created_at) AS last_event_at
-            FROM conversation_events
-            WHERE project_id = (:pid)::uuid
-              AND channel_identifier IS NOT NULL
-              AND channel_identifier <> ''
-              AND created_at >= now() - ((:days)::text || ' days')::interval
-            GROUP BY channel_type, channel_identifier
-            ORDER BY MAX(created_at) DESC
-            """
-        ),
-        {"pid": str(project_uuid), "days": data.days},
+        _DETECTED_CHANNELS_SQL,
+        {"pid": project_uuid, "days": data.days},
     )
-    detected = [dict(r) for r in detected_res.mappings().all()]
-
-    existing_res = await db.execute(
-        text(
-            """
-            SELECT channel_identifier, channel_type
-            FROM channels
-            WHERE project_id = (:pid)::uuid
-            """
-        ),
-        {"pid": str(project_uuid)},
-    )
-    existing_rows = existing_res.mappings().all()
-    existing_map = {str(r["channel_identifier"]): str(r["channel_type"]) for r in existing_rows}
+    detected = detected_res.mappings()
+
+    existing_res = await db.execute(_EXISTING_CHANNELS_SQL, {"pid": project_uuid})
+    existing_map = {str(identifier): str(ctype) for identifier, ctype in existing_res}
 
     planned_create = 0
     planned_update = 0
@@ -433,29 +568,9 @@ async def auto_register_channels(
 
         if not data.dry_run and action in {"create", "update"}:
             await db.execute(
-                text(
-                    """
-                    INSERT INTO channels (
-                      id,
-                      project_id,
-                      channel_identifier,
-                      channel_type,
-                      created_at
-                    )
-                    VALUES (
-                      gen_random_uuid(),
-                      (:pid)::uuid,
-                      :channel_identifier,
-                      :channel_type,
-                      now()
-                    )
-                    ON CONFLICT (channel_identifier) DO UPDATE SET
-                      project_id = EXCLUDED.project_id,
-                      channel_type = EXCLUDED.channel_type
-                    """
-                ),
+                _CHANNEL_REGISTER_SQL,
                 {
-                    "pid": str(project_uuid),
+                    "pid": project_uuid,
                     "channel_identifier": channel_identifier,
                     "channel_type": channel_type,
                 },
@@ -493,25 +608,30 @@ async def auto_register_channels(
     }
 
 
+_CHANNEL_DELETE_SQL = text(
+    "DELETE FROM channels WHERE project_id = :pid AND channel_identifier = :cid RETURNING id"
+).bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+
 @router.delete("/channels/{tenant_or_project_id}/{channel_identifier}")
 async def delete_channel(
     tenant_or_project_id: str,
     channel_identifier: str,
+    strict: bool = Query(default=False, description="404 quando o canal não existe"),
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user),
 ) -> dict[str, Any]:
-    project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
-    project_uuid = UUID(project_id)
-
-    result = await db.execute(
-        text(
-            "DELETE FROM channels WHERE project_id = (:pid)::uuid AND channel_identifier = :cid"
-        ),
-        {"pid": str(project_uuid), "cid": channel_identifier},
-    )
-    await db.flush()
+    """Idempotent by default: retries of an already applied delete still get 200."""
+    _, project_uuid = await _resolve_project(tenant_or_project_id, current_user, db)
 
-    if result.rowcount == 0:
+    result = await db.execute(_CHANNEL_DELETE_SQL, {"pid": project_uuid, "cid": channel_identifier})
+    existed = result.first() is not None
+    if strict and not existed:
         raise HTTPException(status_code=404, detail="Canal não encontrado")
 
-    return {"success": True, "project_id": str(project_uuid), "deleted": channel_identifier}
+    return {
+        "success": True,
+        "project_id": str(project_uuid),
+        "deleted": channel_identifier,
+        "existed": existed,
+    }
@@ -1,22 +1,27 @@
 """
 Updated Conversations API with real PostgreSQL queries (Async version)
 """
+import asyncio
 import logging
 import os
+import re
 import httpx
 import jwt
-import uuid as uuid_mod
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import desc, func, and_, select, text as sa_text, update as sa_update
+from sqlalchemy.orm import aliased
+from sqlalchemy import Uuid, bindparam, case, desc, func, and_, or_, insert, literal, select, text as sa_text, update as sa_update
 from pydantic import BaseModel
-from typing import Optional, List, Any
+from pydantic_core import from_json, to_json
+from typing import Callable, Optional, List, Any
 from datetime import datetime, timedelta, timezone
-from uuid import UUID
+from functools import lru_cache
+from uuid import UUID, uuid4
 
-from app.db.database import get_db
+from app.db.database import async_session, get_db
 from app.db.models import DashboardUser, Client, ConversationEvent, ConversationState, Contact, Channel
 from app.api.routes.auth import get_current_user
+from app.core.meta_client import get_meta_client
 from app.core.tenancy import resolve_project_id_for_user, resolve_project_id_from_client_id
 
 logger = logging.getLogger("superbot.conversations")
@@ -32,6 +37,92 @@ WHATSAPP_MEDIA_TYPES = {"audio", "image", "video", "document", "sticker"}
 
 # ==================== Helpers ====================
 
+def _wa_text(msg: dict, msg_type: str) -> str | None:
+    return msg.get("text", {}).get("body")
+
+
+def _wa_media(msg: dict, msg_type: str) -> str | None:
+    return msg.get(msg_type, {}).get("caption") or f"[{msg_type}]"
+
+
+def _wa_interactive(msg: dict, msg_type: str) -> str | None:
+    return msg.get("interactive", {}).get("button_reply", {}).get("title") or "[interativo]"
+
+
+def _wa_reaction(msg: dict, msg_type: str) -> str | None:
+    emoji = msg.get("reaction", {}).get("emoji", "")
+    return f"[reacao: {emoji}]" if emoji else "[reacao]"
+
+
+# WhatsApp message type -> text extractor (channel_router's forwarded message)
+_WA_HANDLERS: dict[str, Callable[[dict, str], str | None]] = {
+    "text": _wa_text,
+    "interactive": _wa_interactive,
+    **{media_type: _wa_media for media_type in ("image", "video", "audio", "document", "sticker")},
+}
+# Same for the raw Cloud API webhook, which also labels a few non-text types
+_WA_WEBHOOK_HANDLERS: dict[str, Callable[[dict, str], str | None]] = {
+    **_WA_HANDLERS,
+    "location": lambda msg, msg_type: "[localizacao]",
+    "contacts": lambda msg, msg_type: "[contato]",
+    "reaction": _wa_reaction,
+}
+
+
+def _messenger_message_text(msg: dict, story_first: bool) -> str | None:
+    """IG/Messenger message object: text, then attachment type / story reply."""
+    t = msg.get("text")
+    if t:
+        return t
+    is_story_reply = bool(msg.get("reply_to", {}).get("story"))
+    if story_first and is_story_reply:
+        return "[Resposta a story]"
+    attachments = msg.get("attachments", [])
+    if attachments:
+        return f"[{attachments[0].get('type', 'attachment')}]"
+    if not story_first and is_story_reply:
+        return "[Resposta a story]"
+    return None
+
+
+def _text_from_entry(entry: dict) -> str | None:
+    # --- WhatsApp format: entry[0].changes[0].value.messages[0] ---
+    changes = entry.get("changes", [])
+    if changes:
+        value = changes[0].get("value", {})
+        msgs = value.get("messages", [])
+        if msgs:
+            wa_msg = msgs[0]
+            msg_type = wa_msg.get("type", "")
+            handler = _WA_WEBHOOK_HANDLERS.get(msg_type)
+            if handler:
+                return handler(wa_msg, msg_type)
+            return f"[{msg_type}]" if msg_type else None
+        if value.get("statuses", []):
+            return None  # Delivery receipt, no text
+
+    # --- Messenger/Instagram format: entry[0].messaging[0] ---
+    messaging_list = entry.get("messaging")
+    if not isinstance(messaging_list, list) or len(messaging_list) == 0:
+        return None
+    messaging = messaging_list[0]
+
+    if "read" in messaging or "delivery" in messaging:
+        return None
+
+    msg = messaging.get("message")
+    if msg:
+        return _messenger_message_text(msg, story_first=True)
+
+    postback = messaging.get("postback")
+    if postback:
+        return postback.get("title") or "[postback]"
+
+    if messaging.get("referral"):
+        return "[referral]"
+    return None
+
+
 def extract_text_from_raw(raw_payload: dict | None, text: str | None) -> str | None:
     """Extract message text from raw_payload when text column is NULL or empty."""
     if text and text.strip():
@@ -42,9 +133,7 @@ def extract_text_from_raw(raw_payload: dict | None, text: str | None) -> str | N
         # --- n8n outgoing format: { sent: { type: "image", ... } } ---
         sent = raw_payload.get("sent")
         if sent:
-            sent_type = sent.get("type", "attachment")
-            caption = sent.get("caption")
-            return caption or f"[{sent_type}]"
+            return sent.get("caption") or f"[{sent.get('type', 'attachment')}]"
 
         # --- channel_router outgoing format: { model: "...", tool: ... } ---
         if "model" in raw_payload and "entry" not in raw_payload:
@@ -56,88 +145,19 @@ def extract_text_from_raw(raw_payload: dict | None, text: str | None) -> str | N
             # IG/Messenger: raw contains the messaging-level object
             msg = raw_inner.get("message")
             if isinstance(msg, dict):
-                t = msg.get("text")
-                if t:
-                    return t
-                attachments = msg.get("attachments", [])
-                if attachments:
-                    att_type = attachments[0].get("type", "attachment")
-                    return f"[{att_type}]"
-                if msg.get("reply_to", {}).get("story"):
-                    return "[Resposta a story]"
+                msg_text = _messenger_message_text(msg, story_first=False)
+                if msg_text:
+                    return msg_text
             # WhatsApp: raw contains the message-level object
             wa_type = raw_inner.get("type")
-            if wa_type == "text":
-                return raw_inner.get("text", {}).get("body")
-            if wa_type in ("image", "video", "audio", "document", "sticker"):
-                caption = raw_inner.get(wa_type, {}).get("caption")
-                return caption or f"[{wa_type}]"
-            if wa_type == "interactive":
-                return raw_inner.get("interactive", {}).get("button_reply", {}).get("title") or "[interativo]"
             if wa_type:
-                return f"[{wa_type}]"
+                handler = _WA_HANDLERS.get(wa_type)
+                return handler(raw_inner, wa_type) if handler else f"[{wa_type}]"
 
         entries = raw_payload.get("entry")
         if not isinstance(entries, list) or len(entries) == 0:
             return None
-        entry = entries[0]
-
-        # --- WhatsApp format: entry[0].changes[0].value.messages[0] ---
-        changes = entry.get("changes", [])
-        if changes:
-            value = changes[0].get("value", {})
-            msgs = value.get("messages", [])
-            if msgs:
-                wa_msg = msgs[0]
-                msg_type = wa_msg.get("type", "")
-                if msg_type == "text":
-                    return wa_msg.get("text", {}).get("body")
-                if msg_type in ("image", "video", "audio", "document", "sticker"):
-                    caption = wa_msg.get(msg_type, {}).get("caption")
-                    return caption or f"[{msg_type}]"
-                if msg_type == "location":
-                    return "[localizacao]"
-                if msg_type == "contacts":
-                    return "[contato]"
-                if msg_type == "reaction":
-                    emoji = wa_msg.get("reaction", {}).get("emoji", "")
-                    return f"[reacao: {emoji}]" if emoji else "[reacao]"
-                if msg_type == "interactive":
-                    return wa_msg.get("interactive", {}).get("button_reply", {}).get("title") or "[interativo]"
-                return f"[{msg_type}]" if msg_type else None
-            statuses = value.get("statuses", [])
-            if statuses:
-                return None  # Delivery receipt, no text
-
-        # --- Messenger/Instagram format: entry[0].messaging[0] ---
-        messaging_list = entry.get("messaging")
-        if not isinstance(messaging_list, list) or len(messaging_list) == 0:
-            return None
-        messaging = messaging_list[0]
-
-        if "read" in messaging or "delivery" in messaging:
-            return None
-
-        msg = messaging.get("message")
-        if msg:
-            t = msg.get("text")
-            if t:
-                return t
-            if msg.get("reply_to", {}).get("story"):
-                return "[Resposta a story]"
-            attachments = msg.get("attachments", [])
-            if attachments:
-                att_type = attachments[0].get("type", "attachment")
-                return f"[{att_type}]"
-            return None
-
-        postback = messaging.get("postback")
-        if postback:
-            return postback.get("title") or "[postback]"
-
-        referral = messaging.get("referral")
-        if referral:
-            return "[referral]"
+        return _text_from_entry(entries[0])
     except (IndexError, KeyError, TypeError, AttributeError):
         pass
     return None
@@ -162,14 +182,24 @@ def format_contact_display(conversation_id: str, channel_type: str, contact_name
     """Format a display name for a conversation contact."""
     if contact_name:
         return contact_name
+    return _format_contact_fallback(conversation_id, channel_type)
+
+
+# Brazilian WhatsApp id (optional "+", 55 + DDD + at least 8 digits), matched in one C-level pass
+_BR_PHONE = re.compile(r"\+*55(.{2})(.{5})(.{3,})", re.DOTALL)
+
+
+@lru_cache(maxsize=4096)
+def _format_contact_fallback(conversation_id: str, channel_type: str) -> str:
+    """Display name derived from the conversation id (phone/PSID); memoized for list/broadcast paths."""
     if not conversation_id or conversation_id == "null":
         return "Contato desconhecido"
     if channel_type == "whatsapp":
         # Format phone: 5592999981234 -> +55 92 99998-1234
-        cid = conversation_id.lstrip("+")
-        if len(cid) >= 12 and cid.startswith("55"):
-            return f"+{cid[:2]} {cid[2:4]} {cid[4:9]}-{cid[9:]}"
-        return f"+{cid}"
+        match = _BR_PHONE.fullmatch(conversation_id)
+        if match:
+            return f"+55 {match[1]} {match[2]}-{match[3]}"
+        return f"+{conversation_id.lstrip('+')}"
     # Messenger/Instagram: show short PSID
     if len(conversation_id) > 10:
         return f"Contato #{conversation_id[-6:]}"
@@ -416,6 +446,15 @@ class ConversationStats(BaseModel):
     total_messages: int
 
 
+def _json_response(payload: Any) -> Response:
+    """Dump a payload built from our own rows (already schema-shaped) without response_model revalidation."""
+    return Response(content=to_json(payload), media_type="application/json")
+
+
+def _without_none(values: dict) -> dict:
+    return {key: value for key, value in values.items() if value is not None}
+
+
 # Helper: Get client's project_id
 async def get_user_project_uuid(current_user: DashboardUser, db: AsyncSession) -> Optional[UUID]:
     """Get project_id for current user's client"""
@@ -429,75 +468,182 @@ async def get_user_project_uuid(current_user: DashboardUser, db: AsyncSession) -
     return UUID(project_id)
 
 
-async def _resolve_contact_names(
-    conversations: list, db: AsyncSession
-) -> dict[str, str]:
-    """Batch-resolve contact names from users table + WhatsApp raw_payload."""
-    conv_ids = [c.conversation_id for c in conversations if c.conversation_id and c.conversation_id != "null"]
-    if not conv_ids:
-        return {}
-    # 1) From users/contacts table
-    result = await db.execute(
-        select(Contact.id, Contact.name).where(Contact.id.in_(conv_ids))
+# raw_payload is only shipped when the preview has to be derived from it
+# (extract_text_from_raw returns a non-blank text as is).
+_PREVIEW_RAW_PAYLOAD = case(
+    (func.length(func.trim(ConversationEvent.text, " \t\r\n")) > 0, None),
+    else_=ConversationEvent.raw_payload,
+).label("raw_payload")
+
+
+# Events that count as messages: excludes receipts (incoming with no text and no media)
+_IS_MESSAGE_EVENT = ~and_(
+    ConversationEvent.text.is_(None),
+    ConversationEvent.media.is_(None),
+    ConversationEvent.direction == "in",
+)
+
+
+def _newest_event_id(*match) -> Any:
+    return (
+        select(ConversationEvent.id)
+        .where(*match)
+        .order_by(desc(ConversationEvent.created_at))
+        .limit(1)
+        .scalar_subquery()
     )
-    names = {row[0]: row[1] for row in result.all() if row[1]}
-
-    # 2) For missing names, try WhatsApp raw_payload (profile.name)
-    missing = [cid for cid in conv_ids if cid not in names]
-    if missing:
-        for cid in missing:
-            evt_result = await db.execute(
-                select(ConversationEvent.raw_payload).where(
-                    and_(
-                        ConversationEvent.conversation_id == cid,
-                        ConversationEvent.direction == "in",
-                    )
-                ).limit(1)
-            )
-            raw = evt_result.scalar_one_or_none()
-            wa_name = extract_contact_name_from_raw(raw)
-            if wa_name:
-                names[cid] = wa_name
 
-    return names
 
+def _conversation_page_query(filters: list, offset: int, limit: int, all_events: bool = False) -> Any:
+    """
+    One statement for a page of the conversation list: the states themselves,
+    the contact name (users table, else the first incoming event's raw_payload),
+    the message count and, for states without last_text, the newest event to
+    derive the preview from. Counts and previews look at the state's own
+    channel_type first and fall back to any channel of the conversation.
+    Per-row subqueries run only for the rows of the page.
+
+    `all_events` (client portal) counts every event of the state's channel,
+    receipts included, with no cross-channel fallback, read from the state's
+    event_count when the trigger has filled it.
+    """
+    cs = ConversationState
+    # Primary-key tie-breakers keep the order total (stable pages, keyset cursors)
+    order = (desc(cs.last_event_at), desc(cs.channel_type), desc(cs.conversation_id))
+    page_columns = [
+        cs.project_id,
+        cs.conversation_id,
+        cs.channel_type,
+        cs.status,
+        cs.last_event_at,
+        cs.last_text,
+    ]
+    if all_events:
+        # Only the portal reads the counter (column added by sql/017)
+        page_columns.append(cs.event_count)
+    page = (
+        select(
+            *page_columns,
+            func.row_number().over(order_by=order).label("position"),
+        )
+        .where(and_(*filters))
+        .order_by(*order)
+        .offset(offset)
+        .limit(limit)
+        .subquery("page")
+    )
 
-async def _get_last_text_fallback(
-    conv: ConversationState, db: AsyncSession
-) -> str | None:
-    """Get last_text from the most recent event's raw_payload if last_text is empty."""
-    if conv.last_text:
-        return conv.last_text
-    # Try with channel_type first
-    result = await db.execute(
-        select(ConversationEvent.text, ConversationEvent.raw_payload).where(
-            and_(
-                ConversationEvent.project_id == conv.project_id,
-                ConversationEvent.channel_type == conv.channel_type,
-                ConversationEvent.conversation_id == conv.conversation_id,
-            )
-        ).order_by(desc(ConversationEvent.created_at)).limit(1)
+    same_conversation = (
+        ConversationEvent.project_id == page.c.project_id,
+        ConversationEvent.conversation_id == page.c.conversation_id,
     )
-    row = result.first()
-    if row:
-        return extract_text_from_raw(row[1], row[0])
-    # Fallback: try without channel_type filter
-    result = await db.execute(
-        select(ConversationEvent.text, ConversationEvent.raw_payload).where(
+    same_channel = (*same_conversation, ConversationEvent.channel_type == page.c.channel_type)
+
+    def _message_count(*match) -> Any:
+        return select(func.count()).select_from(ConversationEvent).where(*match, _IS_MESSAGE_EVENT).scalar_subquery()
+
+    if all_events:
+        # Trigger-maintained counter; live count only for states it hasn't reached yet
+        message_count = func.coalesce(
+            page.c.event_count,
+            select(func.count()).select_from(ConversationEvent).where(*same_channel).scalar_subquery(),
+        )
+    else:
+        # COALESCE stops at the first non-null: the cross-channel count only runs when needed
+        message_count = func.coalesce(
+            func.nullif(_message_count(*same_channel), 0),
+            _message_count(*same_conversation),
+        )
+
+    needs_preview = func.coalesce(page.c.last_text, "") == ""
+    needs_name_event = func.coalesce(Contact.name, "") == ""
+    enriched = (
+        select(
+            page,
+            Contact.name.label("contact_name"),
+            message_count.label("message_count"),
+            case(
+                (
+                    needs_preview,
+                    func.coalesce(_newest_event_id(*same_channel), _newest_event_id(*same_conversation)),
+                ),
+                else_=None,
+            ).label("preview_event_id"),
+            case(
+                (
+                    needs_name_event,
+                    select(ConversationEvent.id)
+                    .where(*same_conversation, ConversationEvent.direction == "in")
+                    .order_by(ConversationEvent.created_at)
+                    .limit(1)
+                    .scalar_subquery(),
+                ),
+                else_=None,
+            ).label("name_event_id"),
+        )
+        .select_from(page)
+        .outerjoin(
+            Contact,
+            and_(Contact.project_id == page.c.project_id, Contact.id == page.c.conversation_id),
+        )
+        .subquery("enriched")
+    )
+
+    name_event = aliased(ConversationEvent)
+    return (
+        select(
+            enriched,
+            ConversationEvent.text.label("preview_text"),
+            _PREVIEW_RAW_PAYLOAD.label("preview_raw_payload"),
+            name_event.raw_payload.label("name_raw_payload"),
+        )
+        .select_from(enriched)
+        .outerjoin(
+            ConversationEvent,
             and_(
-                ConversationEvent.project_id == conv.project_id,
-                ConversationEvent.conversation_id == conv.conversation_id,
-            )
-        ).order_by(desc(ConversationEvent.created_at)).limit(1)
+                ConversationEvent.project_id == enriched.c.project_id,
+                ConversationEvent.id == enriched.c.preview_event_id,
+            ),
+        )
+        .outerjoin(
+            name_event,
+            and_(
+                name_event.project_id == enriched.c.project_id,
+                name_event.id == enriched.c.name_event_id,
+            ),
+        )
+        .order_by(enriched.c.position)
     )
-    row = result.first()
-    if row:
-        return extract_text_from_raw(row[1], row[0])
-    return None
 
 
 # ==================== Routes ====================
 
+# Stats from the analytics rollups (app.core.analytics_views): O(days) instead of a
+# scan of conversation_states/conversation_events. Day-granular and as fresh as
+# the last refresh. {project} is empty for admins without a project.
+_STATS_FROM_VIEWS_SELECT = """
+    WITH s AS (
+      SELECT status, sum(cnt) AS cnt
+      FROM mv_analytics_status
+      WHERE day >= date_trunc('day', CAST(:since AS timestamptz)){project}
+      GROUP BY status
+    )
+    SELECT
+      COALESCE((SELECT sum(cnt) FROM s), 0)::bigint AS total,
+      COALESCE((SELECT sum(cnt) FROM s WHERE status = 'open'), 0)::bigint AS open,
+      COALESCE((SELECT sum(cnt) FROM s WHERE status = 'closed'), 0)::bigint AS closed,
+      COALESCE((
+        SELECT sum(messages)
+        FROM mv_analytics_daily
+        WHERE day >= date_trunc('day', CAST(:since AS timestamptz)){project}
+      ), 0)::bigint AS total_messages
+"""
+_STATS_FROM_VIEWS_SQL = sa_text(_STATS_FROM_VIEWS_SELECT.format(project=""))
+_PROJECT_STATS_FROM_VIEWS_SQL = sa_text(
+    _STATS_FROM_VIEWS_SELECT.format(project=" AND project_id = :pid")
+).bindparams(bindparam("pid", type_=Uuid(as_uuid=True)))
+
+
 @router.get("/stats")
 async def get_conversation_stats(
     project_id: Optional[str] = None,
@@ -515,23 +661,40 @@ async def get_conversation_stats(
         resolved = await resolve_project_id_for_user(project_id, current_user, db)
         project_uuid = UUID(resolved)
 
-    # Build query
-    query = select(ConversationState)
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+
+    if (db.get_bind().dialect.name or "").lower() == "postgresql":
+        if project_uuid:
+            result = await db.execute(_PROJECT_STATS_FROM_VIEWS_SQL, {"pid": project_uuid, "since": since})
+        else:
+            result = await db.execute(_STATS_FROM_VIEWS_SQL, {"since": since})
+        total, open_count, closed_count, total_messages = result.one()
+        return {
+            "total": total,
+            "open": open_count,
+            "closed": closed_count,
+            "avg_messages_per_conversation": total_messages / total if total > 0 else 0,
+            "total_messages": total_messages,
+            "period_days": days
+        }
+
+    # Counts are aggregated in the database (one row back, no state rows fetched)
+    query = select(
+        func.count(),
+        func.count().filter(ConversationState.status == "open"),
+        func.count().filter(ConversationState.status == "closed"),
+    ).select_from(ConversationState)
 
     # Filter by project
     if project_uuid:
         query = query.where(ConversationState.project_id == project_uuid)
 
     # Filter by date range
-    since = datetime.now(timezone.utc) - timedelta(days=days)
     query = query.where(ConversationState.last_event_at >= since)
 
     # Get stats
     result = await db.execute(query)
-    all_conversations = result.scalars().all()
-    total = len(all_conversations)
-    open_count = len([c for c in all_conversations if c.status == "open"])
-    closed_count = len([c for c in all_conversations if c.status == "closed"])
+    total, open_count, closed_count = result.one()
 
     # Count total messages
     event_query = select(func.count(ConversationEvent.id))
@@ -552,7 +715,7 @@ async def get_conversation_stats(
     }
 
 
-@router.get("/", response_model=List[ConversationListItem])
+@router.get("/", response_model=None, responses={200: {"model": List[ConversationListItem]}})
 async def list_conversations(
     project_id: Optional[str] = None,
     status: Optional[str] = None,
@@ -573,87 +736,110 @@ async def list_conversations(
         project_uuid = UUID(resolved)
 
     # Build query - exclude "null" conversation_ids (delivery receipts from n8n)
-    query = select(ConversationState).where(
-        ConversationState.conversation_id != "null"
-    )
+    filters = [ConversationState.conversation_id != "null"]
 
     # Filter by project
     if project_uuid:
-        query = query.where(ConversationState.project_id == project_uuid)
+        filters.append(ConversationState.project_id == project_uuid)
 
     # Apply filters
     if status:
-        query = query.where(ConversationState.status == status)
+        filters.append(ConversationState.status == status)
     if channel_type:
-        query = query.where(ConversationState.channel_type == channel_type)
-
-    # Order and paginate
-    query = query.order_by(desc(ConversationState.last_event_at))
-    query = query.offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    conversations = result.scalars().all()
+        filters.append(ConversationState.channel_type == channel_type)
 
-    # Batch resolve contact names
-    names = await _resolve_contact_names(conversations, db)
+    # Page, contact names, message counts and previews in one round trip
+    result = await db.execute(_conversation_page_query(filters, offset, limit))
 
     # Build response
     conv_list = []
-    for conv in conversations:
-        # Message count: exclude receipts (incoming with no text and no media)
-        msg_count_query = select(func.count(ConversationEvent.id)).where(
-            and_(
-                ConversationEvent.project_id == conv.project_id,
-                ConversationEvent.channel_type == conv.channel_type,
-                ConversationEvent.conversation_id == conv.conversation_id,
-                ~and_(
-                    ConversationEvent.text.is_(None),
-                    ConversationEvent.media.is_(None),
-                    ConversationEvent.direction == "in",
-                ),
+    for row in result.all():
+        raw_name = row.contact_name or extract_contact_name_from_raw(row.name_raw_payload)
+        contact_name = format_contact_display(row.conversation_id, row.channel_type, raw_name)
+        last_text = row.last_text
+        if not last_text:
+            last_text = (
+                extract_text_from_raw(row.preview_raw_payload, row.preview_text)
+                if row.preview_event_id is not None
+                else None
             )
-        )
-        msg_result = await db.execute(msg_count_query)
-        msg_count = msg_result.scalar() or 0
-
-        # Fallback: count without channel_type filter
-        if msg_count == 0:
-            fallback_query = select(func.count(ConversationEvent.id)).where(
-                and_(
-                    ConversationEvent.project_id == conv.project_id,
-                    ConversationEvent.conversation_id == conv.conversation_id,
-                    ~and_(
-                        ConversationEvent.text.is_(None),
-                        ConversationEvent.media.is_(None),
-                        ConversationEvent.direction == "in",
-                    ),
-                )
-            )
-            fb_result = await db.execute(fallback_query)
-            msg_count = fb_result.scalar() or 0
-
-        # Resolve contact name
-        raw_name = names.get(conv.conversation_id)
-        contact_name = format_contact_display(conv.conversation_id, conv.channel_type, raw_name)
-
-        # Resolve last text (fallback to raw_payload)
-        last_text = await _get_last_text_fallback(conv, db)
 
         conv_list.append({
-            "project_id": str(conv.project_id),
-            "conversation_id": conv.conversation_id,
+            "project_id": row.project_id,
+            "conversation_id": row.conversation_id,
             "contact_name": contact_name,
-            "channel_type": conv.channel_type,
-            "status": conv.status,
-            "last_event_at": conv.last_event_at,
+            "channel_type": row.channel_type,
+            "status": row.status,
+            "last_event_at": row.last_event_at,
             "last_text": last_text,
-            "message_count": msg_count
+            "message_count": row.message_count
         })
 
-    return conv_list
+    return _json_response(conv_list)
 
 
-@router.get("/{project_id}/{conversation_id}", response_model=ConversationDetail)
+async def _lookup_contact_name(project_uuid: UUID, conversation_id: str) -> Optional[str]:
+    """Contact name for one conversation (users table + WhatsApp raw_payload fallback), on its own session."""
+    async with async_session() as session:
+        contact_result = await session.execute(
+            select(Contact.name).where(Contact.project_id == project_uuid, Contact.id == conversation_id)
+        )
+        raw_name = contact_result.scalars().first()
+        if raw_name:
+            return raw_name
+        # Try WhatsApp profile name from raw_payload
+        evt_result = await session.execute(
+            select(ConversationEvent.raw_payload).where(
+                and_(
+                    ConversationEvent.project_id == project_uuid,
+                    ConversationEvent.conversation_id == conversation_id,
+                    ConversationEvent.direction == "in",
+                )
+            ).limit(1)
+        )
+        return extract_contact_name_from_raw(evt_result.scalar_one_or_none())
+
+
+# Columns the conversation detail reads (plain rows, no ORM identity map).
+_MESSAGE_EVENT_COLUMNS = (
+    ConversationEvent.id,
+    ConversationEvent.channel_type,
+    ConversationEvent.direction,
+    ConversationEvent.message_type,
+    ConversationEvent.text,
+    ConversationEvent.media,
+    ConversationEvent.raw_payload,
+    ConversationEvent.metadata_json,
+    ConversationEvent.event_created_at,
+    ConversationEvent.created_at,
+)
+
+# Delivery/read receipts that get_conversation would drop anyway: incoming, no
+# text/media, and a raw_payload that extract_text_from_raw can only map to None
+# (WhatsApp statuses without messages, or Messenger/IG read/delivery).
+_RAW_ENTRY = ("entry", 0)
+_IS_EMPTY_RECEIPT = and_(
+    ConversationEvent.text.is_(None),
+    ConversationEvent.media.is_(None),
+    ConversationEvent.direction == "in",
+    ConversationEvent.raw_payload[("sent",)].as_string().is_(None),
+    ConversationEvent.raw_payload[("raw",)].as_string().is_(None),
+    ConversationEvent.raw_payload[(*_RAW_ENTRY, "changes", 0, "value", "messages", 0)].as_string().is_(None),
+    or_(
+        ConversationEvent.raw_payload[(*_RAW_ENTRY, "changes", 0, "value", "statuses", 0)].as_string().is_not(None),
+        ConversationEvent.raw_payload[(*_RAW_ENTRY, "messaging", 0, "read")].as_string().is_not(None),
+        ConversationEvent.raw_payload[(*_RAW_ENTRY, "messaging", 0, "delivery")].as_string().is_not(None),
+    ),
+)
+
+
+# The schema is documented only; the payload is dumped once by pydantic-core.
+# Null keys (text/media/raw_payload per message) are dropped.
+@router.get(
+    "/{project_id}/{conversation_id}",
+    response_model=None,
+    responses={200: {"model": ConversationDetail}},
+)
 async def get_conversation(
     project_id: str,
     conversation_id: str,
@@ -685,26 +871,6 @@ async def get_conversation(
     if not state:
         raise HTTPException(status_code=404, detail="Conversa não encontrada")
 
-    # Resolve contact name (users table + WhatsApp raw_payload fallback)
-    contact_result = await db.execute(
-        select(Contact.name).where(Contact.id == conversation_id)
-    )
-    raw_name = contact_result.scalars().first()
-    if not raw_name:
-        # Try WhatsApp profile name from raw_payload
-        evt_result = await db.execute(
-            select(ConversationEvent.raw_payload).where(
-                and_(
-                    ConversationEvent.project_id == project_uuid,
-                    ConversationEvent.conversation_id == conversation_id,
-                    ConversationEvent.direction == "in",
-                )
-            ).limit(1)
-        )
-        raw = evt_result.scalar_one_or_none()
-        raw_name = extract_contact_name_from_raw(raw)
-    contact_name = format_contact_display(conversation_id, state.channel_type, raw_name)
-
     # Get all events/messages
     def _build_events_query(with_channel_type: bool = True):
         filters = [
@@ -714,7 +880,7 @@ async def get_conversation(
         if with_channel_type:
             filters.append(ConversationEvent.channel_type == state.channel_type)
 
-        q = select(ConversationEvent).where(and_(*filters))
+        q = select(*_MESSAGE_EVENT_COLUMNS).where(and_(*filters), ~_IS_EMPTY_RECEIPT)
 
         # Stable chronological ordering
         dialect_name = ""
@@ -737,31 +903,15 @@ async def get_conversation(
             )
         return q
 
-    result = await db.execute(_build_events_query(with_channel_type=True))
-    events = result.scalars().all()
-
-    # Fallback: if no events found with channel_type filter, try without it
-    if not events:
-        logger.warning(
-            f"No events for conversation={conversation_id} with channel_type={state.channel_type}, "
-            f"retrying without channel_type filter"
-        )
-        result = await db.execute(_build_events_query(with_channel_type=False))
-        events = result.scalars().all()
-        if events:
-            logger.info(
-                f"Found {len(events)} events without channel_type filter. "
-                f"Event channel_types: {set(e.channel_type for e in events)}"
-            )
-
     # Format messages (extract text from raw_payload when missing)
     # Filter out only true delivery/read receipts (no content at all)
     messages = []
-    for event in events:
+
+    def _append_message(event) -> None:
         try:
             # Ignore Meta echo reflections to avoid duplicated outbound messages in UI.
             if _is_meta_echo_event(event):
-                continue
+                return
 
             text = extract_text_from_raw(event.raw_payload, event.text)
 
@@ -785,10 +935,10 @@ async def get_conversation(
                 except (IndexError, KeyError, TypeError):
                     pass
                 if is_receipt:
-                    continue
+                    return
 
-            messages.append({
-                "id": str(event.id),
+            messages.append(_without_none({
+                "id": event.id,
                 "direction": event.direction or "in",
                 "message_type": event.message_type or "text",
                 "text": text,
@@ -803,12 +953,12 @@ async def get_conversation(
                 ),
                 "raw_payload": event.raw_payload,
                 "created_at": event.event_created_at or event.created_at or datetime.now(timezone.utc)
-            })
+            }))
         except Exception as exc:
             logger.error(f"Error processing event {event.id}: {exc}", exc_info=True)
             # Still include the event with minimal data rather than dropping it
-            messages.append({
-                "id": str(event.id),
+            messages.append(_without_none({
+                "id": event.id,
                 "direction": event.direction or "in",
                 "message_type": event.message_type or "text",
                 "text": event.text or "[erro ao processar mensagem]",
@@ -823,10 +973,44 @@ async def get_conversation(
                 ),
                 "raw_payload": event.raw_payload,
                 "created_at": event.event_created_at or event.created_at or datetime.now(timezone.utc)
-            })
+            }))
 
-    return {
-        "project_id": str(state.project_id),
+    async def _stream_messages(with_channel_type: bool) -> tuple[int, set]:
+        # Rows arrive in server-side batches instead of one fully buffered result.
+        result = await db.stream(
+            _build_events_query(with_channel_type=with_channel_type),
+            execution_options={"yield_per": 500},
+        )
+        seen = 0
+        channel_types = set()
+        async for event in result:
+            seen += 1
+            channel_types.add(event.channel_type)
+            _append_message(event)
+        return seen, channel_types
+
+    # The contact lookup runs on its own session while the events stream on db
+    raw_name, (events_seen, _) = await asyncio.gather(
+        _lookup_contact_name(project_uuid, conversation_id),
+        _stream_messages(with_channel_type=True),
+    )
+    contact_name = format_contact_display(conversation_id, state.channel_type, raw_name)
+
+    # Fallback: if no events found with channel_type filter, try without it
+    if not events_seen:
+        logger.warning(
+            f"No events for conversation={conversation_id} with channel_type={state.channel_type}, "
+            f"retrying without channel_type filter"
+        )
+        events_seen, channel_types = await _stream_messages(with_channel_type=False)
+        if events_seen:
+            logger.info(
+                f"Found {events_seen} events without channel_type filter. "
+                f"Event channel_types: {channel_types}"
+            )
+
+    return _json_response(_without_none({
+        "project_id": state.project_id,
         "conversation_id": state.conversation_id,
         "contact_name": contact_name,
         "channel_type": state.channel_type,
@@ -837,7 +1021,7 @@ async def get_conversation(
         "summary_short": state.summary_short,
         "metadata": state.metadata_json,
         "messages": messages
-    }
+    }))
 
 
 @router.get("/media/proxy/{token}")
@@ -952,6 +1136,18 @@ class SendMessageRequest(BaseModel):
     text: str
 
 
+def _conversation_state_filters(
+    project_uuid: UUID, conversation_id: str, channel_type: Optional[str]
+) -> list:
+    filters = [
+        ConversationState.project_id == project_uuid,
+        ConversationState.conversation_id == conversation_id,
+    ]
+    if channel_type:
+        filters.append(ConversationState.channel_type == channel_type)
+    return filters
+
+
 async def _get_conversation_state(
     project_id: str,
     conversation_id: str,
@@ -962,16 +1158,10 @@ async def _get_conversation_state(
     """Resolve project and get conversation state."""
     resolved = await resolve_project_id_for_user(project_id, current_user, db)
     project_uuid = UUID(resolved)
-    filters = [
-        ConversationState.project_id == project_uuid,
-        ConversationState.conversation_id == conversation_id,
-    ]
-    if channel_type:
-        filters.append(ConversationState.channel_type == channel_type)
 
     result = await db.execute(
         select(ConversationState)
-        .where(and_(*filters))
+        .where(and_(*_conversation_state_filters(project_uuid, conversation_id, channel_type)))
         .order_by(desc(ConversationState.last_event_at))
         .limit(2)
     )
@@ -982,6 +1172,97 @@ async def _get_conversation_state(
     return project_uuid, state
 
 
+async def _get_state_and_channel_token(
+    project_id: str,
+    conversation_id: str,
+    current_user: DashboardUser,
+    db: AsyncSession,
+    channel_type: Optional[str] = None,
+) -> tuple[UUID, ConversationState, Optional[str]]:
+    """Like _get_conversation_state, plus the state's channel access_token (same query)."""
+    resolved = await resolve_project_id_for_user(project_id, current_user, db)
+    project_uuid = UUID(resolved)
+
+    result = await db.execute(
+        select(ConversationState, Channel.access_token)
+        .outerjoin(
+            Channel,
+            and_(
+                Channel.project_id == ConversationState.project_id,
+                Channel.channel_type == ConversationState.channel_type,
+                Channel.channel_identifier == ConversationState.channel_identifier,
+            ),
+        )
+        .where(and_(*_conversation_state_filters(project_uuid, conversation_id, channel_type)))
+        .order_by(desc(ConversationState.last_event_at))
+        .limit(1)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Conversa não encontrada")
+    return project_uuid, row[0], row[1]
+
+
+def _event_id_values(db: AsyncSession) -> dict[str, UUID]:
+    """`id` for a new conversation_events row where the database won't generate it.
+
+    Postgres fills it with gen_random_uuid() (default set by sql/019, as for n8n's
+    inserts); the sqlite dev database has no default for the column.
+    """
+    if (db.get_bind().dialect.name or "").lower() == "postgresql":
+        return {}
+    return {"id": uuid4()}
+
+
+async def _update_state_and_log_event(
+    db: AsyncSession,
+    state: ConversationState,
+    state_values: dict[str, Any],
+    event_values: dict[str, Any],
+) -> UUID | None:
+    """
+    UPDATE the conversation state and INSERT its event in one statement
+    (data-modifying CTE): one round trip instead of two. Keys are model
+    attribute names; the event is only written if the state row still exists.
+    Returns the event id generated by the database (None if nothing was written).
+    """
+    upd = (
+        sa_update(ConversationState)
+        .where(
+            ConversationState.project_id == state.project_id,
+            ConversationState.channel_type == state.channel_type,
+            ConversationState.conversation_id == state.conversation_id,
+        )
+        .values({getattr(ConversationState, key): value for key, value in state_values.items()})
+        .returning(ConversationState.project_id)
+    )
+    if (db.get_bind().dialect.name or "").lower() != "postgresql":
+        # No data-modifying CTEs (sqlite dev): same effect in two statements
+        if (await db.execute(upd)).first() is None:
+            return None
+        result = await db.execute(
+            insert(ConversationEvent)
+            .values({
+                getattr(ConversationEvent, key): value
+                for key, value in {**_event_id_values(db), **event_values}.items()
+            })
+            .returning(ConversationEvent.id)
+        )
+        return result.scalar_one()
+
+    upd = upd.cte("upd")
+    event_columns = [getattr(ConversationEvent, key) for key in event_values]
+    result = await db.execute(
+        insert(ConversationEvent).from_select(
+            event_columns,
+            select(
+                *(literal(value, type_=column.type) for column, value in zip(event_columns, event_values.values()))
+            ).select_from(upd),
+        ).returning(ConversationEvent.id)
+    )
+    return result.scalar_one_or_none()
+
+
 @router.patch("/{project_id}/{conversation_id}/status")
 async def update_conversation_status(
     project_id: str,
@@ -1006,33 +1287,23 @@ async def update_conversation_status(
         meta.pop("human_takeover_until", None)
         meta.pop("human_agent_name", None)
 
-    # Update state
-    await db.execute(
-        sa_update(ConversationState).where(
-            and_(
-                ConversationState.project_id == project_uuid,
-                ConversationState.channel_type == state.channel_type,
-                ConversationState.conversation_id == conversation_id
-            )
-        ).values(
-            status=body.status,
-            metadata_json=meta,
-            updated_at=now
-        )
-    )
-
-    # Log system event
-    event = ConversationEvent(
-        id=uuid_mod.uuid4(),
-        project_id=project_uuid,
-        channel_type=state.channel_type,
-        channel_identifier=state.channel_identifier,
-        conversation_id=conversation_id,
-        direction="system",
-        message_type="status_change",
-        text=f"Status alterado para '{body.status}'" + (f": {body.reason}" if body.reason else ""),
+    # Update state + log system event
+    event_id = await _update_state_and_log_event(
+        db,
+        state,
+        {"status": body.status, "metadata_json": meta, "updated_at": now},
+        {
+            "project_id": project_uuid,
+            "channel_type": state.channel_type,
+            "channel_identifier": state.channel_identifier,
+            "conversation_id": conversation_id,
+            "direction": "system",
+            "message_type": "status_change",
+            "text": f"Status alterado para '{body.status}'" + (f": {body.reason}" if body.reason else ""),
+        },
     )
-    db.add(event)
+    if event_id is None:
+        raise HTTPException(status_code=404, detail="Conversa não encontrada")
     await db.commit()
 
     return {
@@ -1098,32 +1369,23 @@ async def toggle_bot_pause(
     else:
         return {"ok": True, "bot_paused": False, "status": state.status}
 
-    await db.execute(
-        sa_update(ConversationState).where(
-            and_(
-                ConversationState.project_id == project_uuid,
-                ConversationState.channel_type == state.channel_type,
-                ConversationState.conversation_id == conversation_id
-            )
-        ).values(
-            status=new_status,
-            metadata_json=meta,
-            updated_at=now
-        )
-    )
-
-    # Log system event
-    event = ConversationEvent(
-        id=uuid_mod.uuid4(),
-        project_id=project_uuid,
-        channel_type=state.channel_type,
-        channel_identifier=state.channel_identifier,
-        conversation_id=conversation_id,
-        direction="system",
-        message_type="status_change",
-        text=f"Bot {action} por {current_user.name or current_user.email}",
+    # Update state + log system event
+    event_id = await _update_state_and_log_event(
+        db,
+        state,
+        {"status": new_status, "metadata_json": meta, "updated_at": now},
+        {
+            "project_id": project_uuid,
+            "channel_type": state.channel_type,
+            "channel_identifier": state.channel_identifier,
+            "conversation_id": conversation_id,
+            "direction": "system",
+            "message_type": "status_change",
+            "text": f"Bot {action} por {current_user.name or current_user.email}",
+        },
     )
-    db.add(event)
+    if event_id is None:
+        raise HTTPException(status_code=404, detail="Conversa não encontrada")
     await db.commit()
 
     return {
@@ -1143,67 +1405,57 @@ async def send_human_message(
     body: SendMessageRequest,
     channel_type: Optional[str] = Query(default=None),
     db: AsyncSession = Depends(get_db),
-    current_user: DashboardUser = Depends(get_current_user)
+    current_user: DashboardUser = Depends(get_current_user),
 ):
     """Send a message from the dashboard as a human agent via Meta API."""
-    project_uuid, state = await _get_conversation_state(
+    # State and channel credentials in one query
+    project_uuid, state, token = await _get_state_and_channel_token(
         project_id, conversation_id, current_user, db, channel_type
     )
 
-    # Get channel credentials
-    channel = (await db.execute(
-        select(Channel).where(
-            and_(
-                Channel.project_id == project_uuid,
-                Channel.channel_type == state.channel_type,
-                Channel.channel_identifier == state.channel_identifier
-            )
-        )
-    )).scalar_one_or_none()
-
-    if not channel or not channel.access_token:
+    if not token:
         raise HTTPException(
             status_code=400,
             detail=f"Canal {state.channel_type}/{state.channel_identifier} sem access_token configurado"
         )
 
     # Send via Meta API
-    token = channel.access_token
     api_version = "v21.0"
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        if state.channel_type == "whatsapp":
-            resp = await client.post(
-                f"https://graph.facebook.com/{api_version}/{state.channel_identifier}/messages",
-                headers={"Authorization": f"Bearer {token}"},
-                json={
-                    "messaging_product": "whatsapp",
-                    "recipient_type": "individual",
-                    "to": conversation_id,
-                    "type": "text",
-                    "text": {"body": body.text}
-                }
-            )
-        elif state.channel_type == "messenger":
-            resp = await client.post(
-                f"https://graph.facebook.com/{api_version}/me/messages",
-                params={"access_token": token},
-                json={
-                    "recipient": {"id": conversation_id},
-                    "message": {"text": body.text}
-                }
-            )
-        elif state.channel_type == "instagram":
-            resp = await client.post(
-                f"https://graph.facebook.com/{api_version}/{state.channel_identifier}/messages",
-                params={"access_token": token},
-                json={
-                    "recipient": {"id": conversation_id},
-                    "message": {"text": body.text}
-                }
-            )
-        else:
-            raise HTTPException(status_code=400, detail=f"Canal '{state.channel_type}' não suportado para envio")
+    # Shared pooled client: connections to graph.facebook.com are reused across sends
+    client = get_meta_client()
+    if state.channel_type == "whatsapp":
+        resp = await client.post(
+            f"https://graph.facebook.com/{api_version}/{state.channel_identifier}/messages",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "messaging_product": "whatsapp",
+                "recipient_type": "individual",
+                "to": conversation_id,
+                "type": "text",
+                "text": {"body": body.text}
+            }
+        )
+    elif state.channel_type == "messenger":
+        resp = await client.post(
+            f"https://graph.facebook.com/{api_version}/me/messages",
+            params={"access_token": token},
+            json={
+                "recipient": {"id": conversation_id},
+                "message": {"text": body.text}
+            }
+        )
+    elif state.channel_type == "instagram":
+        resp = await client.post(
+            f"https://graph.facebook.com/{api_version}/{state.channel_identifier}/messages",
+            params={"access_token": token},
+            json={
+                "recipient": {"id": conversation_id},
+                "message": {"text": body.text}
+            }
+        )
+    else:
+        raise HTTPException(status_code=400, detail=f"Canal '{state.channel_type}' não suportado para envio")
 
     if resp.status_code not in (200, 201):
         raise HTTPException(
@@ -1213,19 +1465,6 @@ async def send_human_message(
 
     now = datetime.now(timezone.utc)
 
-    # Save outgoing event
-    event = ConversationEvent(
-        id=uuid_mod.uuid4(),
-        project_id=project_uuid,
-        channel_type=state.channel_type,
-        channel_identifier=state.channel_identifier,
-        conversation_id=conversation_id,
-        direction="out",
-        message_type="human_reply",
-        text=body.text,
-    )
-    db.add(event)
-
     # Auto-handoff if not already
     meta = dict(state.metadata_json or {})
     new_status = state.status
@@ -1234,31 +1473,41 @@ async def send_human_message(
         meta["human_takeover_until"] = (now + timedelta(hours=3)).isoformat()
         meta["human_agent_name"] = current_user.name or current_user.email
 
-    # Update conversation state
-    await db.execute(
-        sa_update(ConversationState).where(
-            and_(
-                ConversationState.project_id == project_uuid,
-                ConversationState.channel_type == state.channel_type,
-                ConversationState.conversation_id == conversation_id
-            )
-        ).values(
-            status=new_status,
-            last_event_at=now,
-            last_direction="out",
-            last_message_type="human_reply",
-            last_text=body.text,
-            metadata_json=meta,
-            updated_at=now
-        )
+    # Update conversation state + save outgoing event
+    event_id = await _update_state_and_log_event(
+        db,
+        state,
+        {
+            "status": new_status,
+            "last_event_at": now,
+            "last_direction": "out",
+            "last_message_type": "human_reply",
+            "last_text": body.text,
+            "metadata_json": meta,
+            "updated_at": now,
+        },
+        {
+            "project_id": project_uuid,
+            "channel_type": state.channel_type,
+            "channel_identifier": state.channel_identifier,
+            "conversation_id": conversation_id,
+            "direction": "out",
+            "message_type": "human_reply",
+            "text": body.text,
+        },
     )
-
     await db.commit()
+    if event_id is None:
+        # Already delivered by Meta: report the send, just without a stored message id
+        logger.warning(
+            f"Conversation state vanished before logging sent message: project={project_uuid} "
+            f"conversation={conversation_id} channel_type={state.channel_type}"
+        )
 
     return {
         "ok": True,
-        "message_id": str(event.id),
-        "meta_response": resp.json(),
+        "message_id": str(event_id) if event_id is not None else None,
+        "meta_response": from_json(resp.content),
         "status": new_status,
         "human_takeover_until": meta.get("human_takeover_until")
     }
@@ -1294,37 +1543,28 @@ async def transfer_to_human(
     meta["human_agent_name"] = current_user.name or current_user.email
     meta["transfer_reason"] = body.reason or "Transferido pelo dashboard"
 
-    await db.execute(
-        sa_update(ConversationState).where(
-            and_(
-                ConversationState.project_id == project_uuid,
-                ConversationState.channel_type == state.channel_type,
-                ConversationState.conversation_id == conversation_id
-            )
-        ).values(
-            status="handoff",
-            metadata_json=meta,
-            updated_at=now
-        )
-    )
-
-    # Log system event
-    event = ConversationEvent(
-        id=uuid_mod.uuid4(),
-        project_id=project_uuid,
-        channel_type=state.channel_type,
-        channel_identifier=state.channel_identifier,
-        conversation_id=conversation_id,
-        direction="system",
-        message_type="status_change",
-        text=f"Transferido para humano por {current_user.name or current_user.email}" + (f": {body.reason}" if body.reason else ""),
+    # Update state + log system event
+    event_id = await _update_state_and_log_event(
+        db,
+        state,
+        {"status": "handoff", "metadata_json": meta, "updated_at": now},
+        {
+            "project_id": project_uuid,
+            "channel_type": state.channel_type,
+            "channel_identifier": state.channel_identifier,
+            "conversation_id": conversation_id,
+            "direction": "system",
+            "message_type": "status_change",
+            "text": f"Transferido para humano por {current_user.name or current_user.email}" + (f": {body.reason}" if body.reason else ""),
+        },
     )
-    db.add(event)
+    if event_id is None:
+        raise HTTPException(status_code=404, detail="Conversa não encontrada")
     await db.commit()
 
     # Resolve contact name for notifications
     contact_result = await db.execute(
-        select(Contact.name).where(Contact.id == conversation_id)
+        select(Contact.name).where(Contact.project_id == project_uuid, Contact.id == conversation_id)
     )
     raw_name = contact_result.scalars().first()
     if not raw_name:
@@ -2,23 +2,33 @@
 ElevenLabs Proxy API - Manage agents, tools, and prompts
 """
 from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from pydantic import BaseModel, ConfigDict
+from pydantic_core import from_json, to_json
 from typing import Optional, List, Dict, Any
+import asyncio
 import httpx
+import logging
 import os
 
+from contextlib import asynccontextmanager
 from uuid import UUID, uuid4
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import desc, and_
+from sqlalchemy import bindparam, desc, and_, func
 
-from app.db.database import get_db
+from app.db.database import async_session, get_db
 from app.db.models import DashboardUser, Client, VoiceCallHistory, ProjectVoiceAgent
 from app.api.routes.auth import get_current_user
+from app.core import call_ingest
+from app.core.elevenlabs_cache import agent_ids_cache, api_key_cache, invalidate_client_cache
+from app.core.elevenlabs_client import get_elevenlabs_client
 from app.core.tenancy import resolve_project_id_from_client_id
 
 router = APIRouter(prefix="/api/elevenlabs", tags=["elevenlabs"])
+logger = logging.getLogger("superbot.elevenlabs")
 
 # ElevenLabs API config
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
@@ -72,22 +82,37 @@ class ActiveAgentUpdate(BaseModel):
 
 
 # Helper: Get client's ElevenLabs API key
-async def get_client_elevenlabs_key(client_id: str, db: AsyncSession) -> str:
+async def get_client_elevenlabs_key(client_id: str | UUID, db: AsyncSession) -> str:
     """Get ElevenLabs API key for client - check clients table first, then fallback"""
+    cached = api_key_cache.get(str(client_id))
+    if cached is not None:
+        return cached
+
     result = await db.execute(
         select(Client.elevenlabs_api_key).where(Client.id == client_id)
     )
     row = result.scalar_one_or_none()
 
-    if row:
-        return row
-
     # Fallback to global key
-    return ELEVENLABS_API_KEY
+    api_key = row or ELEVENLABS_API_KEY
+    if api_key:
+        api_key_cache.set(str(client_id), api_key)
+    return api_key
+
+
+async def get_client_agent_ids(client_id: str | UUID, db: AsyncSession) -> tuple[str, ...]:
+    """Get the ElevenLabs agent IDs configured for this client, in priority order (cached for a minute).
+
+    Returns the cached tuple itself: it's immutable, so callers share it without a copy.
+    """
+    cached = agent_ids_cache.get(str(client_id))
+    if cached is None:
+        cached = tuple(await _load_client_agent_ids(client_id, db))
+        agent_ids_cache.set(str(client_id), cached)
+    return cached
 
 
-async def get_client_agent_ids(client_id: str, db: AsyncSession) -> List[str]:
-    """Get list of ElevenLabs agent IDs configured for this client."""
+async def _load_client_agent_ids(client_id: str | UUID, db: AsyncSession) -> List[str]:
     # Preferred source: active project_voice_agents linked to tenant's project.
     try:
         project_id = await resolve_project_id_from_client_id(client_id, db)
@@ -125,8 +150,9 @@ async def get_client_agent_ids(client_id: str, db: AsyncSession) -> List[str]:
     return [aid.strip() for aid in str(agent_id).split(",") if aid.strip()]
 
 
-async def _sync_client_agent_ids(client_id: str, project_id: str, db: AsyncSession) -> None:
+async def _sync_client_agent_ids(client_id: str | UUID, project_id: str, db: AsyncSession) -> None:
     """Keep clients.elevenlabs_agent_id synchronized with active project_voice_agents."""
+    invalidate_client_cache(client_id)
     try:
         client_uuid = UUID(str(client_id))
     except Exception:
@@ -176,12 +202,106 @@ def _build_elevenlabs_audio_url(conversation_id: Optional[str]) -> Optional[str]
     return f"{ELEVENLABS_BASE_URL}/convai/conversations/{conv_id}/audio"
 
 
+# Per-worker locks for add_agent_tool's GET-modify-PATCH of an agent's tools:
+# agent id -> [lock, requests holding or waiting on it]. An entry is dropped
+# when its last request leaves, so the dict only holds agents being edited.
+_agent_tool_locks: Dict[str, list] = {}
+
+
+@asynccontextmanager
+async def _agent_tool_lock(agent_id: str):
+    key = _normalize_agent_id(agent_id)
+    entry = _agent_tool_locks.setdefault(key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _agent_tool_locks[key]
+
+# Up to this many allowed agents, list_agents GETs each one (in parallel) instead
+# of downloading the whole workspace list.
+AGENT_FANOUT_MAX = 10
+
+
+async def _fetch_agents_by_id(
+    client: httpx.AsyncClient, api_key: str, agent_ids: tuple[str, ...]
+) -> List[Dict[str, Any]]:
+    """GET /convai/agents/{id} for each id concurrently.
+
+    An id whose GET fails (404 or any other non-2xx) is skipped and logged, so
+    list_agents reports it as `_missing` instead of failing the whole list.
+    """
+    responses = await asyncio.gather(*(
+        client.get(
+            f"{ELEVENLABS_BASE_URL}/convai/agents/{_normalize_agent_id(agent_id)}",
+            headers={"xi-api-key": api_key},
+        )
+        for agent_id in agent_ids
+    ))
+    agents = []
+    for agent_id, response in zip(agent_ids, responses):
+        if not response.is_success:
+            logger.warning(
+                "ElevenLabs agent %s unavailable: HTTP %s %s",
+                _normalize_agent_id(agent_id), response.status_code, response.text[:200],
+            )
+            continue
+        agents.append(from_json(response.content))
+    return agents
+
+
+async def _stream_passthrough(client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> StreamingResponse:
+    """GET an upstream JSON body and stream it through as-is.
+
+    Raw bytes go from the upstream socket to ours (no buffering, decode or
+    re-encode), keeping the upstream Content-Encoding. Error statuses are read
+    and raised as httpx.HTTPStatusError like raise_for_status().
+    """
+    response = await client.send(client.build_request("GET", url, headers=headers), stream=True)
+    if response.is_error:
+        await response.aread()
+        await response.aclose()
+        response.raise_for_status()
+    passthrough_headers = {}
+    if "content-encoding" in response.headers:
+        passthrough_headers["Content-Encoding"] = response.headers["content-encoding"]
+    return StreamingResponse(
+        response.aiter_raw(),
+        media_type="application/json",
+        headers=passthrough_headers,
+        background=BackgroundTask(response.aclose),
+    )
+
+
+# Upstream statuses about the request itself, forwarded as-is to the dashboard.
+_FORWARDED_UPSTREAM_STATUSES = frozenset({400, 404, 409, 422, 429})
+
+
+def _elevenlabs_error(e: httpx.HTTPError) -> HTTPException:
+    """Map an ElevenLabs call failure to the dashboard's response.
+
+    Request errors (400/404/409/422/429) are forwarded with the upstream body.
+    401/403 mean the client's xi-api-key was rejected, not the user's session
+    (the dashboard logs out on any 401): 502 with the upstream body. The rest is a 500.
+    """
+    if isinstance(e, httpx.HTTPStatusError):
+        status_code = e.response.status_code
+        if status_code in _FORWARDED_UPSTREAM_STATUSES:
+            return HTTPException(status_code=status_code, detail=e.response.text or str(e))
+        if status_code in (401, 403):
+            return HTTPException(status_code=502, detail=e.response.text or str(e))
+    return HTTPException(status_code=500, detail=f"Erro ElevenLabs: {e}")
+
+
 # Helper: Check access
-def check_access(client_id: str, current_user: DashboardUser):
+def check_access(client_id: UUID, current_user: DashboardUser):
     if current_user.role == "admin":
         return True
     
-    if str(current_user.client_id) != client_id:
+    if current_user.client_id != client_id:
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     return True
@@ -190,7 +310,7 @@ def check_access(client_id: str, current_user: DashboardUser):
 # Routes
 @router.get("/agents/{client_id}")
 async def list_agents(
-    client_id: str,
+    client_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
 ):
@@ -225,48 +345,54 @@ async def list_agents(
                 }
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        client = get_elevenlabs_client()
+        if len(allowed_ids) <= AGENT_FANOUT_MAX:
+            # Few agents: fetch just those instead of the whole workspace list
+            data: Any = {}
+            raw_agents = await _fetch_agents_by_id(client, api_key, allowed_ids)
+        else:
             response = await client.get(
                 f"{ELEVENLABS_BASE_URL}/convai/agents",
                 headers={"xi-api-key": api_key}
             )
             response.raise_for_status()
-            data = response.json()
-
+            data = from_json(response.content)
             raw_agents = data.get("agents", []) if isinstance(data, dict) else []
-            by_id = {
-                _normalize_agent_id(agent.get("agent_id")): agent
-                for agent in raw_agents
-                if isinstance(agent, dict) and _normalize_agent_id(agent.get("agent_id"))
-            }
 
-            ordered_agents: List[Dict[str, Any]] = []
-            for allowed_id in allowed_ids:
-                normalized_id = _normalize_agent_id(allowed_id)
-                agent_payload = by_id.get(normalized_id, {"agent_id": normalized_id, "_missing": True}).copy()
-                config = configured_meta.get(normalized_id) or {}
-
-                if config.get("label"):
-                    agent_payload.setdefault("name", config["label"])
-                    agent_payload["_configured_label"] = config["label"]
-                if config.get("channel_type"):
-                    agent_payload["_configured_channel_type"] = config["channel_type"]
-                if "active" in config:
-                    agent_payload["_configured_active"] = bool(config["active"])
-
-                ordered_agents.append(agent_payload)
-
-            if isinstance(data, dict):
-                data["agents"] = ordered_agents
-                return data
-            return {"agents": ordered_agents}
+        by_id = {
+            _normalize_agent_id(agent.get("agent_id")): agent
+            for agent in raw_agents
+            if isinstance(agent, dict) and _normalize_agent_id(agent.get("agent_id"))
+        }
+
+        ordered_agents: List[Dict[str, Any]] = []
+        for allowed_id in allowed_ids:
+            normalized_id = _normalize_agent_id(allowed_id)
+            agent_payload = by_id.get(normalized_id, {"agent_id": normalized_id, "_missing": True}).copy()
+            config = configured_meta.get(normalized_id) or {}
+
+            if config.get("label"):
+                agent_payload.setdefault("name", config["label"])
+                agent_payload["_configured_label"] = config["label"]
+            if config.get("channel_type"):
+                agent_payload["_configured_channel_type"] = config["channel_type"]
+            if "active" in config:
+                agent_payload["_configured_active"] = bool(config["active"])
+
+            ordered_agents.append(agent_payload)
+
+        if isinstance(data, dict):
+            data["agents"] = ordered_agents
+        else:
+            data = {"agents": ordered_agents}
+        return Response(content=to_json(data), media_type="application/json")
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.get("/active-agents/{client_id}")
 async def list_active_agents(
-    client_id: str,
+    client_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
 ):
@@ -317,7 +443,7 @@ async def list_active_agents(
 
 @router.post("/active-agents/{client_id}")
 async def add_active_agent(
-    client_id: str,
+    client_id: UUID,
     data: ActiveAgentCreate,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -337,24 +463,24 @@ async def add_active_agent(
 
     # Validate agent in ElevenLabs and capture current configured name.
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
-                headers={"xi-api-key": api_key},
-            )
-            response.raise_for_status()
-            payload = response.json() if response.content else {}
-            elevenlabs_name = (
-                payload.get("name")
-                or payload.get("platform_settings", {}).get("widget_settings", {}).get("name")
-            )
+        client = get_elevenlabs_client()
+        response = await client.get(
+            f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
+            headers={"xi-api-key": api_key},
+        )
+        response.raise_for_status()
+        payload = response.json() if response.content else {}
+        elevenlabs_name = (
+            payload.get("name")
+            or payload.get("platform_settings", {}).get("widget_settings", {}).get("name")
+        )
     except httpx.HTTPStatusError as e:
         detail = "Agent nao encontrado no ElevenLabs"
         if e.response is not None and e.response.text:
             detail = f"{detail}: {e.response.text}"
         raise HTTPException(status_code=400, detail=detail)
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
     existing_result = await db.execute(
         select(ProjectVoiceAgent)
@@ -401,7 +527,7 @@ async def add_active_agent(
 
 @router.patch("/active-agents/{client_id}/{agent_id}")
 async def update_active_agent(
-    client_id: str,
+    client_id: UUID,
     agent_id: str,
     data: ActiveAgentUpdate,
     db: AsyncSession = Depends(get_db),
@@ -456,7 +582,7 @@ async def update_active_agent(
 
 @router.delete("/active-agents/{client_id}/{agent_id}")
 async def deactivate_active_agent(
-    client_id: str,
+    client_id: UUID,
     agent_id: str,
     channel_type: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
@@ -503,7 +629,7 @@ async def deactivate_active_agent(
 
 @router.get("/agents/{client_id}/{agent_id}")
 async def get_agent(
-    client_id: str,
+    client_id: UUID,
     agent_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -513,18 +639,15 @@ async def get_agent(
     api_key = await get_client_elevenlabs_key(client_id, db)
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
-                headers={"xi-api-key": api_key}
-            )
-            response.raise_for_status()
-            data = response.json()
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=detail)
+        client = get_elevenlabs_client()
+        response = await client.get(
+            f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
+            headers={"xi-api-key": api_key}
+        )
+        response.raise_for_status()
+        data = response.json()
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
     # Enrich with DB metadata from project_voice_agents
     try:
@@ -552,7 +675,7 @@ async def get_agent(
 
 @router.post("/agents/{client_id}")
 async def create_agent(
-    client_id: str,
+    client_id: UUID,
     data: AgentCreate,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -592,45 +715,42 @@ async def create_agent(
         payload["conversation_config"]["tts"]["voice_id"] = data.voice_id
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{ELEVENLABS_BASE_URL}/convai/agents/create",
-                headers={"xi-api-key": api_key, "Content-Type": "application/json"},
-                json=payload,
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            # Auto-link to project in DB
-            agent_id = result.get("agent_id")
-            if agent_id:
-                try:
-                    project_id = await resolve_project_id_from_client_id(client_id, db)
-                    row = ProjectVoiceAgent(
-                        project_id=project_id,
-                        agent_id=agent_id,
-                        label=data.name,
-                        channel_type=_normalize_channel_type(data.channel_type),
-                        active=True,
-                    )
-                    db.add(row)
-                    await db.flush()
-                    await _sync_client_agent_ids(client_id, project_id, db)
-                    await db.commit()
-                except Exception:
-                    pass
-
-            return result
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=f"Erro ElevenLabs: {detail}")
+        client = get_elevenlabs_client()
+        response = await client.post(
+            f"{ELEVENLABS_BASE_URL}/convai/agents/create",
+            headers={"xi-api-key": api_key, "Content-Type": "application/json"},
+            json=payload,
+        )
+        response.raise_for_status()
+        result = response.json()
+
+        # Auto-link to project in DB
+        agent_id = result.get("agent_id")
+        if agent_id:
+            try:
+                project_id = await resolve_project_id_from_client_id(client_id, db)
+                row = ProjectVoiceAgent(
+                    project_id=project_id,
+                    agent_id=agent_id,
+                    label=data.name,
+                    channel_type=_normalize_channel_type(data.channel_type),
+                    active=True,
+                )
+                db.add(row)
+                await db.flush()
+                await _sync_client_agent_ids(client_id, project_id, db)
+                await db.commit()
+            except Exception:
+                pass
+
+        return result
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.patch("/agents/{client_id}/{agent_id}")
 async def update_agent(
-    client_id: str,
+    client_id: UUID,
     agent_id: str,
     data: AgentUpdate,
     db: AsyncSession = Depends(get_db),
@@ -692,25 +812,26 @@ async def update_agent(
         # Fetch KB metadata to get correct type/name for each doc
         kb_entries = []
         try:
-            async with httpx.AsyncClient(timeout=15.0) as kb_client:
-                kb_response = await kb_client.get(
-                    f"{ELEVENLABS_BASE_URL}/convai/knowledge-base",
-                    headers={"xi-api-key": api_key},
-                )
-                kb_response.raise_for_status()
-                kb_data = kb_response.json()
-                all_docs = kb_data.get("documents", kb_data.get("knowledge_base", []))
-                doc_map = {d.get("id"): d for d in all_docs if isinstance(d, dict)}
-
-                for kid in data.knowledge_base_ids:
-                    doc = doc_map.get(kid, {})
-                    # ElevenLabs requires type (file/text/url), name, id
-                    kb_entries.append({
-                        "type": doc.get("type", "file"),
-                        "name": doc.get("name", kid),
-                        "id": kid,
-                        "usage_mode": "auto",
-                    })
+            kb_client = get_elevenlabs_client()
+            kb_response = await kb_client.get(
+                f"{ELEVENLABS_BASE_URL}/convai/knowledge-base",
+                headers={"xi-api-key": api_key},
+                timeout=15.0,
+            )
+            kb_response.raise_for_status()
+            kb_data = kb_response.json()
+            all_docs = kb_data.get("documents", kb_data.get("knowledge_base", []))
+            doc_map = {d.get("id"): d for d in all_docs if isinstance(d, dict)}
+
+            for kid in data.knowledge_base_ids:
+                doc = doc_map.get(kid, {})
+                # ElevenLabs requires type (file/text/url), name, id
+                kb_entries.append({
+                    "type": doc.get("type", "file"),
+                    "name": doc.get("name", kid),
+                    "id": kid,
+                    "usage_mode": "auto",
+                })
         except Exception:
             # Fallback: use 'file' type with id as name
             kb_entries = [
@@ -722,24 +843,21 @@ async def update_agent(
         prompt_cfg["knowledge_base"] = kb_entries
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.patch(
-                f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
-                headers={"xi-api-key": api_key, "Content-Type": "application/json"},
-                json=payload
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=detail)
+        client = get_elevenlabs_client()
+        response = await client.patch(
+            f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
+            headers={"xi-api-key": api_key, "Content-Type": "application/json"},
+            json=payload
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.delete("/agents/{client_id}/{agent_id}")
 async def delete_agent(
-    client_id: str,
+    client_id: UUID,
     agent_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -749,20 +867,20 @@ async def delete_agent(
     api_key = await get_client_elevenlabs_key(client_id, db)
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
-                headers={"xi-api-key": api_key}
-            )
-            response.raise_for_status()
-            return {"success": True, "message": "Agent removido"}
+        client = get_elevenlabs_client()
+        response = await client.delete(
+            f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
+            headers={"xi-api-key": api_key}
+        )
+        response.raise_for_status()
+        return {"success": True, "message": "Agent removido"}
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.get("/workspace-agents/{client_id}")
 async def list_workspace_agents(
-    client_id: str,
+    client_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
 ):
@@ -771,23 +889,23 @@ async def list_workspace_agents(
     api_key = await get_client_elevenlabs_key(client_id, db)
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{ELEVENLABS_BASE_URL}/convai/agents",
-                headers={"xi-api-key": api_key},
-                params={"page_size": 100}
-            )
-            response.raise_for_status()
-            data = response.json()
-            agents_list = data.get("agents", [])
-            return {"agents": agents_list}
+        client = get_elevenlabs_client()
+        response = await client.get(
+            f"{ELEVENLABS_BASE_URL}/convai/agents",
+            headers={"xi-api-key": api_key},
+            params={"page_size": 100}
+        )
+        response.raise_for_status()
+        data = response.json()
+        agents_list = data.get("agents", [])
+        return {"agents": agents_list}
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.get("/voices/{client_id}")
 async def list_voices(
-    client_id: str,
+    client_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
 ):
@@ -796,20 +914,18 @@ async def list_voices(
     api_key = await get_client_elevenlabs_key(client_id, db)
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{ELEVENLABS_BASE_URL}/voices",
-                headers={"xi-api-key": api_key}
-            )
-            response.raise_for_status()
-            return response.json()
+        return await _stream_passthrough(
+            get_elevenlabs_client(),
+            f"{ELEVENLABS_BASE_URL}/voices",
+            headers={"xi-api-key": api_key},
+        )
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.post("/agents/{client_id}/{agent_id}/tools")
 async def add_agent_tool(
-    client_id: str,
+    client_id: UUID,
     agent_id: str,
     tool: ToolConfig,
     db: AsyncSession = Depends(get_db),
@@ -819,9 +935,11 @@ async def add_agent_tool(
     check_access(client_id, current_user)
     api_key = await get_client_elevenlabs_key(client_id, db)
 
-    # Get current agent config
+    # Get current agent config. GET + PATCH of the tools list is a read-modify-write:
+    # serialize it per agent so concurrent adds don't drop each other's tool.
     try:
-        async with httpx.AsyncClient() as client:
+        async with _agent_tool_lock(agent_id):
+            client = get_elevenlabs_client()
             # Get agent
             get_response = await client.get(
                 f"{ELEVENLABS_BASE_URL}/convai/agents/{agent_id}",
@@ -870,7 +988,7 @@ async def add_agent_tool(
             }
 
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 # ─── Workspace Tools CRUD (proxy to ElevenLabs /v1/convai/tools) ─────
@@ -900,7 +1018,7 @@ class WorkspaceToolCreate(BaseModel):
 
 @router.get("/tools/{client_id}")
 async def list_workspace_tools(
-    client_id: str,
+    client_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
 ):
@@ -909,20 +1027,18 @@ async def list_workspace_tools(
     api_key = await get_client_elevenlabs_key(client_id, db)
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{ELEVENLABS_BASE_URL}/convai/tools",
-                headers={"xi-api-key": api_key}
-            )
-            response.raise_for_status()
-            return response.json()
+        return await _stream_passthrough(
+            get_elevenlabs_client(),
+            f"{ELEVENLABS_BASE_URL}/convai/tools",
+            headers={"xi-api-key": api_key},
+        )
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.post("/tools/{client_id}")
 async def create_workspace_tool(
-    client_id: str,
+    client_id: UUID,
     data: WorkspaceToolCreate,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -986,24 +1102,21 @@ async def create_workspace_tool(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{ELEVENLABS_BASE_URL}/convai/tools",
-                headers={"xi-api-key": api_key, "Content-Type": "application/json"},
-                json=payload,
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=detail)
+        client = get_elevenlabs_client()
+        response = await client.post(
+            f"{ELEVENLABS_BASE_URL}/convai/tools",
+            headers={"xi-api-key": api_key, "Content-Type": "application/json"},
+            json=payload,
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.patch("/tools/{client_id}/{tool_id}")
 async def update_workspace_tool(
-    client_id: str,
+    client_id: UUID,
     tool_id: str,
     data: WorkspaceToolCreate,
     db: AsyncSession = Depends(get_db),
@@ -1057,24 +1170,21 @@ async def update_workspace_tool(
     payload: Dict[str, Any] = {"tool_config": tool_config}
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.patch(
-                f"{ELEVENLABS_BASE_URL}/convai/tools/{tool_id}",
-                headers={"xi-api-key": api_key, "Content-Type": "application/json"},
-                json=payload,
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=detail)
+        client = get_elevenlabs_client()
+        response = await client.patch(
+            f"{ELEVENLABS_BASE_URL}/convai/tools/{tool_id}",
+            headers={"xi-api-key": api_key, "Content-Type": "application/json"},
+            json=payload,
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.get("/tools/{client_id}/{tool_id}")
 async def get_workspace_tool(
-    client_id: str,
+    client_id: UUID,
     tool_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -1084,23 +1194,18 @@ async def get_workspace_tool(
     api_key = await get_client_elevenlabs_key(client_id, db)
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{ELEVENLABS_BASE_URL}/convai/tools/{tool_id}",
-                headers={"xi-api-key": api_key}
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=detail)
+        return await _stream_passthrough(
+            get_elevenlabs_client(),
+            f"{ELEVENLABS_BASE_URL}/convai/tools/{tool_id}",
+            headers={"xi-api-key": api_key},
+        )
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.delete("/tools/{client_id}/{tool_id}")
 async def delete_workspace_tool(
-    client_id: str,
+    client_id: UUID,
     tool_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -1110,25 +1215,22 @@ async def delete_workspace_tool(
     api_key = await get_client_elevenlabs_key(client_id, db)
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.delete(
-                f"{ELEVENLABS_BASE_URL}/convai/tools/{tool_id}",
-                headers={"xi-api-key": api_key}
-            )
-            response.raise_for_status()
-            return {"success": True, "message": "Tool removida"}
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=detail)
+        client = get_elevenlabs_client()
+        response = await client.delete(
+            f"{ELEVENLABS_BASE_URL}/convai/tools/{tool_id}",
+            headers={"xi-api-key": api_key}
+        )
+        response.raise_for_status()
+        return {"success": True, "message": "Tool removida"}
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 # ─── Knowledge Base CRUD (proxy to ElevenLabs /v1/convai/knowledge-base) ─────
 
 @router.get("/knowledge/{client_id}")
 async def list_knowledge_base(
-    client_id: str,
+    client_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
 ):
@@ -1137,20 +1239,18 @@ async def list_knowledge_base(
     api_key = await get_client_elevenlabs_key(client_id, db)
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{ELEVENLABS_BASE_URL}/convai/knowledge-base",
-                headers={"xi-api-key": api_key}
-            )
-            response.raise_for_status()
-            return response.json()
+        return await _stream_passthrough(
+            get_elevenlabs_client(),
+            f"{ELEVENLABS_BASE_URL}/convai/knowledge-base",
+            headers={"xi-api-key": api_key},
+        )
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.post("/knowledge/{client_id}")
 async def create_knowledge_doc(
-    client_id: str,
+    client_id: UUID,
     data: Dict[str, Any],
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -1165,42 +1265,41 @@ async def create_knowledge_doc(
     name = data.get("name", "Documento")
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            if doc_type == "url":
-                payload = {
-                    "type": "url",
-                    "name": name,
-                    "url": data.get("url", ""),
-                }
-                response = await client.post(
-                    f"{ELEVENLABS_BASE_URL}/convai/knowledge-base",
-                    headers={"xi-api-key": api_key, "Content-Type": "application/json"},
-                    json=payload
-                )
-            else:
-                # Text or file upload via multipart
-                text_content = data.get("text", data.get("content", ""))
-                files = {"file": (f"{name}.txt", text_content.encode("utf-8"), "text/plain")}
-                form_data = {"name": name}
-                response = await client.post(
-                    f"{ELEVENLABS_BASE_URL}/convai/knowledge-base",
-                    headers={"xi-api-key": api_key},
-                    files=files,
-                    data=form_data
-                )
+        client = get_elevenlabs_client()
+        if doc_type == "url":
+            payload = {
+                "type": "url",
+                "name": name,
+                "url": data.get("url", ""),
+            }
+            response = await client.post(
+                f"{ELEVENLABS_BASE_URL}/convai/knowledge-base",
+                headers={"xi-api-key": api_key, "Content-Type": "application/json"},
+                json=payload,
+                timeout=60.0,
+            )
+        else:
+            # Text or file upload via multipart
+            text_content = data.get("text", data.get("content", ""))
+            files = {"file": (f"{name}.txt", text_content.encode("utf-8"), "text/plain")}
+            form_data = {"name": name}
+            response = await client.post(
+                f"{ELEVENLABS_BASE_URL}/convai/knowledge-base",
+                headers={"xi-api-key": api_key},
+                files=files,
+                data=form_data,
+                timeout=60.0,
+            )
 
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=detail)
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 @router.delete("/knowledge/{client_id}/{doc_id}")
 async def delete_knowledge_doc(
-    client_id: str,
+    client_id: UUID,
     doc_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -1210,18 +1309,15 @@ async def delete_knowledge_doc(
     api_key = await get_client_elevenlabs_key(client_id, db)
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.delete(
-                f"{ELEVENLABS_BASE_URL}/convai/knowledge-base/{doc_id}",
-                headers={"xi-api-key": api_key}
-            )
-            response.raise_for_status()
-            return {"success": True, "message": "Documento removido"}
-    except httpx.HTTPStatusError as e:
-        detail = e.response.text if e.response else str(e)
-        raise HTTPException(status_code=e.response.status_code if e.response else 500, detail=detail)
+        client = get_elevenlabs_client()
+        response = await client.delete(
+            f"{ELEVENLABS_BASE_URL}/convai/knowledge-base/{doc_id}",
+            headers={"xi-api-key": api_key}
+        )
+        response.raise_for_status()
+        return {"success": True, "message": "Documento removido"}
     except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Erro ElevenLabs: {str(e)}")
+        raise _elevenlabs_error(e)
 
 
 # ─── Voice Call History (Webhook + API) ─────────────────────────────
@@ -1261,7 +1357,8 @@ def _parse_datetime(value: Any) -> Optional[datetime]:
             return _parse_datetime(int(normalized))
 
         try:
-            return datetime.fromisoformat(normalized.replace("Z", "+00:00"))
+            # C parser on 3.11+ (the runtime image); accepts a trailing "Z" as-is
+            return datetime.fromisoformat(normalized)
         except ValueError:
             return None
 
@@ -1306,13 +1403,24 @@ class CallWebhookPayload(BaseModel):
 async def receive_call_webhook(
     payload: CallWebhookPayload,
     db: AsyncSession = Depends(get_db),
-    x_webhook_secret: Optional[str] = None
+    x_webhook_secret: Optional[str] = None,
+    flush: bool = False,
 ):
-    """Receive call data from n8n workflows (ElevenLabs/Bitrix-compatible)."""
+    """Receive call data from n8n workflows (ElevenLabs/Bitrix-compatible).
+
+    Calls are queued and written in batches (response has `queued: true`);
+    `?flush=true` inserts synchronously before responding.
+    """
     # Simple auth check
     # In production, use Header dependency; here we accept from body or query
     extra = getattr(payload, "__pydantic_extra__", None) or {}
 
+    # Validated up front: a queued call is acknowledged before it is written
+    try:
+        project_uuid = UUID(str(payload.project_id))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="project_id inválido")
+
     start_dt = _first_non_empty(
         _parse_datetime(payload.start_time),
         _parse_datetime(extra.get("started_at")),
@@ -1441,8 +1549,8 @@ async def receive_call_webhook(
             "raw_payload": extra,
         }
 
-    call = VoiceCallHistory(
-        project_id=payload.project_id,
+    values = dict(
+        project_id=project_uuid,
         agent_id=agent_id,
         agent_name=payload.agent_name,
         conversation_id=conversation_id,
@@ -1458,15 +1566,96 @@ async def receive_call_webhook(
         audio_url=audio_url,
         data_collection=data_collection,
     )
-    db.add(call)
+
+    if not flush and call_ingest.is_running():
+        # Batched: the flusher writes it with other queued calls in one INSERT
+        values["id"] = uuid4()
+        call_ingest.enqueue_call(values)
+        return {"ok": True, "call_id": str(values["id"]), "queued": True}
+
+    # Core INSERT ... RETURNING: no ORM unit-of-work/identity bookkeeping on the ingest path
+    call_id = (await db.execute(
+        insert(VoiceCallHistory).values(**values).returning(VoiceCallHistory.id)
+    )).scalar_one()
     await db.commit()
 
-    return {"ok": True, "call_id": str(call.id)}
+    return {"ok": True, "call_id": str(call_id)}
+
+
+# list_calls statements, built once per filter combination: the request only
+# supplies bind values (pid, since, agent_id, today/tomorrow), so SQLAlchemy
+# skips rebuilding the construct and reuses the cached compiled SQL.
+_CALL_STATUS_FILTERS = {None: None, "successful": True, "failed": False}
+
+
+def _call_filters(by_agent: bool, successful: Optional[bool]) -> list:
+    filters = [
+        VoiceCallHistory.project_id == bindparam("pid"),
+        VoiceCallHistory.start_time >= bindparam("since"),
+    ]
+    if by_agent:
+        filters.append(VoiceCallHistory.agent_id == bindparam("agent_id"))
+    if successful is not None:
+        filters.append(VoiceCallHistory.call_successful == successful)
+    return filters
+
+
+# Agent label from project_voice_agents in the same statement (correlated
+# subquery: duplicate agent rows can't multiply the calls)
+_CALL_AGENT_LABEL = (
+    select(ProjectVoiceAgent.label)
+    .where(
+        ProjectVoiceAgent.project_id == VoiceCallHistory.project_id,
+        ProjectVoiceAgent.agent_id == VoiceCallHistory.agent_id,
+        ProjectVoiceAgent.label.is_not(None),
+        ProjectVoiceAgent.label != "",
+    )
+    .order_by(desc(ProjectVoiceAgent.updated_at), desc(ProjectVoiceAgent.created_at))
+    .limit(1)
+    .scalar_subquery()
+)
+
+_LIST_CALLS_ROWS = {
+    (by_agent, status): (
+        select(VoiceCallHistory, _CALL_AGENT_LABEL.label("agent_label"))
+        .where(*_call_filters(by_agent, successful))
+        .order_by(desc(VoiceCallHistory.start_time))
+        .limit(200)
+    )
+    for by_agent in (False, True)
+    for status, successful in _CALL_STATUS_FILTERS.items()
+}
+
+# (total, successful, total duration, today) over every matching call, not just the listed 200
+_LIST_CALLS_STATS = {
+    (by_agent, status): (
+        select(
+            func.count(),
+            func.count().filter(VoiceCallHistory.call_successful == True),
+            func.coalesce(func.sum(VoiceCallHistory.call_duration_secs), 0),
+            func.count().filter(
+                VoiceCallHistory.start_time >= bindparam("today_start"),
+                VoiceCallHistory.start_time < bindparam("tomorrow_start"),
+            ),
+        )
+        .select_from(VoiceCallHistory)
+        .where(*_call_filters(by_agent, successful))
+    )
+    for by_agent in (False, True)
+    for status, successful in _CALL_STATUS_FILTERS.items()
+}
+
+
+async def _call_stats(stmt, params: dict) -> tuple[int, int, int, int]:
+    """Run a _LIST_CALLS_STATS statement on its own session."""
+    async with async_session() as session:
+        result = await session.execute(stmt, params)
+        return tuple(result.one())
 
 
 @router.get("/calls/{client_id}")
 async def list_calls(
-    client_id: str,
+    client_id: UUID,
     days: int = 30,
     agent_id: Optional[str] = None,
     status: Optional[str] = None,
@@ -1477,54 +1666,34 @@ async def list_calls(
     check_access(client_id, current_user)
     project_id = await resolve_project_id_from_client_id(client_id, db)
 
-    since = datetime.now(timezone.utc) - timedelta(days=days)
-
-    filters = [
-        VoiceCallHistory.project_id == project_id,
-        VoiceCallHistory.start_time >= since,
-    ]
+    now = datetime.now(timezone.utc)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    variant = (bool(agent_id), status if status in _CALL_STATUS_FILTERS else None)
+    params = {"pid": project_id, "since": now - timedelta(days=days)}
     if agent_id:
-        filters.append(VoiceCallHistory.agent_id == agent_id)
-    if status == "successful":
-        filters.append(VoiceCallHistory.call_successful == True)
-    elif status == "failed":
-        filters.append(VoiceCallHistory.call_successful == False)
-
-    result = await db.execute(
-        select(VoiceCallHistory)
-        .where(and_(*filters))
-        .order_by(desc(VoiceCallHistory.start_time))
-        .limit(200)
+        params["agent_id"] = agent_id
+
+    # Rows on the request session, stats on their own session, in parallel
+    result, (total, successful, total_duration, today_count) = await asyncio.gather(
+        db.execute(_LIST_CALLS_ROWS[variant], params),
+        _call_stats(
+            _LIST_CALLS_STATS[variant],
+            {**params, "today_start": today_start, "tomorrow_start": today_start + timedelta(days=1)},
+        ),
     )
-    calls = result.scalars().all()
-
-    # Compute stats
-    total = len(calls)
-    successful = sum(1 for c in calls if c.call_successful)
-    total_duration = sum(c.call_duration_secs or 0 for c in calls)
-    avg_duration = total_duration // total if total > 0 else 0
-    today = datetime.now(timezone.utc).date()
-    today_count = sum(1 for c in calls if c.start_time and c.start_time.date() == today)
-
-    # Resolve agent names from project_voice_agents
-    agent_ids = list({c.agent_id for c in calls if c.agent_id})
-    agent_names: Dict[str, str] = {}
-    if agent_ids:
-        ar = await db.execute(
-            select(ProjectVoiceAgent.agent_id, ProjectVoiceAgent.label)
-            .where(ProjectVoiceAgent.project_id == project_id)
-        )
-        agent_names = {row[0]: row[1] for row in ar.all() if row[1]}
+    rows = result.all()
+    avg_duration = int(total_duration) // total if total > 0 else 0
 
-    def _agent_display(c):
-        return c.agent_name or agent_names.get(c.agent_id) or c.agent_id or "-"
+    def _agent_display(c, label):
+        return c.agent_name or label or c.agent_id or "-"
 
     def _audio_url(c: VoiceCallHistory) -> Optional[str]:
         if c.audio_url:
             return c.audio_url
         return _build_elevenlabs_audio_url(c.conversation_id)
 
-    return {
+    # pydantic-core encodes the datetimes (and the whole body) natively
+    return Response(content=to_json({
         "stats": {
             "total": total,
             "successful": successful,
@@ -1536,26 +1705,26 @@ async def list_calls(
             {
                 "id": str(c.id),
                 "agent_id": c.agent_id,
-                "agent_name": _agent_display(c),
+                "agent_name": _agent_display(c, label),
                 "conversation_id": c.conversation_id,
                 "customer_name": c.customer_name,
                 "customer_phone": c.customer_phone,
                 "customer_email": c.customer_email,
                 "call_duration_secs": c.call_duration_secs,
-                "start_time": c.start_time.isoformat() if c.start_time else None,
+                "start_time": c.start_time,
                 "call_successful": c.call_successful,
                 "termination_reason": c.termination_reason,
                 "transcript_summary": c.transcript_summary,
                 "audio_url": _audio_url(c),
             }
-            for c in calls
+            for c, label in rows
         ],
-    }
+    }), media_type="application/json")
 
 
 @router.get("/calls/{client_id}/{call_id}")
 async def get_call_detail(
-    client_id: str,
+    client_id: UUID,
     call_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -1610,7 +1779,7 @@ async def get_call_detail(
 
 @router.get("/calls/{client_id}/{call_id}/audio")
 async def get_call_audio(
-    client_id: str,
+    client_id: UUID,
     call_id: str,
     db: AsyncSession = Depends(get_db),
     current_user: DashboardUser = Depends(get_current_user)
@@ -1645,8 +1814,8 @@ async def get_call_audio(
         headers: Dict[str, str] = {}
         if "api.elevenlabs.io" in url:
             headers["xi-api-key"] = api_key
-        async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
-            return await client.get(url, headers=headers)
+        client = get_elevenlabs_client()
+        return await client.get(url, headers=headers, timeout=120.0, follow_redirects=True)
 
     response = await _fetch(source_url)
     if response.status_code >= 400:
@@ -3,18 +3,25 @@ Client Portal API - token-based access for clients to manage their conversations
 
 Supports: list conversations, view details, send messages, change status, schedule follow-ups.
 """
+import base64
+import hmac
 import os
-import httpx
-import uuid as uuid_mod
+import time
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, select, desc, func, update as sa_update
+from sqlalchemy import (
+    and_, bindparam, case, cast, desc, func, literal_column, select, tuple_, update as sa_update
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from pydantic import BaseModel
+from pydantic_core import from_json
 from typing import Optional, List
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
+from app.core.cache import TTLCache
+from app.core.meta_client import get_meta_client
 from app.db.database import get_db
 from app.db.models import (
     DashboardUser, ConversationEvent, ConversationState, Contact, Channel
@@ -22,8 +29,8 @@ from app.db.models import (
 from app.api.routes.auth import get_current_user
 from app.api.routes.conversations import (
     extract_text_from_raw, extract_contact_name_from_raw,
-    format_contact_display, _resolve_contact_names, _get_last_text_fallback,
-    _is_meta_echo_event,
+    format_contact_display, _conversation_page_query,
+    _event_id_values, _is_meta_echo_event, _json_response,
     MessageSchema, ConversationListItem
 )
 
@@ -31,6 +38,7 @@ router = APIRouter(prefix="/api/live", tags=["live"])
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
+_SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
 
 
 # ==================== Schemas ====================
@@ -92,10 +100,69 @@ class LiveConversationListItem(BaseModel):
 
 # ==================== Token Helpers ====================
 
+# token -> verified portal/live payload; a hit only re-checks `exp` instead of
+# re-verifying the signature (portal pages poll with the same token).
+_token_cache: TTLCache[dict] = TTLCache(maxsize=10_000, ttl=300)
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _verify_hs256(token: str) -> dict:
+    """Verify an HS256 token with OpenSSL's HMAC and return its claims.
+
+    Only the checks our own tokens need (alg, signature, exp, nbf); raises the
+    same jwt.* errors as jwt.decode so callers handle both alike.
+    """
+    try:
+        signing_input, _, signature_b64 = token.rpartition(".")
+        header_b64, _, payload_b64 = signing_input.partition(".")
+        header = from_json(_b64url_decode(header_b64))
+        signature = _b64url_decode(signature_b64)
+        expected = hmac.digest(_SECRET_KEY_BYTES, signing_input.encode("ascii"), "sha256")
+    except ValueError as exc:
+        raise jwt.DecodeError("Invalid token") from exc
+    if not isinstance(header, dict) or header.get("alg") != ALGORITHM:
+        raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+    if not hmac.compare_digest(signature, expected):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+
+    try:
+        payload = from_json(_b64url_decode(payload_b64))
+    except ValueError as exc:
+        raise jwt.DecodeError("Invalid payload") from exc
+    if not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid payload")
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+            raise jwt.DecodeError("Expiration Time claim (exp) must be a number")
+        if exp <= now:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+    nbf = payload.get("nbf")
+    if nbf is not None:
+        if not isinstance(nbf, (int, float)) or isinstance(nbf, bool):
+            raise jwt.DecodeError("Not Before claim (nbf) must be a number")
+        if nbf > now:
+            raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+    return payload
+
+
 def _decode_token(token: str) -> dict:
-    """Decode and validate a portal/live token."""
+    """Decode and validate a portal/live token (memoized per token for a few minutes)."""
+    cached = _token_cache.get(token)
+    if cached is not None:
+        exp = cached.get("exp")
+        if exp is not None and exp <= time.time():
+            _token_cache.pop(token, None)
+            raise HTTPException(status_code=401, detail="Link expirado")
+        return dict(cached)
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _verify_hs256(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Link expirado")
     except jwt.InvalidTokenError:
@@ -104,7 +171,8 @@ def _decode_token(token: str) -> dict:
     token_type = payload.get("type")
     if token_type not in ("live_view", "portal"):
         raise HTTPException(status_code=401, detail="Token inválido")
-    return payload
+    _token_cache.set(token, payload)
+    return dict(payload)
 
 
 # ==================== Create Links ====================
@@ -142,16 +210,42 @@ async def create_portal_link(
 
 # ==================== Portal: List Conversations ====================
 
-@router.get("/{token}/conversations", response_model=List[LiveConversationListItem])
+def _encode_list_cursor(last_event_at: datetime, channel_type: str, conversation_id: str) -> str:
+    """Opaque keyset cursor: the sort key of the last row of a page."""
+    raw = f"{last_event_at.isoformat()}|{channel_type}|{conversation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_list_cursor(cursor: str) -> tuple[datetime, str, str]:
+    try:
+        ts, channel_type, conversation_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 2)
+        )
+        return datetime.fromisoformat(ts), channel_type, conversation_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+@router.get(
+    "/{token}/conversations",
+    response_model=None,
+    responses={200: {"model": List[LiveConversationListItem]}},
+)
 async def portal_list_conversations(
     token: str,
     status: Optional[str] = None,
     channel_type: Optional[str] = None,
     limit: int = Query(default=50, ge=1, le=200),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, deprecated=True),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor da página anterior"),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all conversations for a portal token."""
+    """List all conversations for a portal token.
+
+    Keyset-paginated by (last_event_at, channel_type, conversation_id), newest
+    first: when the page is full the `X-Next-Cursor` header carries the cursor
+    for the next one. `offset` still works but scans every skipped row.
+    """
     payload = _decode_token(token)
     project_uuid = UUID(payload["project_id"])
 
@@ -159,60 +253,62 @@ async def portal_list_conversations(
     if payload["type"] == "live_view":
         raise HTTPException(status_code=403, detail="Use o endpoint /{token} para visualizar conversa individual")
 
-    query = select(ConversationState).where(
-        and_(
-            ConversationState.project_id == project_uuid,
-            ConversationState.conversation_id != "null"
-        )
-    )
-
+    filters = [
+        ConversationState.project_id == project_uuid,
+        ConversationState.conversation_id != "null",
+    ]
     if status:
-        query = query.where(ConversationState.status == status)
+        filters.append(ConversationState.status == status)
     if channel_type:
-        query = query.where(ConversationState.channel_type == channel_type)
-
-    query = query.order_by(desc(ConversationState.last_event_at))
-    query = query.offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    conversations = result.scalars().all()
+        filters.append(ConversationState.channel_type == channel_type)
+    if cursor:
+        filters.append(
+            tuple_(
+                ConversationState.last_event_at,
+                ConversationState.channel_type,
+                ConversationState.conversation_id,
+            ) < tuple_(*_decode_list_cursor(cursor))
+        )
 
-    names = await _resolve_contact_names(conversations, db)
+    # Page, contact names, event counts and previews in one round trip
+    result = await db.execute(_conversation_page_query(filters, offset, limit, all_events=True))
 
     conv_list = []
-    for conv in conversations:
-        msg_result = await db.execute(
-            select(func.count(ConversationEvent.id)).where(
-                and_(
-                    ConversationEvent.project_id == conv.project_id,
-                    ConversationEvent.channel_type == conv.channel_type,
-                    ConversationEvent.conversation_id == conv.conversation_id,
-                )
-            )
-        )
-        msg_count = msg_result.scalar() or 0
-
-        raw_name = names.get(conv.conversation_id)
-        contact_name = format_contact_display(conv.conversation_id, conv.channel_type, raw_name)
-        last_text = await _get_last_text_fallback(conv, db)
+    for row in result.all():
+        raw_name = row.contact_name or extract_contact_name_from_raw(row.name_raw_payload)
+        contact_name = format_contact_display(row.conversation_id, row.channel_type, raw_name)
+        last_text = row.last_text
+        if not last_text and row.preview_event_id is not None:
+            last_text = extract_text_from_raw(row.preview_raw_payload, row.preview_text)
 
         conv_list.append({
-            "project_id": str(conv.project_id),
-            "conversation_id": conv.conversation_id,
+            "project_id": row.project_id,
+            "conversation_id": row.conversation_id,
             "contact_name": contact_name,
-            "channel_type": conv.channel_type,
-            "status": conv.status,
-            "last_event_at": conv.last_event_at,
+            "channel_type": row.channel_type,
+            "status": row.status,
+            "last_event_at": row.last_event_at,
             "last_text": last_text,
-            "message_count": msg_count
+            "message_count": row.message_count
         })
 
-    return conv_list
+    response = _json_response(conv_list)
+    if len(conv_list) == limit:
+        last = conv_list[-1]
+        response.headers["X-Next-Cursor"] = _encode_list_cursor(
+            last["last_event_at"], last["channel_type"], last["conversation_id"]
+        )
+    return response
 
 
 # ==================== Portal/Live: View Conversation ====================
 
-@router.get("/{token}/conversations/{conversation_id}", response_model=LiveConversationDetail)
+# Schema documented only: the message dicts are dumped once, not validated per message.
+@router.get(
+    "/{token}/conversations/{conversation_id}",
+    response_model=None,
+    responses={200: {"model": LiveConversationDetail}},
+)
 async def portal_get_conversation(
     token: str,
     conversation_id: str,
@@ -226,46 +322,84 @@ async def portal_get_conversation(
     if payload["type"] == "live_view" and payload.get("conversation_id") != conversation_id:
         raise HTTPException(status_code=403, detail="Acesso negado a esta conversa")
 
-    result = await db.execute(
-        select(ConversationState).where(
+    # State, contact name and events in one round trip. Contact name: users
+    # table, else the first incoming event's raw_payload (fetched only when
+    # there's no name). The state row is repeated on each event row; a state
+    # without events comes back once with NULL event columns.
+    contact_name_sq = (
+        select(Contact.name)
+        .where(Contact.project_id == project_uuid, Contact.id == conversation_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    first_in_raw_payload = (
+        select(ConversationEvent.raw_payload)
+        .where(
+            ConversationEvent.project_id == project_uuid,
+            ConversationEvent.conversation_id == conversation_id,
+            ConversationEvent.direction == "in",
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+    state_sq = (
+        select(
+            ConversationState.project_id,
+            ConversationState.conversation_id,
+            ConversationState.channel_type,
+            ConversationState.status,
+            ConversationState.last_event_at,
+            ConversationState.ai_state,
+            ConversationState.summary_short,
+            ConversationState.metadata_json.label("state_metadata"),
+            contact_name_sq.label("contact_name"),
+            case(
+                (func.coalesce(contact_name_sq, "") == "", first_in_raw_payload),
+                else_=None,
+            ).label("name_raw_payload"),
+        )
+        .where(
             and_(
                 ConversationState.project_id == project_uuid,
                 ConversationState.conversation_id == conversation_id
             )
         )
+        # Same conversation_id on several channels: the most recent one
+        .order_by(desc(ConversationState.last_event_at))
+        .limit(1)
+        .subquery("state")
     )
-    state = result.scalar_one_or_none()
-    if not state:
+    result = await db.execute(
+        select(
+            state_sq,
+            ConversationEvent.id.label("event_id"),
+            ConversationEvent.direction,
+            ConversationEvent.message_type,
+            ConversationEvent.text,
+            ConversationEvent.raw_payload,
+            ConversationEvent.metadata_json.label("metadata_json"),
+            ConversationEvent.created_at,
+        )
+        .select_from(state_sq)
+        .outerjoin(
+            ConversationEvent,
+            and_(
+                ConversationEvent.project_id == state_sq.c.project_id,
+                ConversationEvent.channel_type == state_sq.c.channel_type,
+                ConversationEvent.conversation_id == state_sq.c.conversation_id,
+            ),
+        )
+        .order_by(ConversationEvent.created_at)
+    )
+    rows = result.all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Conversa não encontrada")
 
-    # Resolve name
-    contact_result = await db.execute(
-        select(Contact.name).where(Contact.id == conversation_id)
-    )
-    raw_name = contact_result.scalars().first()
-    if not raw_name:
-        evt = await db.execute(
-            select(ConversationEvent.raw_payload).where(
-                and_(
-                    ConversationEvent.project_id == project_uuid,
-                    ConversationEvent.conversation_id == conversation_id,
-                    ConversationEvent.direction == "in",
-                )
-            ).limit(1)
-        )
-        raw_name = extract_contact_name_from_raw(evt.scalar_one_or_none())
+    state = rows[0]
+    raw_name = state.contact_name or extract_contact_name_from_raw(state.name_raw_payload)
     contact_name = format_contact_display(conversation_id, state.channel_type, raw_name)
 
-    events_query = select(ConversationEvent).where(
-        and_(
-            ConversationEvent.project_id == project_uuid,
-            ConversationEvent.channel_type == state.channel_type,
-            ConversationEvent.conversation_id == conversation_id
-        )
-    ).order_by(ConversationEvent.created_at)
-
-    result = await db.execute(events_query)
-    events = result.scalars().all()
+    events = [row for row in rows if row.event_id is not None]
 
     messages = []
     for e in events:
@@ -277,15 +411,15 @@ async def portal_get_conversation(
         if text is None and e.direction == "in" and e.message_type in ("unknown", ""):
             continue
         messages.append({
-            "id": str(e.id),
+            "id": e.event_id,
             "direction": e.direction,
             "message_type": e.message_type,
             "text": text,
             "created_at": e.created_at
         })
 
-    return {
-        "project_id": str(state.project_id),
+    return _json_response({
+        "project_id": state.project_id,
         "conversation_id": state.conversation_id,
         "contact_name": contact_name,
         "channel_type": state.channel_type,
@@ -293,9 +427,9 @@ async def portal_get_conversation(
         "last_event_at": state.last_event_at,
         "ai_state": state.ai_state,
         "summary_short": state.summary_short,
-        "metadata": state.metadata_json,
+        "metadata": state.state_metadata,
         "messages": messages
-    }
+    })
 
 
 # ==================== Single conversation shortcut (backwards compat) ====================
@@ -316,6 +450,30 @@ async def get_live_conversation_redirect(
 
 # ==================== Portal: Update Status ====================
 
+_HUMAN_TAKEOVER_KEYS = ("human_takeover_until", "human_agent_name")
+
+
+def _patched_state_metadata(db: AsyncSession, current: Optional[dict], set_keys: dict = None, drop_keys=()):
+    """Value for `metadata_json` in an UPDATE that only sets/drops a few keys.
+
+    On Postgres the patch is applied server-side (`|| patch`, `- key`), so the
+    rest of the document is not sent back; other dialects merge in Python.
+    """
+    if (db.get_bind().dialect.name or "").lower() != "postgresql":
+        meta = dict(current or {})
+        for key in drop_keys:
+            meta.pop(key, None)
+        meta.update(set_keys or {})
+        return meta
+
+    expr = func.coalesce(cast(ConversationState.metadata_json, JSONB), literal_column("'{}'::jsonb", JSONB))
+    for key in drop_keys:
+        expr = expr.op("-", return_type=JSONB)(key)
+    if set_keys:
+        expr = expr.op("||", return_type=JSONB)(bindparam(None, set_keys, type_=JSONB))
+    return expr
+
+
 @router.patch("/{token}/conversations/{conversation_id}/status")
 async def portal_update_status(
     token: str,
@@ -343,14 +501,18 @@ async def portal_update_status(
         raise HTTPException(status_code=404, detail="Conversa não encontrada")
 
     now = datetime.now(timezone.utc)
-    meta = dict(state.metadata_json or {})
+    values: dict = {"status": body.status, "updated_at": now}
+    takeover_until = (state.metadata_json or {}).get("human_takeover_until")
 
     if body.status == "handoff":
-        meta["human_takeover_until"] = (now + timedelta(hours=3)).isoformat()
-        meta["human_agent_name"] = "Cliente (Portal)"
+        takeover_until = (now + timedelta(hours=3)).isoformat()
+        values["metadata_json"] = _patched_state_metadata(db, state.metadata_json, set_keys={
+            "human_takeover_until": takeover_until,
+            "human_agent_name": "Cliente (Portal)",
+        })
     elif body.status == "open":
-        meta.pop("human_takeover_until", None)
-        meta.pop("human_agent_name", None)
+        takeover_until = None
+        values["metadata_json"] = _patched_state_metadata(db, state.metadata_json, drop_keys=_HUMAN_TAKEOVER_KEYS)
 
     await db.execute(
         sa_update(ConversationState).where(
@@ -359,11 +521,11 @@ async def portal_update_status(
                 ConversationState.channel_type == state.channel_type,
                 ConversationState.conversation_id == conversation_id
             )
-        ).values(status=body.status, metadata_json=meta, updated_at=now)
+        ).values(**values)
     )
 
     event = ConversationEvent(
-        id=uuid_mod.uuid4(),
+        **_event_id_values(db),
         project_id=project_uuid,
         channel_type=state.channel_type,
         channel_identifier=state.channel_identifier,
@@ -375,7 +537,7 @@ async def portal_update_status(
     db.add(event)
     await db.commit()
 
-    return {"ok": True, "status": body.status, "human_takeover_until": meta.get("human_takeover_until")}
+    return {"ok": True, "status": body.status, "human_takeover_until": takeover_until}
 
 
 # ==================== Portal: Send Message ====================
@@ -423,33 +585,33 @@ async def portal_send_message(
     access_token = channel.access_token
     api_version = "v21.0"
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        if state.channel_type == "whatsapp":
-            resp = await client.post(
-                f"https://graph.facebook.com/{api_version}/{state.channel_identifier}/messages",
-                headers={"Authorization": f"Bearer {access_token}"},
-                json={
-                    "messaging_product": "whatsapp",
-                    "recipient_type": "individual",
-                    "to": conversation_id,
-                    "type": "text",
-                    "text": {"body": body.text}
-                }
-            )
-        elif state.channel_type == "messenger":
-            resp = await client.post(
-                f"https://graph.facebook.com/{api_version}/me/messages",
-                params={"access_token": access_token},
-                json={"recipient": {"id": conversation_id}, "message": {"text": body.text}}
-            )
-        elif state.channel_type == "instagram":
-            resp = await client.post(
-                f"https://graph.facebook.com/{api_version}/{state.channel_identifier}/messages",
-                params={"access_token": access_token},
-                json={"recipient": {"id": conversation_id}, "message": {"text": body.text}}
-            )
-        else:
-            raise HTTPException(status_code=400, detail=f"Canal '{state.channel_type}' não suportado")
+    client = get_meta_client()
+    if state.channel_type == "whatsapp":
+        resp = await client.post(
+            f"https://graph.facebook.com/{api_version}/{state.channel_identifier}/messages",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={
+                "messaging_product": "whatsapp",
+                "recipient_type": "individual",
+                "to": conversation_id,
+                "type": "text",
+                "text": {"body": body.text}
+            }
+        )
+    elif state.channel_type == "messenger":
+        resp = await client.post(
+            f"https://graph.facebook.com/{api_version}/me/messages",
+            params={"access_token": access_token},
+            json={"recipient": {"id": conversation_id}, "message": {"text": body.text}}
+        )
+    elif state.channel_type == "instagram":
+        resp = await client.post(
+            f"https://graph.facebook.com/{api_version}/{state.channel_identifier}/messages",
+            params={"access_token": access_token},
+            json={"recipient": {"id": conversation_id}, "message": {"text": body.text}}
+        )
+    else:
+        raise HTTPException(status_code=400, detail=f"Canal '{state.channel_type}' não suportado")
 
     if resp.status_code not in (200, 201):
         raise HTTPException(status_code=502, detail=f"Erro Meta API ({resp.status_code}): {resp.text}")
@@ -457,7 +619,7 @@ async def portal_send_message(
     now = datetime.now(timezone.utc)
 
     event = ConversationEvent(
-        id=uuid_mod.uuid4(),
+        **_event_id_values(db),
         project_id=project_uuid,
         channel_type=state.channel_type,
         channel_identifier=state.channel_identifier,
@@ -468,12 +630,21 @@ async def portal_send_message(
     )
     db.add(event)
 
-    meta = dict(state.metadata_json or {})
     new_status = state.status
+    values: dict = {
+        "last_event_at": now,
+        "last_direction": "out",
+        "last_message_type": "human_reply",
+        "last_text": body.text,
+        "updated_at": now,
+    }
     if state.status != "handoff":
         new_status = "handoff"
-        meta["human_takeover_until"] = (now + timedelta(hours=3)).isoformat()
-        meta["human_agent_name"] = "Cliente (Portal)"
+        values["status"] = new_status
+        values["metadata_json"] = _patched_state_metadata(db, state.metadata_json, set_keys={
+            "human_takeover_until": (now + timedelta(hours=3)).isoformat(),
+            "human_agent_name": "Cliente (Portal)",
+        })
 
     await db.execute(
         sa_update(ConversationState).where(
@@ -482,15 +653,7 @@ async def portal_send_message(
                 ConversationState.channel_type == state.channel_type,
                 ConversationState.conversation_id == conversation_id
             )
-        ).values(
-            status=new_status,
-            last_event_at=now,
-            last_direction="out",
-            last_message_type="human_reply",
-            last_text=body.text,
-            metadata_json=meta,
-            updated_at=now
-        )
+        ).values(**values)
     )
 
     await db.commit()
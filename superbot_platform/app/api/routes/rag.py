@@ -13,6 +13,7 @@ import os
 from app.db.database import get_db
 from app.db.models import DashboardUser
 from app.api.routes.auth import get_current_user
+from app.core.n8n_client import get_n8n_client
 from app.core.tenancy import resolve_project_id_for_user
 
 router = APIRouter(prefix="/api/rag", tags=["rag"])
@@ -79,10 +80,9 @@ async def ingest_document(
     
     # Call n8n webhook
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(RAG_INGEST_WEBHOOK, json=payload)
-            response.raise_for_status()
-            result = response.json()
+        response = await get_n8n_client().post(RAG_INGEST_WEBHOOK, json=payload)
+        response.raise_for_status()
+        result = response.json()
         
         return {
             "success": result.get("success", True),
@@ -137,10 +137,9 @@ async def ingest_file(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(RAG_INGEST_WEBHOOK, json=payload)
-            response.raise_for_status()
-            result = response.json()
+        response = await get_n8n_client().post(RAG_INGEST_WEBHOOK, json=payload)
+        response.raise_for_status()
+        result = response.json()
         
         return {
             "success": result.get("success", True),
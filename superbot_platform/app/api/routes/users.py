@@ -14,7 +14,7 @@ import uuid
 
 from app.db.database import get_db
 from app.db.models import DashboardUser, Client
-from app.api.routes.auth import get_current_user, hash_password
+from app.api.routes.auth import get_current_user, hash_password_async, invalidate_cached_user, revoke_user_sessions
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -41,7 +41,7 @@ class UpdateUserRequest(BaseModel):
 
 # ==================== Helpers ====================
 
-def require_admin_or_manager(current_user: DashboardUser = Depends(get_current_user)):
+async def require_admin_or_manager(current_user: DashboardUser = Depends(get_current_user)):
     """Allow admin or manager roles."""
     if current_user.role not in ("admin", "manager"):
         raise HTTPException(status_code=403, detail="Acesso restrito a administradores e gerentes")
@@ -169,7 +169,7 @@ async def create_user(
     user = DashboardUser(
         id=uuid.uuid4(),
         email=req.email,
-        password_hash=hash_password(req.password),
+        password_hash=await hash_password_async(req.password),
         name=req.name,
         role=req.role,
         client_id=req.client_id if req.client_id else None,
@@ -202,6 +202,10 @@ async def update_user(
         if req.role == "admin":
             raise HTTPException(status_code=403, detail="Gerentes nao podem promover a admin")
 
+    access_changed = (req.is_active is False and user.is_active) or (
+        req.role is not None and req.role != user.role
+    )
+
     if req.name is not None:
         user.name = req.name
     if req.email is not None:
@@ -213,7 +217,7 @@ async def update_user(
             raise HTTPException(status_code=400, detail="Email ja cadastrado")
         user.email = req.email
     if req.password is not None:
-        user.password_hash = hash_password(req.password)
+        user.password_hash = await hash_password_async(req.password)
     if req.is_active is not None:
         user.is_active = req.is_active
     if req.role is not None:
@@ -224,7 +228,12 @@ async def update_user(
             raise HTTPException(status_code=403, detail="Apenas admin pode definir role admin")
         user.role = req.role
 
+    # Tokens carry role as a claim: force a new login when access changes.
+    if access_changed:
+        await revoke_user_sessions(user.id, db)
+
     await db.commit()
+    invalidate_cached_user(user.id)
 
     client_name = None
     if user.client_id:
@@ -257,6 +266,7 @@ async def delete_user(
         if user.role == "admin":
             raise HTTPException(status_code=403, detail="Gerentes nao podem deletar administradores")
 
+    await revoke_user_sessions(user.id, db)
     await db.delete(user)
     await db.commit()
     return {"success": True}
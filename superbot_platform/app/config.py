@@ -22,6 +22,17 @@ class Settings(BaseSettings):
     # SQLite para desenvolvimento local, PostgreSQL para produção
     database_url: str = "sqlite+aiosqlite:///./superbot.db"
     redis_url: str = "redis://localhost:6379/0"
+    # Prepared statements cacheados por conexao asyncpg (0 desliga, ex.: pgbouncer em modo transaction)
+    db_statement_cache_size: int = 256
+    # Pool de conexoes do engine (apenas PostgreSQL); recycle em segundos
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800
+    # Webhook de chamadas: linhas por INSERT e espera maxima (ms) antes de gravar o lote
+    call_ingest_batch_size: int = 200
+    call_ingest_flush_ms: int = 50
+    # Intervalo (segundos) entre refreshes das materialized views de analytics
+    analytics_refresh_seconds: int = 600
     
     # === API Server ===
     api_host: str = "0.0.0.0"
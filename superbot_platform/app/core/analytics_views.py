@@ -0,0 +1,96 @@
+"""
+Analytics materialized view refresher.
+
+The dashboard analytics endpoints read pre-aggregated rollups instead of
+scanning conversation_states/conversation_events on every request:
+- mv_analytics_daily
+- mv_analytics_channels
+- mv_analytics_status
+- mv_analytics_hourly
+
+The views are created by superbot_configuracoes/sql/018 (PostgreSQL only)
+and refreshed here.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+
+from sqlalchemy import text as sa_text
+
+from app.config import get_settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_VIEWS = (
+    "mv_analytics_daily",
+    "mv_analytics_channels",
+    "mv_analytics_status",
+    "mv_analytics_hourly",
+)
+
+REFRESH_INTERVAL_SECONDS = get_settings().analytics_refresh_seconds
+
+_refresh_task: asyncio.Task | None = None
+_refresh_stop: asyncio.Event | None = None
+
+
+async def refresh_analytics_views() -> None:
+    """Refresh every analytics view without blocking readers."""
+    if (engine.dialect.name or "").lower() != "postgresql":
+        return
+    for view_name in ANALYTICS_VIEWS:
+        async with engine.begin() as conn:
+            # Not created yet (sql/018 pending): nothing to refresh
+            exists = await conn.scalar(sa_text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f"public.{view_name}"})
+            if not exists:
+                continue
+            await conn.execute(sa_text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY public.{view_name}"))
+
+
+async def start_analytics_refresher() -> None:
+    global _refresh_task, _refresh_stop
+    if (engine.dialect.name or "").lower() != "postgresql":
+        return
+    if _refresh_task and not _refresh_task.done():
+        return
+    _refresh_stop = asyncio.Event()
+    _refresh_task = asyncio.create_task(
+        _refresh_loop(),
+        name="analytics-views-refresher",
+    )
+
+
+async def stop_analytics_refresher() -> None:
+    global _refresh_task, _refresh_stop
+    if _refresh_stop:
+        _refresh_stop.set()
+    if _refresh_task:
+        _refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _refresh_task
+    _refresh_task = None
+    _refresh_stop = None
+
+
+async def _refresh_loop() -> None:
+    while True:
+        try:
+            await refresh_analytics_views()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("analytics views refresh failed")
+
+        if _refresh_stop is None:
+            return
+
+        try:
+            await asyncio.wait_for(
+                _refresh_stop.wait(),
+                timeout=REFRESH_INTERVAL_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            continue
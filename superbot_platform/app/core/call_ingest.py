@@ -0,0 +1,109 @@
+"""
+Batched ingest for the voice call webhook.
+
+n8n posts calls in bursts; one INSERT + COMMIT per request turns a burst into
+as many tiny transactions. The webhook enqueues each row here and a single
+flusher writes them with one multi-row INSERT per batch (up to
+CALL_INGEST_BATCH_SIZE rows or CALL_INGEST_FLUSH_MS of waiting, whichever
+comes first).
+
+Rows are held in memory until flushed: a crash loses at most the pending
+batch. Started/stopped by the app lifespan; stopping flushes what is queued.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import insert
+
+from app.config import get_settings
+from app.db.database import async_session
+from app.db.models import VoiceCallHistory
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BATCH_SIZE = max(1, settings.call_ingest_batch_size)
+FLUSH_SECONDS = max(1, settings.call_ingest_flush_ms) / 1000
+
+_STOP = object()
+
+_queue: asyncio.Queue | None = None
+_flush_task: asyncio.Task | None = None
+
+
+def is_running() -> bool:
+    return _flush_task is not None and not _flush_task.done()
+
+
+def enqueue_call(values: dict[str, Any]) -> None:
+    """Queue one voice_call_history row (column -> value, including `id`)."""
+    if _queue is None:
+        raise RuntimeError("call ingest is not running")
+    _queue.put_nowait(values)
+
+
+async def start_call_ingest() -> None:
+    global _queue, _flush_task
+    if is_running():
+        return
+    _queue = asyncio.Queue()
+    _flush_task = asyncio.create_task(_flush_loop(_queue), name="call-ingest-flusher")
+
+
+async def stop_call_ingest() -> None:
+    global _queue, _flush_task
+    queue, task = _queue, _flush_task
+    # Detach first: from here on enqueue_call() refuses and the webhook inserts
+    # synchronously, so nothing can land behind the sentinel and be lost.
+    _queue = None
+    _flush_task = None
+    if queue is not None and task is not None:
+        # Let the flusher write everything queued before the sentinel, then exit.
+        queue.put_nowait(_STOP)
+        await task
+
+
+async def _write_batch(rows: list[dict[str, Any]]) -> None:
+    try:
+        async with async_session() as session:
+            await session.execute(insert(VoiceCallHistory), rows)
+            await session.commit()
+        return
+    except Exception:
+        if len(rows) == 1:
+            logger.exception("voice call insert failed (call_id=%s)", rows[0].get("id"))
+            return
+        logger.exception("voice call batch insert failed; retrying %d rows one by one", len(rows))
+
+    # One bad row must not drop the rest of the batch.
+    for row in rows:
+        await _write_batch([row])
+
+
+async def _flush_loop(queue: asyncio.Queue) -> None:
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await queue.get()
+        if item is _STOP:
+            return
+
+        batch = [item]
+        deadline = loop.time() + FLUSH_SECONDS
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.append(item)
+
+        await _write_batch(batch)
@@ -0,0 +1,23 @@
+"""
+Per-client ElevenLabs lookups cached in-process (API key, configured agent ids).
+
+Both change rarely. The ElevenLabs routes read and fill these caches; every
+path that changes a client or its agents (agent sync, client update/delete)
+calls invalidate_client_cache(), so the caches live here rather than in one
+of those routers.
+"""
+from __future__ import annotations
+
+from uuid import UUID
+
+from app.core.cache import TTLCache
+
+# client_id -> API key / configured agent ids (in priority order)
+api_key_cache: TTLCache[str] = TTLCache(maxsize=1024, ttl=60)
+agent_ids_cache: TTLCache[tuple[str, ...]] = TTLCache(maxsize=1024, ttl=60)
+
+
+def invalidate_client_cache(client_id: str | UUID) -> None:
+    """Forget the cached ElevenLabs key and agent ids of a client."""
+    api_key_cache.pop(str(client_id))
+    agent_ids_cache.pop(str(client_id))
@@ -0,0 +1,31 @@
+"""
+Shared HTTP client for the ElevenLabs API.
+
+Pooled per worker (app.core.http_clients) so calls reuse the TCP/TLS
+connection to api.elevenlabs.io. Calls that need a longer timeout pass it
+per request.
+
+Speaks HTTP/2 when `h2` is installed (httpx[http2]): concurrent calls such as
+the agent fan-out and GET + PATCH pairs then multiplex over one connection.
+"""
+from __future__ import annotations
+
+import importlib.util
+
+import httpx
+
+from app.core.http_clients import pooled_client
+
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_pool = pooled_client(
+    "elevenlabs",
+    http2=_HTTP2,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+)
+
+
+def get_elevenlabs_client() -> httpx.AsyncClient:
+    """Return the shared ElevenLabs client."""
+    return _pool.get()
@@ -0,0 +1,46 @@
+"""
+Shared pooled HTTP clients.
+
+One httpx.AsyncClient per upstream (Meta Graph API, ElevenLabs, n8n) per
+worker keeps TCP/TLS connections alive between requests instead of
+handshaking on every call. Each client is created lazily on first use;
+the app lifespan closes all of them with close_http_clients().
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+
+
+class PooledClient:
+    """A named httpx.AsyncClient, (re)created on demand with fixed options."""
+
+    def __init__(self, name: str, **client_options: Any):
+        self.name = name
+        self._client_options = client_options
+        self._client: httpx.AsyncClient | None = None
+
+    def get(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(**self._client_options)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_pools: dict[str, PooledClient] = {}
+
+
+def pooled_client(name: str, **client_options: Any) -> PooledClient:
+    """Register the shared client `name`; options go to httpx.AsyncClient."""
+    pool = _pools[name] = PooledClient(name, **client_options)
+    return pool
+
+
+async def close_http_clients() -> None:
+    for pool in _pools.values():
+        await pool.aclose()
@@ -0,0 +1,22 @@
+"""
+Shared HTTP client for the Meta Graph API.
+
+Pooled per worker (app.core.http_clients) so sends reuse the TCP/TLS
+connection to graph.facebook.com instead of handshaking on every message.
+"""
+from __future__ import annotations
+
+import httpx
+
+from app.core.http_clients import pooled_client
+
+_pool = pooled_client(
+    "meta",
+    timeout=15,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+)
+
+
+def get_meta_client() -> httpx.AsyncClient:
+    """Return the shared Graph API client."""
+    return _pool.get()
@@ -0,0 +1,22 @@
+"""
+Shared HTTP client for n8n webhooks (RAG ingest).
+
+Pooled per worker (app.core.http_clients) so document uploads reuse the
+TCP/TLS connection to n8n instead of opening a new one per request.
+"""
+from __future__ import annotations
+
+import httpx
+
+from app.core.http_clients import pooled_client
+
+_pool = pooled_client(
+    "n8n",
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+)
+
+
+def get_n8n_client() -> httpx.AsyncClient:
+    """Return the shared n8n webhook client."""
+    return _pool.get()
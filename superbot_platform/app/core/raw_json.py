@@ -0,0 +1,37 @@
+"""
+Pass-through of already-serialized JSON (e.g. jsonb columns selected as ::text).
+
+Saves the driver's json.loads and the response's re-encode for payloads the API
+only forwards.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic_core import to_json
+
+
+class RawJSON(str):
+    """A JSON document to embed verbatim in a dumps_with_raw() payload."""
+
+
+def raw_json_or_none(value: str | None) -> RawJSON | None:
+    return RawJSON(value) if value is not None else None
+
+
+def dumps_with_raw(value: Any) -> bytes:
+    """
+    Serialize like pydantic_core.to_json, emitting RawJSON values verbatim.
+
+    RawJSON is honoured anywhere inside dicts, lists and tuples; other values
+    are passed to to_json whole.
+    """
+    if isinstance(value, RawJSON):
+        return value.encode("utf-8")
+    if isinstance(value, dict):
+        return b"{" + b",".join(
+            to_json(str(key)) + b":" + dumps_with_raw(item) for key, item in value.items()
+        ) + b"}"
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(dumps_with_raw(item) for item in value) + b"]"
+    return to_json(value)
@@ -1,14 +1,19 @@
 import json
 import re
-from typing import Any, Optional
+from typing import Any, Mapping, Optional
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import text
+from sqlalchemy import Boolean, Uuid, bindparam, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
 from app.db.models import DashboardUser
 
+_PROJECT_EXISTS_SQL = text("SELECT 1 FROM projects WHERE id = :id LIMIT 1").bindparams(
+    bindparam("id", type_=Uuid(as_uuid=True))
+)
+
 
 def normalize_slug(value: str) -> str:
     return re.sub(r"[^a-z0-9]", "", (value or "").lower())
@@ -28,7 +33,12 @@ def _parse_json_maybe(value: Any) -> dict:
     return {}
 
 
-async def resolve_project_id_from_client_id(client_id: str, db: AsyncSession) -> str:
+# clients.id -> projects.id. Successful resolutions only (errors are re-checked);
+# mapping changes (clients.settings/slug, client delete) call invalidate_project_resolutions().
+_client_project_cache: TTLCache[str] = TTLCache(maxsize=4_096, ttl=300)
+
+
+async def resolve_project_id_from_client_id(client_id: str | UUID, db: AsyncSession) -> str:
     """
     Resolve the n8n/multitenant `projects.id` for a given dashboard `clients.id`.
 
@@ -36,12 +46,23 @@ async def resolve_project_id_from_client_id(client_id: str, db: AsyncSession) ->
     1) clients.settings.project_id
     2) projects.project_slug == clients.settings.project_slug (or clients.slug)
     3) normalized slug match (fallback)
+
+    Memoized per client for a few minutes (per process).
     """
     try:
         UUID(str(client_id))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"client_id inválido: {e}")
 
+    key = str(client_id)
+    project_id = _client_project_cache.get(key)
+    if project_id is None:
+        project_id = await _resolve_project_id_from_client_id(key, db)
+        _client_project_cache.set(key, project_id)
+    return project_id
+
+
+async def _resolve_project_id_from_client_id(client_id: str, db: AsyncSession) -> str:
     res = await db.execute(
         text("SELECT id::text AS id, slug, settings FROM clients WHERE id = (:id)::uuid"),
         {"id": str(client_id)},
@@ -82,7 +103,7 @@ async def resolve_project_id_from_client_id(client_id: str, db: AsyncSession) ->
 
 
 async def resolve_project_id_for_user(
-    tenant_or_project_id: str,
+    tenant_or_project_id: str | UUID,
     current_user: DashboardUser,
     db: AsyncSession,
 ) -> str:
@@ -95,11 +116,12 @@ async def resolve_project_id_for_user(
     if current_user.role == "admin":
         # If it looks like a project UUID and exists, use it.
         try:
-            UUID(str(tenant_or_project_id))
-            chk = await db.execute(
-                text("SELECT 1 FROM projects WHERE id = (:id)::uuid LIMIT 1"),
-                {"id": str(tenant_or_project_id)},
+            candidate = (
+                tenant_or_project_id
+                if isinstance(tenant_or_project_id, UUID)
+                else UUID(str(tenant_or_project_id))
             )
+            chk = await db.execute(_PROJECT_EXISTS_SQL, {"id": candidate})
             if chk.scalar_one_or_none() == 1:
                 return str(tenant_or_project_id)
         except Exception:
@@ -118,3 +140,101 @@ async def resolve_project_id_for_user(
         raise HTTPException(status_code=403, detail="Acesso negado a este projeto")
 
     return project_id
+
+
+# (user id, role, client id, tenant_or_project_id) -> project id. Role/client are
+# part of the key so access changes never reuse an old decision; mapping
+# changes (clients.settings/slug) call invalidate_project_resolutions().
+_resolution_cache: TTLCache[str] = TTLCache(maxsize=5_000, ttl=300)
+
+
+async def resolve_project_id_for_user_cached(
+    tenant_or_project_id: str | UUID,
+    current_user: DashboardUser,
+    db: AsyncSession,
+) -> str:
+    """resolve_project_id_for_user memoized per user for a few minutes (per process)."""
+    key = (
+        str(current_user.id),
+        current_user.role,
+        str(current_user.client_id or ""),
+        str(tenant_or_project_id),
+    )
+    project_id = _resolution_cache.get(key)
+    if project_id is None:
+        project_id = await resolve_project_id_for_user(tenant_or_project_id, current_user, db)
+        _resolution_cache.set(key, project_id)
+    return project_id
+
+
+def invalidate_project_resolutions() -> None:
+    """Forget cached resolutions (call after changing a client's project mapping)."""
+    _resolution_cache.clear()
+    _client_project_cache.clear()
+
+
+# SQL twin of resolve_project_id_for_user for the common cases (projects.id,
+# clients.settings.project_id, exact project_slug), so a route can resolve the
+# project inside its first query instead of paying separate round trips.
+# Exposes `resolved.raw_pid` (NULL when only the Python resolver can decide,
+# e.g. normalized slug matches) and `resolved.pid` (NULL when the caller may
+# not access raw_pid). Bind with RESOLVE_PROJECT_BINDPARAMS and
+# resolve_project_params(); finish with project_id_from_resolved().
+RESOLVE_PROJECT_CTE = """
+resolved_client AS (
+  SELECT
+    CASE
+      WHEN COALESCE(c.settings->>'project_id', '') ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+      THEN (c.settings->>'project_id')::uuid
+      WHEN COALESCE(c.settings->>'project_id', '') = ''
+      THEN (
+        SELECT p.id FROM projects p
+        WHERE p.project_slug = COALESCE(NULLIF(c.settings->>'project_slug', ''), c.slug)
+        LIMIT 1
+      )
+    END AS pid
+  FROM clients c
+  WHERE c.id = :resolve_client_id
+),
+resolved_raw AS (
+  SELECT COALESCE(
+    (SELECT p.id FROM projects p WHERE :resolve_is_admin AND p.id = :resolve_tp),
+    (SELECT pid FROM resolved_client)
+  ) AS raw_pid
+),
+resolved AS (
+  SELECT
+    raw_pid,
+    CASE WHEN :resolve_is_admin OR :resolve_tp IN (:resolve_client_id, raw_pid) THEN raw_pid END AS pid
+  FROM resolved_raw
+)
+"""
+
+RESOLVE_PROJECT_BINDPARAMS = (
+    bindparam("resolve_tp", type_=Uuid(as_uuid=True)),
+    bindparam("resolve_client_id", type_=Uuid(as_uuid=True)),
+    bindparam("resolve_is_admin", type_=Boolean()),
+)
+
+
+def resolve_project_params(tenant_or_project_id: UUID, current_user: DashboardUser) -> dict[str, Any]:
+    """Bind values for RESOLVE_PROJECT_CTE (admins: the id may be a project or a client)."""
+    is_admin = current_user.role == "admin"
+    return {
+        "resolve_tp": tenant_or_project_id,
+        "resolve_client_id": tenant_or_project_id if is_admin else current_user.client_id,
+        "resolve_is_admin": is_admin,
+    }
+
+
+def project_id_from_resolved(row: Optional[Mapping[str, Any]]) -> Optional[str]:
+    """
+    Read the RESOLVE_PROJECT_CTE outcome selected as `raw_pid`/`pid`.
+
+    Returns None when the caller must fall back to resolve_project_id_for_user.
+    """
+    if not row or row.get("raw_pid") is None:
+        return None
+    if row.get("pid") is None:
+        raise HTTPException(status_code=403, detail="Acesso negado a este projeto")
+    return str(row["pid"])
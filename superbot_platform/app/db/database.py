@@ -5,16 +5,43 @@ Conecta ao PostgreSQL de producao. NAO cria/altera tabelas reais do multitenant.
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text as sa_text
+from pydantic_core import from_json, to_json
 from contextlib import asynccontextmanager
 from app.config import get_settings
 
 settings = get_settings()
 
-# Engine async
+# asyncpg: reuse server-side prepared statements (and their plans) per connection
+_connect_args = {}
+_pool_args = {}
+if settings.database_url.startswith("postgresql+asyncpg"):
+    _connect_args = {
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "statement_cache_size": settings.db_statement_cache_size,
+    }
+    # Pool sized for concurrent requests (default is 5 + 10 overflow); pre-ping
+    # drops connections the server/proxy closed while idle.
+    _pool_args = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+
+def _json_serializer(value) -> str:
+    return to_json(value).decode()
+
+
+# Engine async; JSON/JSONB binds and results go through pydantic-core instead of stdlib json
 engine = create_async_engine(
     settings.database_url,
     echo=settings.api_debug,
     future=True,
+    connect_args=_connect_args,
+    **_pool_args,
+    json_serializer=_json_serializer,
+    json_deserializer=from_json,
 )
 
 # Session factory
@@ -169,6 +196,26 @@ async def init_db():
                 ON campaign_deliveries (campaign_id, phone)
             """))
 
+            # list_calls indexes (declared on the model; create_all skips existing tables)
+            await conn.execute(sa_text("""
+                CREATE INDEX IF NOT EXISTS ix_voice_calls_project_start
+                ON voice_call_history (project_id, start_time DESC)
+            """))
+            await conn.execute(sa_text("""
+                CREATE INDEX IF NOT EXISTS ix_voice_calls_project_agent_start
+                ON voice_call_history (project_id, agent_id, start_time DESC)
+            """))
+            await conn.execute(sa_text("""
+                CREATE INDEX IF NOT EXISTS ix_voice_calls_project_start_success
+                ON voice_call_history (project_id, start_time DESC)
+                WHERE call_successful = true
+            """))
+            await conn.execute(sa_text("""
+                CREATE INDEX IF NOT EXISTS ix_voice_calls_project_start_failed
+                ON voice_call_history (project_id, start_time DESC)
+                WHERE call_successful = false
+            """))
+
             # F1: Add pipeline_id to pipeline_stages and conversation_assignments
             await conn.execute(sa_text("""
                 ALTER TABLE public.pipeline_stages
@@ -190,6 +237,24 @@ async def init_db():
                 )
             """))
 
+            # settings @> '{"project_id": ...}' lookups (tenant by project).
+            # Only when settings is jsonb (create_all would make it json).
+            await conn.execute(sa_text("""
+                DO $$
+                BEGIN
+                  IF EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = 'public'
+                      AND table_name = 'clients'
+                      AND column_name = 'settings'
+                      AND data_type = 'jsonb'
+                  ) THEN
+                    CREATE INDEX IF NOT EXISTS idx_clients_settings_pathops
+                    ON public.clients USING GIN (settings jsonb_path_ops);
+                  END IF;
+                END $$;
+            """))
+
 
 async def get_db():
     """Dependency para FastAPI - fornece AsyncSession."""
@@ -4,9 +4,9 @@ Refletem o schema REAL do PostgreSQL em producao.
 """
 from sqlalchemy import (
     Column, String, Text, Boolean, DateTime, ForeignKey,
-    JSON, Integer, Float, Numeric, func, Uuid, ARRAY, Date
+    JSON, Integer, Float, Numeric, func, text as sa_text, Uuid, ARRAY, Date, Index
 )
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, deferred, relationship
 from datetime import datetime
 import uuid
 
@@ -70,7 +70,8 @@ class ConversationEvent(Base):
     __tablename__ = "conversation_events"
     __table_args__ = {"extend_existing": True}
 
-    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Gerado pelo Postgres (como nos INSERTs do n8n); lido de volta via RETURNING
+    id = Column(Uuid(as_uuid=True), primary_key=True, server_default=sa_text("gen_random_uuid()"))
     project_id = Column(Uuid(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     channel_identifier = Column(Text, nullable=False)
     channel_type = Column(Text, nullable=False)
@@ -118,6 +119,11 @@ class ConversationState(Base):
     followup_stage = Column(Integer, default=0)
     next_followup_at = Column(DateTime(timezone=True))
 
+    # Events of this (project, channel, conversation); kept by a trigger on
+    # conversation_events (sql/017). NULL until the trigger/backfill counted it.
+    # Deferred: only the portal list reads it, entity loads leave it out.
+    event_count = deferred(Column(Integer))
+
     metadata_json = Column("metadata", JSON)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -607,3 +613,29 @@ class VoiceCallHistory(Base):
     audio_url = Column(Text)
     data_collection = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# list_calls: project + period (optionally agent), newest first, LIMIT 200
+Index("ix_voice_calls_project_start", VoiceCallHistory.project_id, VoiceCallHistory.start_time.desc())
+Index(
+    "ix_voice_calls_project_agent_start",
+    VoiceCallHistory.project_id,
+    VoiceCallHistory.agent_id,
+    VoiceCallHistory.start_time.desc(),
+)
+# list_calls?status=successful|failed: a boolean alone is too unselective for the
+# planner, so each status gets a partial index holding only its rows
+Index(
+    "ix_voice_calls_project_start_success",
+    VoiceCallHistory.project_id,
+    VoiceCallHistory.start_time.desc(),
+    postgresql_where=VoiceCallHistory.call_successful == True,
+    sqlite_where=VoiceCallHistory.call_successful == True,
+)
+Index(
+    "ix_voice_calls_project_start_failed",
+    VoiceCallHistory.project_id,
+    VoiceCallHistory.start_time.desc(),
+    postgresql_where=VoiceCallHistory.call_successful == False,
+    sqlite_where=VoiceCallHistory.call_successful == False,
+)
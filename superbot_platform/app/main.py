@@ -10,7 +10,10 @@ import os
 from pathlib import Path
 
 from app.db.database import init_db
+from app.core.analytics_views import start_analytics_refresher, stop_analytics_refresher
+from app.core.call_ingest import start_call_ingest, stop_call_ingest
 from app.core.loyalty_campaigns import start_loyalty_scheduler, stop_loyalty_scheduler
+from app.core.http_clients import close_http_clients
 from app.core.tools.base import ToolRegistry
 from app.api.routes import (
     auth as auth_routes,
@@ -42,10 +45,15 @@ async def lifespan(app: FastAPI):
     await init_db()
     ToolRegistry.register_all()
     await start_loyalty_scheduler()
+    await start_analytics_refresher()
+    await start_call_ingest()
     try:
         yield
     finally:
+        await stop_call_ingest()
+        await stop_analytics_refresher()
         await stop_loyalty_scheduler()
+        await close_http_clients()
 
 
 app = FastAPI(
@@ -76,6 +84,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.mount("/uploads", StaticFiles(directory=upload_root), name="uploads")
@@ -47,7 +47,9 @@ class TestAnalytics:
             "/api/analytics/timeline/test-id",
             "/api/analytics/channels/test-id",
             "/api/analytics/status/test-id",
-            "/api/analytics/hourly/test-id"
+            "/api/analytics/hourly/test-id",
+            "/api/analytics/all/test-id",
+            "/api/analytics/breakdown/test-id"
         ]
         
         for endpoint in endpoints:
@@ -55,6 +57,40 @@ class TestAnalytics:
             # 401 (não autenticado) ou 403 (sem permissão) são esperados
             assert response.status_code in [401, 403]
 
+    def test_analytics_routes_use_pydantic_json_serialization(self):
+        """Rotas de analytics devem declarar o tipo de retorno e manter o response_class padrão."""
+        from fastapi.datastructures import DefaultPlaceholder
+        from fastapi.routing import APIRoute
+
+        from app.api.routes.analytics import router as analytics_router
+
+        routes = [route for route in analytics_router.routes if isinstance(route, APIRoute)]
+        assert routes
+        for route in routes:
+            assert route.response_field is not None, route.path
+            assert isinstance(route.response_class, DefaultPlaceholder), route.path
+
+    def test_analytics_etag_returns_304_when_unchanged(self):
+        """If-None-Match igual ao ETag atual responde 304."""
+        from fastapi import Request, Response
+
+        from app.api.routes.analytics import ANALYTICS_CACHE_CONTROL, _not_modified
+
+        def make_request(if_none_match=None):
+            headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+            return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+        etag = 'W/"pid-20260101-1700000000"'
+        response = Response()
+        assert _not_modified(make_request(), response, etag) is None
+        assert response.headers["ETag"] == etag
+        assert response.headers["Cache-Control"] == ANALYTICS_CACHE_CONTROL
+
+        not_modified = _not_modified(make_request('"other", ' + etag), Response(), etag)
+        assert not_modified is not None
+        assert not_modified.status_code == 304
+        assert _not_modified(make_request('W/"stale"'), Response(), etag) is None
+
 
 class TestConversations:
     """Testes de conversas."""
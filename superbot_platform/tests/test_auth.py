@@ -0,0 +1,152 @@
+import hashlib
+
+from app.api.routes import auth as auth_module
+from app.api.routes.auth import hash_password, password_needs_rehash, verify_password
+
+
+def test_hash_password_is_salted_bcrypt(monkeypatch):
+    monkeypatch.setattr(auth_module, "BCRYPT_ROUNDS", 4)
+
+    first = hash_password("s3nha-forte")
+    second = hash_password("s3nha-forte")
+
+    assert first.startswith("$2")
+    assert first != second
+    assert verify_password("s3nha-forte", first)
+    assert not verify_password("outra", first)
+    assert not password_needs_rehash(first)
+
+
+def test_verify_password_accepts_legacy_sha256():
+    legacy = hashlib.sha256(b"admin123").hexdigest()
+
+    assert password_needs_rehash(legacy)
+    assert verify_password("admin123", legacy)
+    assert not verify_password("admin124", legacy)
+
+
+def test_verify_password_rejects_empty_hash():
+    assert not verify_password("admin123", "")
+
+
+def test_user_snapshot_rebuilds_transient_user():
+    import uuid
+
+    from app.db.models import Client, DashboardUser
+
+    client = Client(id=uuid.uuid4(), name="Pacific Surf", slug="pacific-surf")
+    user = DashboardUser(
+        id=uuid.uuid4(),
+        email="ops@pacific.surf",
+        name="Ops",
+        role="client",
+        client_id=client.id,
+        is_active=True,
+    )
+    user.client = client
+
+    rebuilt = auth_module._UserSnapshot.from_user(user).to_user()
+
+    assert rebuilt is not user
+    assert rebuilt.id == user.id
+    assert rebuilt.role == "client"
+    assert rebuilt.client_id == client.id
+    assert rebuilt.client.name == "Pacific Surf"
+
+
+def _snapshot(user_id, client_id, **overrides):
+    values = dict(
+        id=user_id,
+        email="ops@pacific.surf",
+        name="Ops",
+        role="client",
+        client_id=client_id,
+        client_name="Pacific Surf",
+        is_active=True,
+    )
+    values.update(overrides)
+    return auth_module._UserSnapshot(**values)
+
+
+def test_access_token_claims_rebuild_user_with_cached_display_fields():
+    import uuid
+
+    user_id = uuid.uuid4()
+    client_id = uuid.uuid4()
+    token, _ = auth_module.create_access_token(
+        str(user_id),
+        "ops@pacific.surf",
+        "client",
+        session_id=str(uuid.uuid4()),
+        name="Ops",
+        client_id=str(client_id),
+        client_name="Pacific Surf",
+    )
+    # Renamed after login: display fields follow the user row, not the token
+    snapshot = _snapshot(user_id, client_id, name="Ops Team", email="team@pacific.surf", client_name="Pacific Surf Co")
+
+    user = auth_module._user_from_claims(auth_module.decode_token(token), snapshot)
+
+    assert user.id == user_id
+    assert user.role == "client"
+    assert user.client_id == client_id
+    assert user.name == "Ops Team"
+    assert user.email == "team@pacific.surf"
+    assert user.client.name == "Pacific Surf Co"
+
+
+def test_legacy_token_without_claims_needs_db_lookup():
+    import uuid
+
+    user_id = uuid.uuid4()
+    payload = {"sub": str(user_id), "email": "a@b.c", "role": "admin"}
+
+    assert auth_module._user_from_claims(payload, _snapshot(user_id, None)) is None
+
+
+def test_decode_token_cache_still_enforces_expiry(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    from app.api.routes.auth import create_access_token, decode_token
+
+    token, _ = create_access_token("user-1", "ops@pacific.surf", "admin")
+    assert decode_token(token)["sub"] == "user-1"
+    assert auth_module._token_cache.get(token) is not None
+
+    real_time = auth_module.time.time
+    monkeypatch.setattr(auth_module.time, "time", lambda: real_time() + auth_module.ACCESS_TOKEN_EXPIRE_SECONDS + 1)
+    with pytest.raises(HTTPException) as exc:
+        decode_token(token)
+    assert exc.value.status_code == 401
+    assert auth_module._token_cache.get(token) is None
+
+
+def test_live_token_verifier_matches_pyjwt(monkeypatch):
+    import time
+
+    import jwt
+    import pytest
+
+    from app.api.routes import live
+
+    token = jwt.encode(
+        {"type": "portal", "project_id": "p-1", "exp": int(time.time()) + 60},
+        live.SECRET_KEY,
+        algorithm=live.ALGORITHM,
+    )
+    assert live._verify_hs256(token) == jwt.decode(token, live.SECRET_KEY, algorithms=[live.ALGORITHM])
+
+    header, payload, signature = token.split(".")
+    with pytest.raises(jwt.InvalidSignatureError):
+        live._verify_hs256(f"{header}.{payload}.{signature[:-2]}AA")
+    with pytest.raises(jwt.DecodeError):
+        live._verify_hs256("not-a-token")
+
+    none_alg = jwt.encode({"type": "portal"}, None, algorithm="none")
+    with pytest.raises(jwt.InvalidAlgorithmError):
+        live._verify_hs256(none_alg)
+
+    expired = jwt.encode({"type": "portal", "exp": int(time.time()) - 1}, live.SECRET_KEY, algorithm=live.ALGORITHM)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        live._verify_hs256(expired)
@@ -0,0 +1,89 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("user", 1)
+    assert cache.get("user") == 1
+
+    now[0] += 31
+    assert cache.get("user") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_project_resolution_is_cached_per_user(monkeypatch):
+    import uuid
+    from types import SimpleNamespace
+
+    from app.core import tenancy
+
+    calls = []
+
+    async def fake_resolve(tenant_or_project_id, current_user, db):
+        calls.append(tenant_or_project_id)
+        return "project-1"
+
+    monkeypatch.setattr(tenancy, "resolve_project_id_for_user", fake_resolve)
+    tenancy.invalidate_project_resolutions()
+    user = SimpleNamespace(id=uuid.uuid4(), role="client", client_id=uuid.uuid4())
+
+    assert await tenancy.resolve_project_id_for_user_cached("tenant-1", user, None) == "project-1"
+    assert await tenancy.resolve_project_id_for_user_cached("tenant-1", user, None) == "project-1"
+    assert len(calls) == 1
+
+    user.role = "admin"
+    await tenancy.resolve_project_id_for_user_cached("tenant-1", user, None)
+    assert len(calls) == 2
+
+    tenancy.invalidate_project_resolutions()
+    await tenancy.resolve_project_id_for_user_cached("tenant-1", user, None)
+    assert len(calls) == 3
+
+
+@pytest.mark.anyio
+async def test_client_project_resolution_is_cached_per_client(monkeypatch):
+    import uuid
+
+    from app.core import tenancy
+
+    calls = []
+
+    async def fake_resolve(client_id, db):
+        calls.append(client_id)
+        return "project-1"
+
+    monkeypatch.setattr(tenancy, "_resolve_project_id_from_client_id", fake_resolve)
+    tenancy.invalidate_project_resolutions()
+    client_id = str(uuid.uuid4())
+
+    assert await tenancy.resolve_project_id_from_client_id(client_id, None) == "project-1"
+    assert await tenancy.resolve_project_id_from_client_id(client_id, None) == "project-1"
+    assert len(calls) == 1
+
+    tenancy.invalidate_project_resolutions()
+    await tenancy.resolve_project_id_from_client_id(client_id, None)
+    assert len(calls) == 2
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.core import call_ingest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class _FakeSession:
+    def __init__(self, writes: list):
+        self.writes = writes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, rows):
+        if any(row.get("bad") for row in rows):
+            raise RuntimeError("insert failed")
+        self.writes.append([row["id"] for row in rows])
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    writes: list = []
+    monkeypatch.setattr(call_ingest, "async_session", lambda: _FakeSession(writes))
+    return writes
+
+
+@pytest.mark.anyio
+async def test_flusher_batches_queued_calls(monkeypatch, writes):
+    monkeypatch.setattr(call_ingest, "BATCH_SIZE", 3)
+    monkeypatch.setattr(call_ingest, "FLUSH_SECONDS", 0.05)
+    await call_ingest.start_call_ingest()
+    try:
+        for i in range(5):
+            call_ingest.enqueue_call({"id": i})
+        await asyncio.sleep(0.2)
+    finally:
+        await call_ingest.stop_call_ingest()
+
+    assert writes == [[0, 1, 2], [3, 4]]
+
+
+@pytest.mark.anyio
+async def test_failed_batch_is_retried_row_by_row(writes):
+    await call_ingest._write_batch([{"id": 1}, {"id": 2, "bad": True}, {"id": 3}])
+
+    assert writes == [[1], [3]]
+
+
+@pytest.mark.anyio
+async def test_stop_flushes_pending_calls_and_refuses_new_ones(monkeypatch, writes):
+    monkeypatch.setattr(call_ingest, "FLUSH_SECONDS", 60)
+    await call_ingest.start_call_ingest()
+    call_ingest.enqueue_call({"id": 1})
+    call_ingest.enqueue_call({"id": 2})
+
+    await call_ingest.stop_call_ingest()
+
+    assert writes == [[1, 2]]
+    assert not call_ingest.is_running()
+    with pytest.raises(RuntimeError):
+        call_ingest.enqueue_call({"id": 3})
+
+
+@pytest.mark.anyio
+async def test_webhook_rejects_invalid_project_id_before_queueing(monkeypatch):
+    import httpx
+
+    from app.main import app
+
+    monkeypatch.setattr(call_ingest, "enqueue_call", lambda values: pytest.fail("queued an invalid call"))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post("/api/elevenlabs/calls/webhook", json={"project_id": "not-a-uuid"})
+
+    assert response.status_code == 422
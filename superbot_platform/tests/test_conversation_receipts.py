@@ -0,0 +1,119 @@
+"""
+_IS_EMPTY_RECEIPT (SQL) must stay a subset of what get_conversation drops in
+Python: it may keep a receipt Python discards, never drop a renderable event.
+"""
+import datetime as dt
+import uuid
+
+import pytest
+from pydantic_core import from_json
+from sqlalchemy import false, null, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from app.api.routes import conversations
+from app.db.models import Contact, ConversationEvent, ConversationState
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _wa(value: dict) -> dict:
+    return {"entry": [{"changes": [{"value": value}]}]}
+
+
+def _messaging(item: dict) -> dict:
+    return {"entry": [{"messaging": [item]}]}
+
+
+# name -> (channel_type, direction, text, raw_payload)
+EVENTS = {
+    "wa_status": ("whatsapp", "in", None, _wa({"statuses": [{"status": "read"}]})),
+    "wa_status_empty_messages": ("whatsapp", "in", None, _wa({"statuses": [{"status": "sent"}], "messages": []})),
+    "wa_text": ("whatsapp", "in", None, _wa({"messages": [{"type": "text", "text": {"body": "oi"}}]})),
+    "wa_text_with_status": (
+        "whatsapp", "in", None,
+        _wa({"messages": [{"type": "text", "text": {"body": "oi"}}], "statuses": [{"status": "read"}]}),
+    ),
+    "wa_status_with_text_column": ("whatsapp", "in", "oi", _wa({"statuses": [{"status": "read"}]})),
+    "wa_status_outgoing": ("whatsapp", "out", None, _wa({"statuses": [{"status": "read"}]})),
+    "messenger_read": ("messenger", "in", None, _messaging({"read": {"watermark": 1}})),
+    "messenger_delivery": ("messenger", "in", None, _messaging({"delivery": {"mids": ["m1"]}})),
+    "messenger_read_null": ("messenger", "in", None, _messaging({"read": None})),
+    "messenger_text": ("messenger", "in", None, _messaging({"message": {"mid": "m2", "text": "ola"}})),
+    "messenger_postback": ("messenger", "in", None, _messaging({"postback": {"title": "Menu"}})),
+    "sent_image": ("whatsapp", "in", None, {"sent": {"type": "image"}, **_wa({"statuses": [{"status": "sent"}]})}),
+    "sent_empty": ("whatsapp", "in", None, {"sent": {}, **_wa({"statuses": [{"status": "sent"}]})}),
+    "raw_wa_text": ("whatsapp", "in", None, {"raw": {"type": "text", "text": {"body": "oi"}}, **_messaging({"read": {}})}),
+    "raw_ig_text": ("instagram", "in", None, {"raw": {"message": {"text": "ola"}}, **_messaging({"delivery": {}})}),
+    "raw_empty": ("messenger", "in", None, {"raw": {}, **_messaging({"read": {}})}),
+    "no_payload": ("whatsapp", "in", None, None),
+}
+
+RECEIPTS = {"wa_status", "wa_status_empty_messages", "messenger_read", "messenger_delivery"}
+
+
+async def _render(monkeypatch, db: AsyncSession, project_uuid: uuid.UUID, conversation_id: str, channel_type: str) -> set:
+    async def fake_resolve(project_id, current_user, db):
+        return str(project_uuid)
+
+    monkeypatch.setattr(conversations, "resolve_project_id_for_user", fake_resolve)
+    request = Request({
+        "type": "http", "scheme": "http", "server": ("testserver", 80), "path": "/",
+        "root_path": "", "query_string": b"", "headers": [],
+    })
+    response = await conversations.get_conversation(
+        str(project_uuid), conversation_id, request, channel_type=channel_type, db=db, current_user=None
+    )
+    return {message["id"] for message in from_json(response.body)["messages"]}
+
+
+@pytest.mark.anyio
+async def test_sql_receipt_filter_never_drops_a_rendered_event(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        for model in (ConversationEvent, ConversationState, Contact):
+            await conn.run_sync(model.__table__.create)
+    monkeypatch.setattr(conversations, "async_session", async_sessionmaker(engine, expire_on_commit=False))
+
+    project_uuid = uuid.uuid4()
+    t0 = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    ids: dict[str, str] = {}
+    async with engine.begin() as conn:
+        for channel_type in {spec[0] for spec in EVENTS.values()}:
+            await conn.execute(ConversationState.__table__.insert().values(
+                project_id=project_uuid, conversation_id=f"c-{channel_type}", channel_type=channel_type,
+                status="open", last_event_at=t0,
+            ))
+        for minute, (name, (channel_type, direction, text, raw)) in enumerate(EVENTS.items()):
+            event_id = uuid.uuid4()
+            ids[name] = str(event_id)
+            await conn.execute(ConversationEvent.__table__.insert().values(
+                id=event_id, project_id=project_uuid, channel_identifier="x", channel_type=channel_type,
+                conversation_id=f"c-{channel_type}", direction=direction, message_type="text", text=text,
+                raw_payload=raw if raw is not None else null(), media=null(),
+                created_at=t0 + dt.timedelta(minutes=minute),
+            ))
+
+    channel_types = sorted({spec[0] for spec in EVENTS.values()})
+    async with AsyncSession(engine) as db:
+        matched = set((await db.execute(
+            select(ConversationEvent.id).where(conversations._IS_EMPTY_RECEIPT)
+        )).scalars().all())
+        filtered = set()
+        for channel_type in channel_types:
+            filtered |= await _render(monkeypatch, db, project_uuid, f"c-{channel_type}", channel_type)
+
+        monkeypatch.setattr(conversations, "_IS_EMPTY_RECEIPT", false())
+        unfiltered = set()
+        for channel_type in channel_types:
+            unfiltered |= await _render(monkeypatch, db, project_uuid, f"c-{channel_type}", channel_type)
+    await engine.dispose()
+
+    names = {value: key for key, value in ids.items()}
+    assert {names[str(event_id)] for event_id in matched} == RECEIPTS
+    # Pushing the filter into SQL changes nothing the user sees
+    assert filtered == unfiltered
+    assert not RECEIPTS & {names[event_id] for event_id in unfiltered}
@@ -0,0 +1,33 @@
+import httpx
+import pytest
+
+from app.api.routes.elevenlabs import _elevenlabs_error
+
+
+def _status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.elevenlabs.io/v1/convai/agents")
+    response = httpx.Response(status_code, text='{"detail":"upstream"}', request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+@pytest.mark.parametrize("status_code", [400, 404, 409, 422, 429])
+def test_request_errors_are_forwarded(status_code):
+    exc = _elevenlabs_error(_status_error(status_code))
+
+    assert exc.status_code == status_code
+    assert exc.detail == '{"detail":"upstream"}'
+
+
+@pytest.mark.parametrize("status_code", [401, 403])
+def test_rejected_api_key_is_a_bad_gateway(status_code):
+    # A 401 would log the dashboard user out
+    exc = _elevenlabs_error(_status_error(status_code))
+
+    assert exc.status_code == 502
+    assert exc.detail == '{"detail":"upstream"}'
+
+
+@pytest.mark.parametrize("status_code", [405, 500, 503])
+def test_other_errors_are_a_500(status_code):
+    assert _elevenlabs_error(_status_error(status_code)).status_code == 500
+    assert _elevenlabs_error(httpx.ConnectError("boom")).status_code == 500
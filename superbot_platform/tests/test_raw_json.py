@@ -0,0 +1,25 @@
+from pydantic_core import from_json, to_json
+
+from app.core.raw_json import RawJSON, dumps_with_raw
+
+
+def test_raw_json_is_embedded_verbatim_at_any_depth():
+    payload = {
+        "settings": RawJSON('{"a": 1}'),
+        "channels": [RawJSON('{"id": "x"}'), {"config": RawJSON("[1, 2]")}],
+        "pair": (RawJSON("null"), "text"),
+        "plain": {"n": 1, "s": "RawJSON-looking string"},
+    }
+
+    assert from_json(dumps_with_raw(payload)) == {
+        "settings": {"a": 1},
+        "channels": [{"id": "x"}, {"config": [1, 2]}],
+        "pair": [None, "text"],
+        "plain": {"n": 1, "s": "RawJSON-looking string"},
+    }
+
+
+def test_without_raw_json_matches_to_json():
+    payload = {"a": [1, "b", None], "c": {"d": (True, 2.5)}}
+
+    assert dumps_with_raw(payload) == to_json(payload)